@@ -0,0 +1,326 @@
+"""Banc d'essai des quatre chaînes de conversion (images, documents, audio, vidéo).
+
+Génère des fichiers de test synthétiques (images de plusieurs tailles et
+modes, PDF de plusieurs pages, DOCX, TXT, sinusoïdes audio, courtes
+vidéos ffmpeg), convertit chaque lot avec les fonctions de lot du paquet
+et mesure: fichiers/s, Mo/s, latence par fichier (p50, p95) et pic de
+mémoire résidente. Chaque scénario tourne dans son propre processus,
+pour chaque nombre de conversions simultanées demandé.
+
+    python benchmarks/bench_conversions.py [--categories images,audio] [--workers 1,4]
+                                           [--fichiers 2] [--json resultats.json]
+
+Le rapport JSON (``--json -`` pour la sortie standard) permet de comparer
+moteurs et réglages d'une machine ou d'une version à l'autre.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+CATEGORIES = ("images", "documents", "audio", "video")
+
+# nom → (catégorie, motif des fichiers d'entrée, format de sortie, réglages)
+SCENARIOS = {
+    "images-jpg": ("images", "*", "jpg", {"qualite": 85}),
+    "images-webp": ("images", "*", "webp", {"qualite": 85}),
+    "images-vignette-exact": ("images", "*", "jpg", {"taille": (256, 256), "mode_redim": "exact"}),
+    "images-vignette-rapide": ("images", "*", "jpg", {"taille": (256, 256), "mode_redim": "rapide"}),
+    "pdf-txt": ("documents", "*.pdf", "txt", {}),
+    "pdf-pdf": ("documents", "*.pdf", "pdf", {}),
+    "docx-txt": ("documents", "*.docx", "txt", {}),
+    "txt-docx": ("documents", "*.txt", "docx", {}),
+    "audio-mp3-ffmpeg": ("audio", "*.wav", "mp3", {"moteur": "ffmpeg"}),
+    "audio-mp3-pydub": ("audio", "*.wav", "mp3", {"moteur": "pydub"}),
+    "audio-m4a-recopie": ("audio", "*.m4a", "m4a", {"moteur": "ffmpeg"}),
+    "video-h264-ffmpeg": ("video", "*.mp4", "mp4", {"codec": "libx264", "moteur": "ffmpeg"}),
+    "video-h264-moviepy": ("video", "*.mp4", "mp4", {"codec": "libx264", "moteur": "moviepy"}),
+    "video-copie": ("video", "*.mp4", "mkv", {"codec": "copy", "moteur": "ffmpeg"}),
+    "video-360p": ("video", "*.mp4", "mp4", {"codec": "libx264", "resolution": (640, 360),
+                                             "moteur": "ffmpeg"}),
+}
+
+
+def pic_memoire_mo(enfants=False):
+    """Pic de mémoire résidente du processus courant (ou du plus gros enfant), en Mo"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    qui = resource.RUSAGE_CHILDREN if enfants else resource.RUSAGE_SELF
+    pic = resource.getrusage(qui).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return pic / (1024 * 1024) if sys.platform == "darwin" else pic / 1024
+
+
+def centile(valeurs, p):
+    """Centile ``p`` (0-100) par la méthode du rang le plus proche"""
+    if not valeurs:
+        return None
+    valeurs = sorted(valeurs)
+    rang = max(1, math.ceil(p / 100 * len(valeurs)))
+    return valeurs[rang - 1]
+
+
+# ----- Fichiers de test -----
+
+def generer_images(dossier, n):
+    from PIL import Image
+    for largeur, hauteur in ((640, 480), (1920, 1080), (4000, 3000)):
+        fractale = Image.effect_mandelbrot((largeur, hauteur), (-2.0, -1.2, 1.0, 1.2), 100)
+        bruit = Image.effect_noise((largeur, hauteur), 40)
+        photo = Image.merge("RGB", (fractale, bruit, fractale))
+        for i in range(n):
+            nom = f"{largeur}x{hauteur}_{i}"
+            photo.save(os.path.join(dossier, f"photo_{nom}.jpg"), quality=90)
+            transparente = photo.copy()
+            transparente.putalpha(fractale)
+            transparente.save(os.path.join(dossier, f"transparente_{nom}.png"))
+            fractale.save(os.path.join(dossier, f"gris_{nom}.png"))
+            photo.quantize(64).save(os.path.join(dossier, f"palette_{nom}.gif"))
+
+
+def generer_documents(dossier, n):
+    from convertisseur.disponibilite import DOCX_AVAILABLE, PDF_AVAILABLE
+    paragraphe = ("Le convertisseur traite des lots de fichiers de toutes tailles. " * 8).strip()
+    for i in range(n):
+        with open(os.path.join(dossier, f"texte_{i}.txt"), "w", encoding="utf-8") as f:
+            for j in range(5000):
+                f.write(f"{j}. {paragraphe}\n")
+        if DOCX_AVAILABLE:
+            import docx
+            document = docx.Document()
+            for j in range(500):
+                document.add_paragraph(f"{j}. {paragraphe}")
+            document.save(os.path.join(dossier, f"document_{i}.docx"))
+        if PDF_AVAILABLE:
+            import fitz
+            from PIL import Image
+            image = os.path.join(dossier, "illustration.png")
+            Image.effect_noise((1200, 900), 50).convert("RGB").save(image)
+            with fitz.open() as pdf:
+                for page_num in range(40):
+                    page = pdf.new_page()
+                    page.insert_textbox(fitz.Rect(50, 50, 545, 450), f"Page {page_num}\n{paragraphe}")
+                    if page_num % 4 == 0:
+                        page.insert_image(fitz.Rect(50, 460, 545, 800), filename=image)
+                pdf.save(os.path.join(dossier, f"rapport_{i}.pdf"))
+            os.remove(image)
+
+
+def generer_audio(dossier, n, duree=30, frequence_echantillonnage=44100):
+    """Sinusoïdes stéréo en WAV (module ``wave``), puis en AAC si ffmpeg est présent"""
+    from convertisseur import ffmpeg
+    for i in range(n):
+        chemin = os.path.join(dossier, f"sinus_{i}.wav")
+        frequence = 220 * (i + 2)
+        periode = [int(12000 * math.sin(2 * math.pi * frequence * t / frequence_echantillonnage))
+                   for t in range(frequence_echantillonnage)]
+        seconde = b"".join(v.to_bytes(2, "little", signed=True) * 2 for v in periode)
+        with wave.open(chemin, "wb") as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(frequence_echantillonnage)
+            for _ in range(duree):
+                f.writeframes(seconde)
+        if ffmpeg.ffmpeg_disponible():
+            ffmpeg.executer_ffmpeg(["-i", chemin, "-c:a", "aac", "-b:a", "128k",
+                                    os.path.join(dossier, f"sinus_{i}.m4a")])
+
+
+def generer_videos(dossier, n, duree=5):
+    from convertisseur import ffmpeg
+    if not ffmpeg.ffmpeg_disponible():
+        return
+    for i in range(n):
+        ffmpeg.executer_ffmpeg([
+            "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={duree}",
+            "-f", "lavfi", "-i", f"sine=frequency={440 + 110 * i}:duration={duree}",
+            "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-shortest", os.path.join(dossier, f"mire_{i}.mp4")])
+
+
+GENERATEURS = {"images": generer_images, "documents": generer_documents,
+               "audio": generer_audio, "video": generer_videos}
+
+
+# ----- Mesure d'un scénario -----
+
+def disponible(nom):
+    """None si le scénario peut tourner, sinon la raison"""
+    from convertisseur import disponibilite
+    categorie, motif, format_sortie, reglages = SCENARIOS[nom]
+    moteur = reglages.get("moteur")
+    if moteur == "ffmpeg" and not disponibilite.FFMPEG_AVAILABLE:
+        return "ffmpeg introuvable"
+    if moteur == "pydub" and not disponibilite.PYDUB_AVAILABLE:
+        return "pydub non installé"
+    if moteur == "moviepy" and not disponibilite.MOVIEPY_AVAILABLE:
+        return "moviepy non installé"
+    if "pdf" in (motif[-3:], format_sortie) and not disponibilite.PDF_AVAILABLE:
+        return "PyMuPDF non installé"
+    if "docx" in (motif[-4:], format_sortie) and not disponibilite.DOCX_AVAILABLE:
+        return "python-docx non installé"
+    return None
+
+
+def lancer_lot(nom, fichiers, dossier_sortie, workers):
+    categorie, _, format_sortie, reglages = SCENARIOS[nom]
+    if categorie == "images":
+        from convertisseur.images import convertir_images_lot
+        return convertir_images_lot(fichiers, dossier_sortie, format_sortie,
+                                    reglages.get("qualite", 95), reglages.get("taille"),
+                                    processus=workers,
+                                    mode_redim=reglages.get("mode_redim", "exact"))
+    if categorie == "documents":
+        from convertisseur.documents import convertir_document
+        from convertisseur.lots import convertir_lot
+        return convertir_lot(convertir_document, fichiers, dossier_sortie, format_sortie,
+                             taille_pool=workers)
+    if categorie == "audio":
+        from convertisseur.audio import convertir_audios_lot
+        return convertir_audios_lot(fichiers, dossier_sortie, format_sortie, "192k",
+                                    moteur=reglages["moteur"], conversions=workers)
+    from convertisseur.video import convertir_videos_lot
+    return convertir_videos_lot(fichiers, dossier_sortie, format_sortie, reglages["codec"],
+                                reglages.get("resolution"), reglages["moteur"],
+                                conversions=workers)
+
+
+def mesurer_scenario(nom, dossier_fixtures, workers):
+    """Exécuté dans un processus dédié: convertit le lot et retourne les mesures"""
+    import glob
+    categorie, motif, format_sortie, reglages = SCENARIOS[nom]
+    fichiers = sorted(f for f in glob.glob(os.path.join(dossier_fixtures, categorie, motif))
+                      if os.path.isfile(f))
+
+    with tempfile.TemporaryDirectory() as dossier_sortie:
+        debut = time.perf_counter()
+        resultats = list(lancer_lot(nom, fichiers, dossier_sortie, workers))
+        duree = time.perf_counter() - debut
+
+    reussis = [r for r in resultats if r.reussi]
+    latences = [r.duree * 1000 for r in reussis if r.duree is not None]
+    octets = sum(os.path.getsize(f) for f in fichiers)
+    return {
+        "scenario": nom, "categorie": categorie, "format": format_sortie,
+        "reglages": reglages, "workers": workers,
+        "fichiers": len(fichiers), "echecs": len(resultats) - len(reussis),
+        "erreurs": sorted({r.erreur for r in resultats if not r.reussi})[:3],
+        "octets_entree": octets, "duree_s": duree,
+        "fichiers_par_s": len(reussis) / duree if duree else None,
+        "mo_par_s": octets / (1024 * 1024) / duree if duree else None,
+        "latence_p50_ms": centile(latences, 50), "latence_p95_ms": centile(latences, 95),
+        "pic_rss_mo": pic_memoire_mo(), "pic_rss_enfants_mo": pic_memoire_mo(enfants=True),
+    }
+
+
+# ----- Programme principal -----
+
+def liste(texte):
+    return [element.strip() for element in texte.split(",") if element.strip()]
+
+
+def description_machine():
+    return {"systeme": platform.platform(), "processeur": platform.processor() or platform.machine(),
+            "coeurs": os.cpu_count(), "python": platform.python_version(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def afficher_tableau(resultats, flux):
+    print(f"{'Scénario':<26}{'Workers':>8}{'Fichiers/s':>12}{'Mo/s':>9}"
+          f"{'p50 (ms)':>10}{'p95 (ms)':>10}{'RSS (Mo)':>10}{'Échecs':>8}", file=flux)
+    for r in resultats:
+        if "ignore" in r:
+            print(f"{r['scenario']:<26}{'':>8}  ignoré: {r['ignore']}", file=flux)
+            continue
+        rss = max(v for v in (r["pic_rss_mo"], r["pic_rss_enfants_mo"], 0) if v is not None)
+        p50 = "n/d" if r["latence_p50_ms"] is None else f"{r['latence_p50_ms']:.0f}"
+        p95 = "n/d" if r["latence_p95_ms"] is None else f"{r['latence_p95_ms']:.0f}"
+        print(f"{r['scenario']:<26}{r['workers']:>8}{r['fichiers_par_s']:>12.2f}"
+              f"{r['mo_par_s']:>9.1f}{p50:>10}{p95:>10}{rss:>10.0f}{r['echecs']:>8}", file=flux)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--categories", type=liste, default=list(CATEGORIES),
+                        help="catégories à mesurer, séparées par des virgules (défaut: toutes)")
+    parser.add_argument("--scenarios", type=liste,
+                        help="scénarios précis, séparés par des virgules: " + ", ".join(SCENARIOS))
+    parser.add_argument("--workers", type=lambda t: [int(n) for n in liste(t)],
+                        help="nombres de conversions simultanées à comparer (défaut: 1 et nb de cœurs)")
+    parser.add_argument("--fichiers", type=int, default=2,
+                        help="fichiers générés par variante (défaut: 2)")
+    parser.add_argument("--fixtures",
+                        help="dossier de fichiers de test à réutiliser (créé s'il est vide)")
+    parser.add_argument("--json", help="écrit le rapport JSON dans ce fichier ('-': sortie standard)")
+    parser.add_argument("--generer", help=argparse.SUPPRESS)
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # Processus enfants: génération d'une catégorie, mesure d'un scénario
+    if args.generer:
+        for categorie in args.categories:
+            dossier = os.path.join(args.generer, categorie)
+            os.makedirs(dossier, exist_ok=True)
+            GENERATEURS[categorie](dossier, args.fichiers)
+        return
+    if args.scenario:
+        print(json.dumps(mesurer_scenario(args.scenario, args.fixtures, args.workers[0])))
+        return
+
+    scenarios = args.scenarios or [nom for nom, (categorie, *_) in SCENARIOS.items()
+                                   if categorie in args.categories]
+    inconnus = [nom for nom in scenarios if nom not in SCENARIOS]
+    if inconnus:
+        parser.error(f"scénarios inconnus: {', '.join(inconnus)}")
+    workers = args.workers or sorted({1, os.cpu_count() or 1})
+    script = os.path.abspath(__file__)
+    flux = sys.stderr if args.json == "-" else sys.stdout
+
+    with tempfile.TemporaryDirectory() as temporaire:
+        fixtures = args.fixtures or temporaire
+        a_generer = sorted({SCENARIOS[nom][0] for nom in scenarios
+                            if not os.path.isdir(os.path.join(fixtures, SCENARIOS[nom][0]))})
+        if a_generer:
+            print(f"Génération des fichiers de test ({', '.join(a_generer)})...", file=flux)
+            subprocess.run([sys.executable, script, "--generer", fixtures,
+                            "--categories", ",".join(a_generer),
+                            "--fichiers", str(args.fichiers)], check=True)
+
+        resultats = []
+        for nom in scenarios:
+            raison = disponible(nom)
+            if raison:
+                resultats.append({"scenario": nom, "ignore": raison})
+                continue
+            for n in workers:
+                sortie = subprocess.run(
+                    [sys.executable, script, "--scenario", nom, "--fixtures", fixtures,
+                     "--workers", str(n)],
+                    check=True, capture_output=True, text=True)
+                resultats.append(json.loads(sortie.stdout.splitlines()[-1]))
+
+    afficher_tableau(resultats, flux)
+    rapport = {"machine": description_machine(), "resultats": resultats}
+    if args.json == "-":
+        json.dump(rapport, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rapport, f, indent=2, ensure_ascii=False)
+        print(f"\nRapport écrit dans {args.json}", file=flux)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Mesure le temps de démarrage de l'interface.
+
+Compare l'import de ``convertisseur_gui`` (détection paresseuse des
+bibliothèques optionnelles) à l'ancien comportement qui importait
+PyPDF2, PyMuPDF, python-docx, pydub et moviepy dès le lancement.
+Chaque mesure est faite dans un nouvel interpréteur.
+
+    python benchmarks/bench_demarrage.py [--repetitions 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PARESSEUX = "import convertisseur_gui"
+
+IMPORT_IMMEDIAT = """
+import convertisseur_gui
+for nom in ("PyPDF2", "fitz", "docx", "pydub", "moviepy.editor"):
+    try:
+        __import__(nom)
+    except ImportError:
+        pass
+"""
+
+
+def mesurer(code, repetitions):
+    """Durées (s) de ``repetitions`` lancements d'un interpréteur exécutant ``code``"""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=RACINE, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    # Un premier lancement remplit les caches du système de fichiers et les .pyc
+    mesurer(IMPORT_IMMEDIAT, 1)
+
+    paresseux = statistics.median(mesurer(IMPORT_PARESSEUX, args.repetitions))
+    immediat = statistics.median(mesurer(IMPORT_IMMEDIAT, args.repetitions))
+
+    print(f"Import immédiat (ancien)  : {immediat * 1000:8.1f} ms")
+    print(f"Détection paresseuse      : {paresseux * 1000:8.1f} ms")
+    print(f"Gain au démarrage         : {(immediat - paresseux) * 1000:8.1f} ms "
+          f"({immediat / paresseux:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
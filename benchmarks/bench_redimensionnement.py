@@ -0,0 +1,106 @@
+"""Compare les modes de redimensionnement d'images (exact, rapide, ajuster).
+
+Génère une photo JPEG synthétique (24 Mpx par défaut) et la réduit en
+vignette avec chaque mode. Chaque mode tourne dans son propre processus
+pour que le pic de mémoire (RSS) mesuré lui soit propre.
+
+    python benchmarks/bench_redimensionnement.py [--taille 256x256] [--repetitions 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+MODES = ("exact", "rapide", "ajuster")
+
+
+def pic_memoire_mo():
+    """Pic de mémoire résidente du processus courant, en Mo"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return pic / (1024 * 1024) if sys.platform == "darwin" else pic / 1024
+
+
+def generer_photo(chemin, largeur, hauteur):
+    from PIL import Image
+    fractale = Image.effect_mandelbrot((largeur, hauteur), (-2.0, -1.2, 1.0, 1.2), 100)
+    bruit = Image.effect_noise((largeur, hauteur), 40)
+    Image.merge("RGB", (fractale, bruit, fractale)).save(chemin, quality=90)
+
+
+def mesurer_mode(source, mode, taille, repetitions):
+    """Exécuté dans un processus dédié: latences par image et pic de mémoire"""
+    from convertisseur.images import convertir_image
+
+    with tempfile.TemporaryDirectory() as dossier:
+        latences = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            convertir_image(source, dossier, "jpg", 85, taille, mode)
+            latences.append(time.perf_counter() - debut)
+    return {"mode": mode, "latence_mediane_ms": statistics.median(latences) * 1000,
+            "latence_min_ms": min(latences) * 1000, "pic_rss_mo": pic_memoire_mo()}
+
+
+def lire_taille(texte):
+    largeur, hauteur = texte.lower().split("x")
+    return int(largeur), int(hauteur)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", type=lire_taille, default=(6000, 4000),
+                        help="dimensions de la photo générée (défaut: 6000x4000)")
+    parser.add_argument("--taille", type=lire_taille, default=(256, 256),
+                        help="taille de la vignette (défaut: 256x256)")
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--fichier", help=argparse.SUPPRESS)
+    parser.add_argument("--generer", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # Processus enfants: génération de la photo, mesure d'un seul mode
+    if args.generer:
+        generer_photo(args.generer, *args.source)
+        return
+    if args.mode:
+        print(json.dumps(mesurer_mode(args.fichier, args.mode, args.taille, args.repetitions)))
+        return
+
+    with tempfile.TemporaryDirectory() as dossier:
+        # Générée à part: sous Linux, un processus enfant hérite du pic RSS de son parent
+        source = os.path.join(dossier, "photo.jpg")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--generer", source,
+                        "--source", "{}x{}".format(*args.source)], check=True)
+
+        resultats = []
+        for mode in MODES:
+            sortie = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--fichier", source,
+                 "--taille", "{}x{}".format(*args.taille), "--repetitions", str(args.repetitions)],
+                check=True, capture_output=True, text=True)
+            resultats.append(json.loads(sortie.stdout))
+
+    reference = resultats[0]
+    print(f"Photo {args.source[0]}x{args.source[1]} → vignette {args.taille[0]}x{args.taille[1]}\n")
+    print(f"{'Mode':<10}{'Médiane (ms)':>14}{'Pic RSS (Mo)':>15}{'Accélération':>15}")
+    for r in resultats:
+        rss = "n/d" if r["pic_rss_mo"] is None else f"{r['pic_rss_mo']:.0f}"
+        acceleration = reference["latence_mediane_ms"] / r["latence_mediane_ms"]
+        print(f"{r['mode']:<10}{r['latence_mediane_ms']:>14.1f}{rss:>15}{acceleration:>14.1f}x")
+
+
+if __name__ == "__main__":
+    main()
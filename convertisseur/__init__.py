@@ -0,0 +1,5 @@
+"""Moteur de conversion sans interface graphique du Convertisseur Universel."""
+
+from .resultats import ResultatConversion
+
+__all__ = ["ResultatConversion"]
@@ -0,0 +1,197 @@
+"""Fusion et découpage de PDF.
+
+Les pages sont recopiées d'un document à l'autre objet par objet par
+PyMuPDF (``insert_pdf``): rien n'est réinterprété ni rendu, les flux
+compressés sont repris tels quels. Chaque source n'est ouverte qu'une
+fois, dans le processus courant, et chaque sortie est écrite en une
+seule passe.
+
+Un document en construction reste en mémoire jusqu'à son enregistrement:
+une fusion peut être répartie en paquets (``pages_par_paquet``,
+``fichiers_par_paquet``), chacun écrit puis libéré avant le suivant, et
+le découpage ne garde qu'une partie à la fois.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from . import mesures
+from .journal import PREFIXE_TEMPORAIRE
+from .mesures import collecter
+from .resultats import ResultatConversion
+
+
+def _taille(fichier):
+    try:
+        return os.path.getsize(fichier)
+    except OSError:
+        return None
+
+
+def _ouvrir_pdf(fichier):
+    import fitz  # PyMuPDF
+    source = fitz.open(fichier, filetype="pdf")
+    if source.needs_pass:
+        source.close()
+        raise ValueError("PDF protégé par un mot de passe")
+    return source
+
+
+def _enregistrer(doc, chemin_sortie):
+    # garbage=1: seuls les objets inutilisés sont retirés, sans recompresser les flux
+    with mesures.etape("encodage") as mesure:
+        doc.save(chemin_sortie, garbage=1)
+        mesure.ecrits = os.path.getsize(chemin_sortie)
+
+
+def decouper_pdf(fichier, dossier_sortie, pages_par_partie):
+    """Découpe ``fichier`` en parties de ``pages_par_partie`` pages.
+
+    Les parties sont nommées ``nom_p001-050.pdf``; retourne leurs chemins.
+    """
+    import fitz  # PyMuPDF
+
+    if pages_par_partie < 1:
+        raise ValueError("Le nombre de pages par partie doit être positif")
+    nom_base = os.path.splitext(os.path.basename(fichier))[0]
+    with mesures.etape("decodage", lus=os.path.getsize(fichier)):
+        source = _ouvrir_pdf(fichier)
+    sorties = []
+    with source:
+        nb_pages = source.page_count
+        chiffres = len(str(nb_pages))
+        for debut in range(0, nb_pages, pages_par_partie):
+            fin = min(nb_pages, debut + pages_par_partie)
+            chemin_sortie = os.path.join(
+                dossier_sortie, f"{nom_base}_p{debut + 1:0{chiffres}d}-{fin:0{chiffres}d}.pdf")
+            with fitz.open() as partie:
+                with mesures.etape("transformation"):
+                    partie.insert_pdf(source, from_page=debut, to_page=fin - 1)
+                _enregistrer(partie, chemin_sortie)
+            sorties.append(chemin_sortie)
+    return sorties
+
+
+class _Paquet:
+    """PDF de fusion en construction et résultats des fichiers lus depuis son ouverture.
+
+    Les échecs y sont gardés avec les réussites pour que les résultats
+    soient produits dans l'ordre des fichiers d'entrée.
+    """
+
+    def __init__(self, chemin):
+        import fitz  # PyMuPDF
+        self.chemin = chemin
+        self.doc = fitz.open()
+        self.resultats = []
+
+    @property
+    def pages(self):
+        return self.doc.page_count
+
+    @property
+    def fichiers(self):
+        """Nombre de fichiers fusionnés dans le paquet"""
+        return sum(1 for resultat in self.resultats if resultat.reussi)
+
+
+def fusionner_pdfs(fichiers, dossier_sortie, nom="fusion", pages_par_paquet=None,
+                   fichiers_par_paquet=None, controle=None):
+    """Fusionne ``fichiers`` dans l'ordre, en un seul PDF ``nom.pdf`` ou en paquets
+    ``nom_001.pdf``, ``nom_002.pdf``...
+
+    Produit un ResultatConversion par fichier source, dans l'ordre des
+    fichiers, dont la sortie est le paquet qui le contient, dès que ce
+    paquet est écrit. Un fichier illisible est signalé en échec sans
+    interrompre la fusion. Chaque paquet est écrit dans un dossier
+    temporaire puis renommé.
+    """
+    avec_paquets = bool(pages_par_paquet or fichiers_par_paquet)
+    numero = 0
+    paquet = None
+
+    def nouveau_paquet():
+        nonlocal numero
+        numero += 1
+        nom_sortie = f"{nom}_{numero:03d}.pdf" if avec_paquets else f"{nom}.pdf"
+        return _Paquet(os.path.join(dossier_sortie, nom_sortie))
+
+    def paquet_plein(paquet, pages_a_ajouter):
+        if fichiers_par_paquet and paquet.fichiers >= fichiers_par_paquet:
+            return True
+        # Un fichier plus grand que le paquet à lui seul forme son propre paquet
+        return bool(pages_par_paquet and paquet.fichiers
+                    and paquet.pages + pages_a_ajouter > pages_par_paquet)
+
+    for fichier in fichiers:
+        if controle is not None and not controle.continuer():
+            break
+        debut = time.perf_counter()
+        resultat = ResultatConversion(fichier, taille_entree=_taille(fichier))
+        plein = None
+        with collecter() as etapes:
+            try:
+                with mesures.etape("decodage", lus=resultat.taille_entree):
+                    source = _ouvrir_pdf(fichier)
+                with source:
+                    if paquet is not None and paquet_plein(paquet, source.page_count):
+                        plein, paquet = paquet, None
+                    if paquet is None:
+                        paquet = nouveau_paquet()
+                    with mesures.etape("transformation"):
+                        paquet.doc.insert_pdf(source)
+            except Exception as e:
+                resultat.erreur = f"{type(e).__name__}: {e}"
+                resultat.type_erreur = type(e).__name__
+        resultat.duree = time.perf_counter() - debut
+        resultat.etapes = etapes
+        if plein is not None:
+            yield from _publier(plein, dossier_sortie)
+        if paquet is not None:
+            # Un échec attend que les fichiers qui le précèdent dans le paquet soient écrits
+            paquet.resultats.append(resultat)
+        else:
+            yield resultat
+
+    if paquet is not None:
+        if paquet.fichiers:
+            yield from _publier(paquet, dossier_sortie)
+        else:
+            paquet.doc.close()
+            yield from paquet.resultats
+
+
+def _publier(paquet, dossier_sortie):
+    """Écrit le paquet, le renomme à sa place définitive et produit ses résultats.
+
+    L'écriture est comptée dans les étapes du dernier fichier fusionné.
+    """
+    dernier = [resultat for resultat in paquet.resultats if resultat.reussi][-1]
+    debut = time.perf_counter()
+    temporaire = tempfile.mkdtemp(prefix=f"{PREFIXE_TEMPORAIRE}{os.getpid()}-",
+                                  dir=dossier_sortie)
+    erreur = None
+    with collecter() as etapes:
+        try:
+            chemin_temporaire = os.path.join(temporaire, os.path.basename(paquet.chemin))
+            _enregistrer(paquet.doc, chemin_temporaire)
+            with mesures.etape("publication"):
+                os.replace(chemin_temporaire, paquet.chemin)
+        except Exception as e:
+            erreur = e
+        finally:
+            paquet.doc.close()
+            shutil.rmtree(temporaire, ignore_errors=True)
+    dernier.duree += time.perf_counter() - debut
+    dernier.etapes = (dernier.etapes or []) + etapes
+
+    for resultat in paquet.resultats:
+        if resultat.reussi:
+            if erreur is None:
+                resultat.sortie = paquet.chemin
+            else:
+                resultat.erreur = f"{type(erreur).__name__}: {erreur}"
+                resultat.type_erreur = type(erreur).__name__
+        yield resultat
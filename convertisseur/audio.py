@@ -0,0 +1,149 @@
+"""Conversion de fichiers audio.
+
+Le moteur ffmpeg relie décodage et encodage dans un seul processus:
+l'audio circule par petits blocs et la mémoire utilisée ne dépend pas
+de la durée du fichier. Quand le codec source convient déjà au format
+demandé (AAC → M4A, FLAC → FLAC...), le flux est simplement recopié
+dans le nouveau conteneur, sans perte. pydub, qui décode tout le
+fichier en mémoire, ne sert qu'en secours.
+"""
+
+import os
+from pathlib import Path
+
+from . import ffmpeg, mesures
+from .disponibilite import PYDUB_AVAILABLE
+from .lots import convertir_lot
+
+
+FORMATS = ["MP3", "WAV", "OGG", "FLAC", "AAC", "M4A"]
+EXTENSIONS = ('.mp3', '.wav', '.ogg', '.flac', '.aac', '.m4a', '.wma')
+MOTEURS = {"Automatique": "auto", "FFmpeg (flux)": "ffmpeg", "pydub": "pydub"}
+
+# format de sortie → (conteneur ffmpeg/pydub, encodeur, codecs sources recopiables, avec bitrate)
+CONTENEURS = {
+    "mp3": ("mp3", "libmp3lame", ("mp3",), True),
+    "wav": ("wav", "pcm_s16le", ("pcm_s16le",), False),
+    "ogg": ("ogg", "libvorbis", ("vorbis", "opus"), True),
+    "flac": ("flac", "flac", ("flac",), False),
+    "aac": ("adts", "aac", ("aac",), True),
+    "m4a": ("mp4", "aac", ("aac", "alac"), True),
+}
+
+
+def charger():
+    """Importe pydub à la première utilisation"""
+    from pydub import AudioSegment
+    binaire = ffmpeg.trouver_binaire("ffmpeg")
+    if binaire:
+        # pydub ne cherche que dans le PATH (pas le binaire d'imageio-ffmpeg)
+        AudioSegment.converter = binaire
+    return AudioSegment
+
+
+def choisir_moteur(moteur="auto"):
+    """Résout "auto" en "ffmpeg" si le binaire est présent, sinon "pydub" """
+    if moteur == "auto":
+        return "ffmpeg" if ffmpeg.ffmpeg_disponible() else "pydub"
+    return moteur
+
+
+def _kbps(bitrate):
+    """ "256k" → 256"""
+    try:
+        return int(str(bitrate).lower().rstrip("k"))
+    except ValueError:
+        return None
+
+
+def peut_recopier(source, format_sortie, bitrate="256k"):
+    """Vrai si le flux ``source`` (codec, débit) peut être recopié tel quel.
+
+    Un flux avec perte n'est recopié que si son débit ne dépasse pas
+    celui demandé: le réencoder ne ferait que dégrader le son.
+    """
+    if source is None or format_sortie not in CONTENEURS:
+        return False
+    codec, debit = source
+    _, _, recopiables, avec_bitrate = CONTENEURS[format_sortie]
+    if codec not in recopiables:
+        return False
+    if not avec_bitrate:
+        return True
+    demande = _kbps(bitrate)
+    return debit is not None and demande is not None and debit <= demande
+
+
+def arguments_ffmpeg(fichier, chemin_sortie, format_sortie, bitrate="256k", recopier=False):
+    """Arguments ffmpeg (hors options globales) pour une conversion audio"""
+    conteneur, encodeur, _, avec_bitrate = CONTENEURS[format_sortie]
+    arguments = ["-i", fichier, "-map", "0:a:0", "-map_metadata", "0", "-vn"]
+    if recopier:
+        arguments += ["-c:a", "copy"]
+    else:
+        arguments += ["-c:a", encodeur]
+        if avec_bitrate:
+            arguments += ["-b:a", bitrate]
+    return arguments + ["-f", conteneur, chemin_sortie]
+
+
+def convertir_audio(fichier, dossier_sortie, format_sortie, bitrate="256k", moteur="auto"):
+    """Convertit un fichier audio et retourne le chemin du fichier produit"""
+    format_sortie = format_sortie.lower()
+    moteur = choisir_moteur(moteur)
+
+    # Nom de sortie
+    nom_base = Path(fichier).stem
+    nom_sortie = f"{nom_base}.{format_sortie}"
+    chemin_sortie = os.path.join(dossier_sortie, nom_sortie)
+
+    if moteur == "ffmpeg" and format_sortie in CONTENEURS:
+        with mesures.etape("sondage"):
+            recopier = peut_recopier(ffmpeg.sonder_audio(fichier), format_sortie, bitrate)
+        with mesures.etape("ffmpeg", lus=os.path.getsize(fichier)) as mesure:
+            ffmpeg.executer_ffmpeg(arguments_ffmpeg(fichier, chemin_sortie, format_sortie,
+                                                    bitrate, recopier))
+            mesure.ecrits = os.path.getsize(chemin_sortie)
+    else:
+        _convertir_pydub(fichier, chemin_sortie, format_sortie, bitrate)
+
+    return chemin_sortie
+
+
+def convertir_audios_lot(fichiers, dossier_sortie, format_sortie, bitrate="256k", moteur="auto",
+                         conversions=None, controle=None, cache=None, reprendre=False,
+                         racine=None):
+    """Convertit plusieurs fichiers audio simultanément, résultats dans l'ordre des fichiers.
+
+    Chaque encodeur audio n'utilise qu'un cœur: par défaut, une conversion
+    par cœur. Avec ffmpeg, le travail se fait dans des sous-processus et un
+    pool de fils suffit; pydub décode en Python et utilise des processus.
+    """
+    moteur = choisir_moteur(moteur)
+    options = {"format": format_sortie.lower(), "bitrate": bitrate, "moteur": moteur}
+    return convertir_lot(convertir_audio, fichiers, dossier_sortie, format_sortie, bitrate, moteur,
+                         options=options, cache=cache, reprendre=reprendre,
+                         taille_pool=conversions,
+                         pool="fils" if moteur == "ffmpeg" else "processus",
+                         controle=controle, racine=racine)
+
+
+def _convertir_pydub(fichier, chemin_sortie, format_sortie, bitrate):
+    if not PYDUB_AVAILABLE:
+        raise RuntimeError("Ni ffmpeg ni pydub ne sont disponibles")
+
+    # Charger l'audio (entièrement décodé en mémoire)
+    with mesures.etape("decodage", lus=os.path.getsize(fichier)):
+        audio = charger().from_file(fichier)
+
+    # Exporter
+    with mesures.etape("encodage") as mesure:
+        if format_sortie in CONTENEURS:
+            conteneur, _, _, avec_bitrate = CONTENEURS[format_sortie]
+            if avec_bitrate:
+                audio.export(chemin_sortie, format=conteneur, bitrate=bitrate)
+            else:
+                audio.export(chemin_sortie, format=conteneur)
+        else:
+            audio.export(chemin_sortie, format=format_sortie)
+        mesure.ecrits = os.path.getsize(chemin_sortie)
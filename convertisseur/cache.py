@@ -0,0 +1,212 @@
+"""Cache persistant des conversions, indexé par le contenu des fichiers.
+
+La clé d'une conversion combine l'empreinte SHA-256 du fichier d'entrée
+et l'ensemble des options (format, qualité, taille, bitrate, codec,
+résolution...). Si la clé est connue, la sortie précédente est reliée
+(lien physique, ou copie entre deux disques) au lieu d'être recalculée.
+
+Pour éviter de relire un fichier inchangé, son empreinte est mémorisée
+avec sa taille et sa date de modification. Le cache est borné en taille:
+les entrées les moins récemment utilisées sont supprimées en premier.
+
+Sorties et objets du cache partagent le même inode quand c'est possible:
+la taille et la date de chaque objet sont mémorisées pour détecter une
+sortie réécrite sur place depuis, dont l'entrée est alors abandonnée.
+
+L'index est une base SQLite (mode WAL) partagée sans risque entre les
+processus d'un même lot.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from . import mesures
+from .flux import projection_utile, projeter
+from .resultats import ResultatConversion
+
+TAILLE_MAX_DEFAUT = 2 * 1024 ** 3  # 2 Gio
+
+
+def dossier_cache_par_defaut():
+    """~/.cache/convertisseur (ou $XDG_CACHE_HOME/convertisseur)"""
+    racine = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(racine, "convertisseur")
+
+
+def empreinte_contenu(fichier, taille_bloc=1024 * 1024):
+    """SHA-256 du contenu d'un fichier, lu par blocs (gros fichiers: projeté en mémoire, sans copie)"""
+    if projection_utile(fichier):
+        with projeter(fichier) as projection:
+            return hashlib.sha256(projection).hexdigest()
+    hachage = hashlib.sha256()
+    with open(fichier, "rb") as f:
+        for bloc in iter(lambda: f.read(taille_bloc), b""):
+            hachage.update(bloc)
+    return hachage.hexdigest()
+
+
+def relier(source, destination):
+    """Crée ``destination`` avec le contenu de ``source`` (lien physique si possible)"""
+    if os.path.exists(destination):
+        if os.path.samefile(source, destination):
+            return
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+class CacheConversion:
+    """Cache de conversions stocké dans ``dossier`` et limité à ``taille_max`` octets.
+
+    L'objet ne contient que des chemins et des nombres: il peut être
+    transmis aux processus de travail.
+    """
+
+    def __init__(self, dossier=None, taille_max=TAILLE_MAX_DEFAUT):
+        self.dossier = dossier or dossier_cache_par_defaut()
+        self.taille_max = taille_max
+
+    # ----- Index -----
+
+    def _connexion(self):
+        os.makedirs(self.dossier, exist_ok=True)
+        connexion = sqlite3.connect(os.path.join(self.dossier, "index.sqlite"), timeout=30)
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.executescript("""
+            CREATE TABLE IF NOT EXISTS empreintes (
+                chemin TEXT PRIMARY KEY, taille INTEGER, mtime_ns INTEGER, empreinte TEXT);
+            CREATE TABLE IF NOT EXISTS entrees (
+                cle TEXT PRIMARY KEY, suffixe TEXT, taille INTEGER, mtime_ns INTEGER,
+                dernier_acces REAL);
+            CREATE INDEX IF NOT EXISTS entrees_acces ON entrees (dernier_acces);
+        """)
+        return connexion
+
+    def _chemin_objet(self, cle):
+        return os.path.join(self.dossier, "objets", cle[:2], cle)
+
+    def empreinte(self, connexion, fichier):
+        """Empreinte du fichier, recalculée seulement si sa taille ou sa date ont changé"""
+        chemin = os.path.abspath(fichier)
+        etat = os.stat(chemin)
+        ligne = connexion.execute(
+            "SELECT empreinte FROM empreintes WHERE chemin = ? AND taille = ? AND mtime_ns = ?",
+            (chemin, etat.st_size, etat.st_mtime_ns)).fetchone()
+        if ligne:
+            return ligne[0]
+        empreinte = empreinte_contenu(chemin)
+        with connexion:
+            connexion.execute("INSERT OR REPLACE INTO empreintes VALUES (?, ?, ?, ?)",
+                              (chemin, etat.st_size, etat.st_mtime_ns, empreinte))
+        return empreinte
+
+    @staticmethod
+    def cle(empreinte, options):
+        """Clé d'une conversion: contenu d'entrée + options"""
+        description = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(f"{empreinte}\n{description}".encode("utf-8")).hexdigest()
+
+    # ----- Lecture / écriture -----
+
+    def restaurer(self, connexion, cle, destination_sans_suffixe):
+        """Recrée la sortie mise en cache; retourne son chemin ou None"""
+        ligne = connexion.execute("SELECT suffixe, taille, mtime_ns FROM entrees WHERE cle = ?",
+                                  (cle,)).fetchone()
+        if not ligne:
+            return None
+        suffixe, taille, mtime_ns = ligne
+        objet = self._chemin_objet(cle)
+        try:
+            etat = os.stat(objet)
+        except FileNotFoundError:
+            etat = None
+        if etat is None or (etat.st_size, etat.st_mtime_ns) != (taille, mtime_ns):
+            # Objet disparu ou réécrit via un lien physique: entrée invalide
+            self._supprimer(connexion, cle)
+            return None
+        destination = destination_sans_suffixe + suffixe
+        relier(objet, destination)
+        with connexion:
+            connexion.execute("UPDATE entrees SET dernier_acces = ? WHERE cle = ?",
+                              (time.time(), cle))
+        return destination
+
+    def stocker(self, connexion, cle, sortie, suffixe):
+        """Ajoute une sortie au cache puis libère de la place si besoin"""
+        objet = self._chemin_objet(cle)
+        os.makedirs(os.path.dirname(objet), exist_ok=True)
+        temporaire = f"{objet}.{os.getpid()}.tmp"
+        relier(sortie, temporaire)
+        os.replace(temporaire, objet)
+        etat = os.stat(objet)
+        with connexion:
+            connexion.execute("INSERT OR REPLACE INTO entrees VALUES (?, ?, ?, ?, ?)",
+                              (cle, suffixe, etat.st_size, etat.st_mtime_ns, time.time()))
+        self.evincer(connexion)
+
+    def _supprimer(self, connexion, cle):
+        with connexion:
+            connexion.execute("DELETE FROM entrees WHERE cle = ?", (cle,))
+        try:
+            os.remove(self._chemin_objet(cle))
+        except FileNotFoundError:
+            pass
+
+    def evincer(self, connexion):
+        """Supprime les entrées les moins récemment utilisées au-delà de ``taille_max``"""
+        total = connexion.execute("SELECT COALESCE(SUM(taille), 0) FROM entrees").fetchone()[0]
+        if total <= self.taille_max:
+            return
+        for cle, taille in connexion.execute(
+                "SELECT cle, taille FROM entrees ORDER BY dernier_acces").fetchall():
+            if total <= self.taille_max:
+                break
+            self._supprimer(connexion, cle)
+            total -= taille
+
+    def vider(self):
+        """Supprime tout le contenu du cache"""
+        shutil.rmtree(self.dossier, ignore_errors=True)
+
+    def envelopper(self, fonction, **options):
+        """Retourne une version de ``fonction`` qui passe par le cache"""
+        return ConversionEnCache(self, fonction, options)
+
+
+class ConversionEnCache:
+    """Fonction de conversion ``fonction(fichier, dossier_sortie, *args)`` passant par le cache.
+
+    ``options`` décrit tout ce qui influence le fichier produit; les
+    autres arguments (rappels de progression, nombre de fils...) sont
+    transmis à ``fonction`` sans entrer dans la clé.
+    """
+
+    def __init__(self, cache, fonction, options):
+        self.cache = cache
+        self.fonction = fonction
+        self.options = dict(options, fonction=f"{fonction.__module__}.{fonction.__qualname__}")
+
+    def __call__(self, fichier, dossier_sortie, *args):
+        nom_base = Path(fichier).stem
+        with mesures.etape("cache"), closing(self.cache._connexion()) as connexion:
+            cle = self.cache.cle(self.cache.empreinte(connexion, fichier), self.options)
+            sortie = self.cache.restaurer(connexion, cle, os.path.join(dossier_sortie, nom_base))
+        if sortie:
+            return ResultatConversion(fichier, sortie=sortie, en_cache=True)
+
+        sortie = self.fonction(fichier, dossier_sortie, *args)
+
+        # Le suffixe ("_compressed.pdf", ".jpg"...) suffit à recréer le nom de sortie
+        nom_sortie = os.path.basename(sortie)
+        if nom_sortie.startswith(nom_base):
+            with mesures.etape("cache"), closing(self.cache._connexion()) as connexion:
+                self.cache.stocker(connexion, cle, sortie, nom_sortie[len(nom_base):])
+        return ResultatConversion(fichier, sortie=sortie, en_cache=False)
@@ -0,0 +1,457 @@
+"""Interface en ligne de commande: ``python -m convertisseur``
+
+Exemples::
+
+    python -m convertisseur images "photos/*.png" -o sortie -f webp --jobs 8
+    python -m convertisseur documents "rapports/**/*.pdf" -o txt -f txt
+    python -m convertisseur audio "*.flac" -o mp3 -f mp3 --bitrate 192
+    python -m convertisseur video "*.mov" -o mp4 -f mp4 --resolution 1280x720
+    python -m convertisseur images photos/ -o sortie -f webp
+    python -m convertisseur images photos/ -o web --profils "webp:85,jpg:90,webp:80:256x256"
+    python -m convertisseur images depot/ -o sortie -f webp --surveiller --apres supprimer
+    python -m convertisseur documents archives/ -o sortie -f txt --estimer
+    python -m convertisseur documents factures/ -o sortie --fusionner factures --pages-par-paquet 5000
+
+Un dossier donné en entrée est exploré avec ses sous-dossiers au fil de
+la conversion; son arborescence est reproduite dans le dossier de sortie.
+Avec ``--surveiller``, les dossiers restent surveillés et chaque fichier
+qui y arrive est converti dès que son écriture est terminée. ``--estimer``
+lit seulement les en-têtes pour annoncer la durée du lot et les fichiers
+qui échoueront.
+
+Seuls les modules de la catégorie choisie sont importés: ni tkinter, ni
+moviepy, ni PyMuPDF ne sont chargés s'ils ne sont pas nécessaires.
+"""
+
+import argparse
+import glob
+import importlib
+import os
+import signal
+import sys
+import threading
+import time
+from itertools import chain
+
+from .cache import TAILLE_MAX_DEFAUT, CacheConversion
+from .decouverte import parcourir
+from .estimation import mesurer_lot
+from .lots import convertir_lot, nombre_processus_par_defaut
+from .mesures import exporter_trace, profiler, resume_etapes
+from .rapport import exporter_rapport, fichiers_en_echec, lire_rapport, racine_rapport
+from .resultats import bilan_cache, formater_taille
+
+CATEGORIES = ("images", "documents", "audio", "video")
+
+
+def lire_taille(texte):
+    """Convertit "1280x720" en (1280, 720)"""
+    try:
+        largeur, hauteur = texte.lower().split('x')
+        return int(largeur), int(hauteur)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"dimensions invalides: {texte!r} (attendu LARGEURxHAUTEUR)")
+
+
+def lire_profils(texte):
+    """Profils de sortie d'image (voir images.lire_profils)"""
+    # Import à la demande: Pillow n'est chargé que si --profils est utilisé
+    from .images import lire_profils as analyser
+    try:
+        return analyser(texte)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def developper_entrees(motifs):
+    """Développe les motifs glob (``**`` compris) en liste de fichiers sans doublons"""
+    fichiers = []
+    vus = set()
+    for motif in motifs:
+        correspondances = sorted(glob.glob(motif, recursive=True))
+        if not correspondances and os.path.isfile(motif):
+            correspondances = [motif]
+        for fichier in correspondances:
+            if os.path.isfile(fichier) and fichier not in vus:
+                vus.add(fichier)
+                fichiers.append(fichier)
+    return fichiers
+
+
+def lancer_conversion(args, fichiers):
+    """Retourne l'itérateur de ResultatConversion pour la catégorie demandée.
+
+    L'import du module de la catégorie est fait ici, à la demande.
+    """
+    cache = None
+    if args.cache:
+        cache = CacheConversion(args.dossier_cache, args.cache_max * 1024 * 1024)
+
+    if args.categorie == "video":
+        from .video import convertir_videos_lot
+        return convertir_videos_lot(fichiers, args.sortie, args.format, args.codec,
+                                    args.resolution, args.moteur,
+                                    conversions=args.jobs, fils=args.fils, cache=cache,
+                                    reprendre=args.reprendre, racine=args.racine)
+    if args.categorie == "images" and args.profils:
+        from .images import convertir_images_profils_lot
+        return convertir_images_profils_lot(fichiers, args.sortie, args.profils, args.jobs,
+                                            mode_redim=args.redim, reprendre=args.reprendre,
+                                            racine=args.racine)
+    if args.categorie == "images":
+        from .images import convertir_images_lot
+        return convertir_images_lot(fichiers, args.sortie, args.format, args.qualite,
+                                    args.taille, args.jobs, mode_redim=args.redim, cache=cache,
+                                    reprendre=args.reprendre, racine=args.racine,
+                                    memoire_max=args.memoire_max)
+
+    if args.categorie == "audio":
+        from .audio import convertir_audios_lot
+        return convertir_audios_lot(fichiers, args.sortie, args.format, f"{args.bitrate}k",
+                                    conversions=args.jobs, cache=cache,
+                                    reprendre=args.reprendre, racine=args.racine)
+
+    if args.fusionner:
+        from .assemblage_pdf import fusionner_pdfs
+        return fusionner_pdfs(fichiers, args.sortie, args.fusionner, args.pages_par_paquet,
+                              args.fichiers_par_paquet)
+    if args.decouper:
+        from .assemblage_pdf import decouper_pdf
+        return convertir_lot(decouper_pdf, fichiers, args.sortie, args.decouper,
+                             options={"pages_par_partie": args.decouper},
+                             reprendre=args.reprendre, taille_pool=args.jobs, racine=args.racine)
+
+    from .documents import convertir_documents_lot
+    return convertir_documents_lot(fichiers, args.sortie, args.format, args.processus_pdf,
+                                   args.pdf_dpi, args.pdf_qualite, args.jobs, cache=cache,
+                                   reprendre=args.reprendre, racine=args.racine)
+
+
+def creer_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m convertisseur",
+        description="Convertisseur Universel sans interface graphique")
+    parser.add_argument("categorie", choices=CATEGORIES,
+                        help="type de fichiers à convertir")
+    parser.add_argument("entrees", nargs="*", metavar="ENTREE",
+                        help="fichiers, motifs glob (ex: 'photos/**/*.png') ou dossiers "
+                             "(explorés avec leurs sous-dossiers)")
+    parser.add_argument("-o", "--sortie", required=True,
+                        help="dossier de destination (créé si besoin)")
+    parser.add_argument("-f", "--format",
+                        help="format de sortie (jpg, png, txt, docx, mp3, mp4, ...); "
+                             "obligatoire sauf avec --profils")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="nombre de conversions parallèles (défaut: nombre de cœurs; "
+                             "en vidéo, réparti selon la résolution)")
+
+    parser.add_argument("--reprendre", action="store_true",
+                        help="sauter les fichiers déjà terminés d'après le journal que chaque "
+                             "lot tient dans son dossier de sortie (reprise d'un lot "
+                             "interrompu, qu'il ait été lancé avec ou sans --reprendre)")
+
+    groupe = parser.add_argument_group("rapport")
+    groupe.add_argument("--rapport", metavar="FICHIER",
+                        help="écrire le résultat de chaque fichier (statut, erreur, durée, "
+                             "tailles) en JSON (.json) ou CSV")
+    groupe.add_argument("--reessayer", metavar="RAPPORT",
+                        help="ne relancer que les fichiers en échec d'un rapport précédent")
+
+    groupe = parser.add_argument_group("estimation")
+    groupe.add_argument("--estimer", action="store_true",
+                        help="ne rien convertir: lire les en-têtes, estimer le travail et la "
+                             "durée du lot, et signaler les fichiers qui échoueront")
+    groupe.add_argument("--mesurer-debit", action="store_true",
+                        help="retenir le débit de ce lot pour les prochaines estimations "
+                             "(fait d'office avec --cache)")
+
+    groupe = parser.add_argument_group("mesures")
+    groupe.add_argument("--profil", action="store_true",
+                        help="afficher le temps passé par étape (décodage, encodage...)")
+    groupe.add_argument("--trace", metavar="FICHIER",
+                        help="exporter les étapes de chaque fichier: trace Chrome (.json) ou CSV")
+    groupe.add_argument("--cprofile", action="store_true",
+                        help="convertir le premier fichier seul sous cProfile et tracemalloc")
+
+    groupe = parser.add_argument_group("surveillance")
+    groupe.add_argument("--surveiller", action="store_true",
+                        help="surveiller les dossiers d'entrée et convertir chaque nouveau "
+                             "fichier (Ctrl+C pour arrêter)")
+    groupe.add_argument("--intervalle", type=float, default=2.0,
+                        help="secondes entre deux examens des dossiers (défaut: %(default)s)")
+    groupe.add_argument("--stabilite", type=float, default=2.0,
+                        help="secondes sans changement avant de convertir un fichier, pour "
+                             "ne pas prendre un fichier en cours de copie (défaut: %(default)s)")
+    groupe.add_argument("--apres", choices=("garder", "deplacer", "supprimer"), default="garder",
+                        help="sort de l'original après une conversion réussie (défaut: garder)")
+    groupe.add_argument("--archive", metavar="DOSSIER",
+                        help="destination des originaux avec --apres deplacer")
+    groupe.add_argument("--metriques", metavar="FICHIER",
+                        help="tenir à jour un fichier JSON de métriques (débit, file d'attente, "
+                             "latence)")
+
+    groupe = parser.add_argument_group("cache")
+    groupe.add_argument("--cache", action="store_true",
+                        help="reprendre les sorties des fichiers déjà convertis avec les mêmes options")
+    groupe.add_argument("--dossier-cache",
+                        help="emplacement du cache (défaut: ~/.cache/convertisseur)")
+    groupe.add_argument("--cache-max", type=int, default=TAILLE_MAX_DEFAUT // (1024 * 1024),
+                        help="taille maximale du cache en Mo (défaut: %(default)s)")
+
+    groupe = parser.add_argument_group("images")
+    groupe.add_argument("--qualite", type=int, default=95,
+                        help="qualité JPG de 1 à 100 (défaut: 95)")
+    groupe.add_argument("--taille", type=lire_taille,
+                        help="redimensionner en LARGEURxHAUTEUR")
+    groupe.add_argument("--redim", choices=("exact", "rapide", "ajuster"), default="exact",
+                        help="exact: LANCZOS sur l'image complète; rapide: décodage à échelle "
+                             "réduite; ajuster: rapide en gardant les proportions")
+    groupe.add_argument("--memoire-max", type=int, metavar="MO",
+                        help="mémoire maximale par image décodée: au-delà, l'image est réduite "
+                             "bande par bande (TIFF, BMP non compressés) ou refusée; remplace "
+                             "la protection de Pillow contre les bombes de décompression")
+    groupe.add_argument("--profils", type=lire_profils, metavar="PROFILS",
+                        help="plusieurs sorties par image, décodée une seule fois: "
+                             "FORMAT[:QUALITE[:LARGEURxHAUTEUR]] séparés par des virgules "
+                             "(ex: 'webp:85,jpg:90,webp:80:256x256'); remplace -f, "
+                             "--qualite et --taille")
+
+    groupe = parser.add_argument_group("documents")
+    groupe.add_argument("--processus-pdf", type=int, default=1,
+                        help="processus se partageant les pages d'un même PDF (PDF → TXT)")
+    groupe.add_argument("--pdf-dpi", type=int,
+                        help="PDF → PDF: rééchantillonner les images au-delà de cette "
+                             "résolution (défaut: images conservées)")
+    groupe.add_argument("--pdf-qualite", type=int, default=75,
+                        help="PDF → PDF: qualité JPEG des images rééchantillonnées (défaut: 75)")
+    groupe.add_argument("--fusionner", metavar="NOM",
+                        help="fusionner les PDF d'entrée, dans l'ordre, en NOM.pdf (pages "
+                             "recopiées sans être réinterprétées)")
+    groupe.add_argument("--pages-par-paquet", type=int, metavar="N",
+                        help="avec --fusionner: paquets NOM_001.pdf, NOM_002.pdf... d'au plus "
+                             "N pages (mémoire bornée)")
+    groupe.add_argument("--fichiers-par-paquet", type=int, metavar="N",
+                        help="avec --fusionner: paquets d'au plus N fichiers")
+    groupe.add_argument("--decouper", type=int, metavar="N",
+                        help="découper chaque PDF en parties de N pages")
+
+    groupe = parser.add_argument_group("audio")
+    groupe.add_argument("--bitrate", type=int, default=256,
+                        help="bitrate en kbps (défaut: 256)")
+
+    groupe = parser.add_argument_group("vidéo")
+    groupe.add_argument("--codec", default="libx264",
+                        help="codec vidéo: libx264, libx265, mpeg4 ou copy (défaut: libx264)")
+    groupe.add_argument("--resolution", type=lire_taille,
+                        help="résolution de sortie LARGEURxHAUTEUR (défaut: originale)")
+    groupe.add_argument("--moteur", choices=("auto", "ffmpeg", "moviepy"), default="auto",
+                        help="ffmpeg direct ou moviepy (défaut: ffmpeg s'il est présent)")
+    groupe.add_argument("--fils", type=int,
+                        help="fils d'encodage par conversion (défaut: cœurs / --jobs)")
+    return parser
+
+
+def main(argv=None):
+    parser = creer_parser()
+    args = parser.parse_args(argv)
+    if args.profils and args.categorie != "images":
+        parser.error("--profils ne s'applique qu'aux images")
+    if args.fusionner or args.decouper:
+        if args.categorie != "documents" or (args.fusionner and args.decouper):
+            parser.error("--fusionner ou --decouper (l'un ou l'autre) ne s'appliquent "
+                         "qu'aux documents")
+        if (args.format or "pdf").lower() != "pdf" or args.surveiller or args.estimer:
+            parser.error("--fusionner et --decouper produisent des PDF, hors surveillance "
+                         "et estimation")
+        args.format = "pdf"
+    if (args.pages_par_paquet or args.fichiers_par_paquet) and not args.fusionner:
+        parser.error("--pages-par-paquet et --fichiers-par-paquet s'utilisent avec --fusionner")
+    if not args.format and not args.profils:
+        parser.error("l'argument -f/--format est obligatoire")
+    if args.surveiller:
+        return surveiller(parser, args)
+
+    dossiers = [entree for entree in args.entrees if os.path.isdir(entree)]
+    fichiers = developper_entrees([entree for entree in args.entrees if entree not in dossiers])
+    racine_reessai = None
+    if args.reessayer:
+        rapport = lire_rapport(args.reessayer)
+        fichiers += [f for f in fichiers_en_echec(rapport) if f not in fichiers]
+        # Les sorties relancées reprennent leur place dans l'arborescence du premier lot
+        racine_reessai = racine_rapport(rapport)
+        if not fichiers and not dossiers:
+            print("Aucun fichier en échec dans ce rapport: rien à relancer")
+            return 0
+    if not fichiers and not dossiers:
+        parser.error("aucun fichier ne correspond aux entrées")
+    os.makedirs(args.sortie, exist_ok=True)
+
+    total = len(fichiers)
+    args.racine = racine_reessai
+    if dossiers:
+        # Exploration au fil de la conversion: le total n'est pas connu à l'avance
+        extensions = importlib.import_module(f".{args.categorie}", __package__).EXTENSIONS
+        if args.fusionner or args.decouper:
+            extensions = (".pdf",)
+        args.racine = os.path.commonpath([os.path.abspath(d) for d in dossiers]
+                                         + ([racine_reessai] if racine_reessai else []))
+        fichiers = chain(fichiers, *(parcourir(d, extensions, exclure=[args.sortie])
+                                     for d in dossiers))
+        total = None
+
+    if args.estimer:
+        return estimer_lot(args, fichiers)
+
+    if args.cprofile:
+        premier = next(iter(fichiers), None)
+        if premier is None:
+            parser.error("aucun fichier ne correspond aux entrées")
+        return profiler_un_fichier(args, premier)
+
+    succes = 0
+    echecs = 0
+    resultats = []
+    for i, resultat in enumerate(lancer_conversion(args, fichiers)):
+        resultats.append(resultat)
+        position = f"[{i+1}/{total}]" if total else f"[{i+1}]"
+        if resultat.reussi:
+            succes += 1
+            gain = ""
+            # Optimisation PDF → PDF seulement: en fusion ou découpage, les tailles ne se comparent pas
+            optimisation = (args.format or "").lower() == "pdf" and not (args.fusionner
+                                                                         or args.decouper)
+            if optimisation and resultat.gain is not None:
+                gain = (f" ({formater_taille(resultat.taille_entree)} → "
+                        f"{formater_taille(resultat.taille_sortie)}, "
+                        f"{-resultat.gain * 100:+.0f} %)")
+            sorties = ", ".join(resultat.sorties) if resultat.sorties else resultat.sortie
+            print(f"{position} ✓ {resultat.fichier} → {sorties}{gain}")
+        else:
+            echecs += 1
+            print(f"{position} ✗ {resultat.fichier}: {resultat.erreur}",
+                  file=sys.stderr)
+
+    print(f"\n✅ Conversion terminée: {succes} réussi(s), {echecs} échec(s)")
+    if (args.cache or args.mesurer_debit) and not (args.fusionner or args.decouper):
+        # Débit de ce lot, pour les prochaines estimations
+        mesurer_lot(args.categorie, args.format, resultats, options_estimation(args))
+    repris = sum(1 for r in resultats if r.repris)
+    if repris:
+        print(f"⏭️  Déjà terminés lors d'un lot précédent: {repris}")
+    if args.cache:
+        reutilises, convertis = bilan_cache(resultats)
+        print(f"♻️  Cache: {reutilises} réutilisé(s), {convertis} converti(s)")
+    if args.profil:
+        print("⏱️  Étapes:")
+        for ligne in resume_etapes(resultats):
+            print(f"   {ligne}")
+    if args.trace:
+        print(f"📊 Trace: {exporter_trace(resultats, args.trace)}")
+    if args.rapport:
+        contexte = {"categorie": args.categorie, "format": args.format,
+                    "sortie": os.path.abspath(args.sortie)}
+        print(f"📋 Rapport: {exporter_rapport(resultats, args.rapport, contexte, args.racine)}")
+        if echecs:
+            print(f"   Pour relancer les échecs: --reessayer {args.rapport}")
+    return 1 if echecs else 0
+
+
+def options_estimation(args):
+    """Réglages du lot qui changent le travail de conversion (voir estimation.sonder)"""
+    return {"taille": args.taille, "mode_redim": args.redim, "memoire_max": args.memoire_max,
+            "bitrate": f"{args.bitrate}k", "codec": args.codec, "resolution": args.resolution}
+
+
+def estimer_lot(args, fichiers):
+    """Pré-analyse du lot (``--estimer``): rien n'est converti"""
+    from .estimation import estimer, resume_estimation, sonder_lot
+
+    debut = time.perf_counter()
+    apercus = sonder_lot(args.categorie, fichiers, args.format, options_estimation(args))
+    duree = time.perf_counter() - debut
+    paralleles = args.jobs or nombre_processus_par_defaut()
+    estimation = estimer(apercus, paralleles=paralleles)
+    for ligne in resume_estimation(estimation, paralleles):
+        print(ligne)
+    if apercus:
+        print(f"🔎 En-têtes lus en {duree:.2f} s ({duree * 1000 / len(apercus):.1f} ms/fichier)")
+    return 1 if estimation["echecs_prevus"] else 0
+
+
+def surveiller(parser, args):
+    """Mode service: convertit en continu les fichiers déposés dans les dossiers d'entrée"""
+    from .surveillance import DossierSurveille, ecrire_metriques
+
+    dossiers = args.entrees
+    if not dossiers or not all(os.path.isdir(d) for d in dossiers):
+        parser.error("--surveiller attend un ou plusieurs dossiers en entrée")
+    if args.apres == "deplacer" and not args.archive:
+        parser.error("--apres deplacer nécessite --archive DOSSIER")
+    os.makedirs(args.sortie, exist_ok=True)
+
+    args.racine = os.path.commonpath([os.path.abspath(d) for d in dossiers])
+    extensions = importlib.import_module(f".{args.categorie}", __package__).EXTENSIONS
+    service = DossierSurveille(dossiers, extensions,
+                               lambda fichiers: lancer_conversion(args, fichiers),
+                               racine=args.racine, intervalle=args.intervalle,
+                               stabilite=args.stabilite, apres=args.apres,
+                               archive=args.archive, exclure=[args.sortie])
+
+    # Premier Ctrl+C (ou SIGTERM): arrêt après le lot en cours; second Ctrl+C: arrêt immédiat
+    arret = threading.Event()
+
+    def interrompre(signum, frame):
+        arret.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, interrompre)
+    signal.signal(signal.SIGTERM, interrompre)
+
+    def signaler_resultat(resultat):
+        if resultat.reussi:
+            print(f"✓ {resultat.fichier} → {resultat.sortie}", flush=True)
+        else:
+            print(f"✗ {resultat.fichier}: {resultat.erreur}", file=sys.stderr, flush=True)
+
+    dernier_etat = None
+
+    def signaler_etat(etat):
+        nonlocal dernier_etat
+        if args.metriques:
+            ecrire_metriques(etat, args.metriques)
+        compteurs = (etat["convertis"], etat["echecs"], etat["a_convertir"],
+                     etat["en_attente_stabilite"])
+        if compteurs != dernier_etat:
+            dernier_etat = compteurs
+            print(formater_etat(etat), flush=True)
+
+    print(f"👀 Surveillance de {', '.join(dossiers)} ({service.mode}); Ctrl+C pour arrêter",
+          flush=True)
+    service.executer(arret, signaler_resultat, signaler_etat)
+    print(f"\n⏹️  Surveillance arrêtée. {formater_etat(service.etat())}")
+    return 0
+
+
+def formater_etat(etat):
+    """Ligne de métriques du mode surveillance"""
+    latence = ""
+    if etat["latence_p95_s"] is not None:
+        latence = f", latence {etat['latence_moyenne_s']:.1f} s (p95 {etat['latence_p95_s']:.1f} s)"
+    return (f"📈 {etat['convertis']} converti(s), {etat['echecs']} échec(s), "
+            f"{etat['debit_par_minute']:g}/min, file: {etat['a_convertir']} à convertir, "
+            f"{etat['en_attente_stabilite']} en cours d'écriture{latence}")
+
+
+def profiler_un_fichier(args, fichier):
+    """Convertit ``fichier`` seul, dans ce processus, sous cProfile et tracemalloc"""
+    args.cache = args.reprendre = False
+    args.jobs = 1
+    resultat, rapport = profiler(lambda f: next(iter(lancer_conversion(args, [f]))), fichier)
+    print(rapport)
+    if not resultat.reussi:
+        print(f"✗ {resultat.fichier}: {resultat.erreur}", file=sys.stderr)
+        return 1
+    print(f"✓ {resultat.fichier} → {resultat.sortie}")
+    for ligne in resume_etapes([resultat]):
+        print(f"   {ligne}")
+    return 0
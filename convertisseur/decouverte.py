@@ -0,0 +1,53 @@
+"""Découverte des fichiers d'une arborescence, au fil de la lecture.
+
+``parcourir`` lit les dossiers avec ``os.scandir`` et produit les
+fichiers un par un: un lot peut commencer à convertir avant la fin de
+l'exploration, et la liste complète n'est jamais gardée en mémoire.
+"""
+
+import os
+
+
+def parcourir(dossier, extensions=None, recursif=True, exclure=()):
+    """Fichiers de ``dossier`` (et de ses sous-dossiers) dont l'extension est dans ``extensions``.
+
+    L'ordre est stable (par nom, fichiers d'un dossier avant ses
+    sous-dossiers). Les dossiers cachés et ceux de ``exclure`` (par
+    exemple le dossier de sortie) sont ignorés.
+    """
+    exclus = {os.path.abspath(chemin) for chemin in exclure if chemin}
+    a_visiter = [dossier]
+    while a_visiter:
+        courant = a_visiter.pop()
+        try:
+            with os.scandir(courant) as lecture:
+                entrees = sorted(lecture, key=lambda entree: entree.name)
+        except OSError:
+            continue  # dossier illisible ou supprimé entre-temps
+
+        sous_dossiers = []
+        for entree in entrees:
+            try:
+                if entree.is_dir(follow_symlinks=False):
+                    if (recursif and not entree.name.startswith(".")
+                            and os.path.abspath(entree.path) not in exclus):
+                        sous_dossiers.append(entree.path)
+                elif entree.is_file() and (
+                        extensions is None
+                        or os.path.splitext(entree.name)[1].lower() in extensions):
+                    yield entree.path
+            except OSError:
+                continue
+        a_visiter.extend(reversed(sous_dossiers))
+
+
+def sous_dossier_sortie(fichier, racine, dossier_sortie):
+    """Dossier de sortie de ``fichier`` reproduisant son emplacement sous ``racine``"""
+    try:
+        relatif = os.path.relpath(os.path.dirname(os.path.abspath(fichier)),
+                                  os.path.abspath(racine))
+    except ValueError:  # autre lecteur (Windows)
+        return dossier_sortie
+    if relatif == os.curdir or relatif.startswith(os.pardir):
+        return dossier_sortie
+    return os.path.join(dossier_sortie, relatif)
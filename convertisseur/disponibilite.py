@@ -0,0 +1,43 @@
+"""Détection des bibliothèques optionnelles sans les importer.
+
+``importlib.util.find_spec`` ne fait que localiser le module: le vrai
+import (plusieurs secondes pour moviepy) est repoussé à la première
+conversion qui en a besoin.
+"""
+
+import importlib.util
+import os
+import shutil
+
+
+def module_present(nom):
+    """Vrai si le module ``nom`` est installé"""
+    try:
+        return importlib.util.find_spec(nom) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# Pour PDF (PyMuPDF)
+PDF_AVAILABLE = module_present("fitz")
+
+# Pour DOCX
+DOCX_AVAILABLE = module_present("docx")
+
+# Binaire ffmpeg (PATH, FFMPEG_BINARY ou celui fourni par imageio-ffmpeg)
+FFMPEG_AVAILABLE = bool(os.environ.get("FFMPEG_BINARY") or shutil.which("ffmpeg")
+                        or module_present("imageio_ffmpeg"))
+
+# Pour Audio: ffmpeg directement, ou pydub en secours
+PYDUB_AVAILABLE = module_present("pydub")
+AUDIO_AVAILABLE = FFMPEG_AVAILABLE or PYDUB_AVAILABLE
+
+# Pour Vidéo: ffmpeg directement, ou moviepy en secours
+MOVIEPY_AVAILABLE = module_present("moviepy")
+VIDEO_AVAILABLE = FFMPEG_AVAILABLE or MOVIEPY_AVAILABLE
+
+# Dossiers surveillés: notifications du système (inotify...), sinon scrutation
+WATCHDOG_AVAILABLE = module_present("watchdog")
+
+# Détection de l'encodage des fichiers texte (sinon: UTF-8, puis cp1252)
+CHARSET_NORMALIZER_AVAILABLE = module_present("charset_normalizer")
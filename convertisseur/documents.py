@@ -0,0 +1,186 @@
+"""Conversion de documents (PDF, DOCX, TXT)"""
+
+import importlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import mesures
+from .lots import convertir_lot
+from .disponibilite import DOCX_AVAILABLE, PDF_AVAILABLE
+from .optimisation_pdf import QUALITE_IMAGES_DEFAUT, optimiser_pdf
+from .texte_docx import docx_vers_txt, txt_vers_docx
+
+
+EXTENSIONS = ('.pdf', '.docx', '.txt')
+DPI_IMAGES_PDF = {"Conserver": None, "300 dpi (impression)": 300, "150 dpi (écran)": 150,
+                  "96 dpi": 96, "72 dpi (minimum)": 72}
+# Fusion et découpage de PDF (voir assemblage_pdf): le nombre de pages précise le mode
+MODES_PDF = {"Convertir chaque fichier": None,
+             "Fusionner en un PDF (paquets de N pages, 0 = un seul)": "fusionner",
+             "Découper en parties de N pages": "decouper"}
+
+# Conversions prises en charge: (extension source, format de sortie) → (disponible, bibliothèque)
+CONVERSIONS = {
+    (".pdf", "txt"): (PDF_AVAILABLE, "PyMuPDF"),
+    (".docx", "txt"): (DOCX_AVAILABLE, "python-docx"),
+    (".txt", "docx"): (DOCX_AVAILABLE, "python-docx"),
+    (".pdf", "pdf"): (PDF_AVAILABLE, "PyMuPDF"),
+}
+
+# En dessous, répartir les pages d'un PDF coûte plus qu'il ne rapporte
+PAGES_MIN_PAR_PROCESSUS = 50
+
+
+def formats_disponibles():
+    """Formats de sortie utilisables avec les bibliothèques installées"""
+    formats = []
+    if PDF_AVAILABLE:
+        formats.append("PDF")
+    if DOCX_AVAILABLE:
+        formats.append("DOCX")
+    formats.append("TXT")
+    return formats
+
+
+def probleme_conversion(fichier, format_sortie):
+    """Raison pour laquelle ``fichier`` ne peut pas être converti en ``format_sortie``, ou None"""
+    extension = Path(fichier).suffix.lower()
+    conversion = CONVERSIONS.get((extension, format_sortie.lower()))
+    if conversion is None:
+        return f"Conversion non supportée: {extension} → {format_sortie.lower()}"
+    disponible, bibliotheque = conversion
+    if not disponible:
+        return f"{bibliotheque} n'est pas installé"
+    return None
+
+
+def charger():
+    """Importe à l'avance les bibliothèques PDF / DOCX disponibles"""
+    if PDF_AVAILABLE:
+        importlib.import_module("fitz")
+    if DOCX_AVAILABLE:
+        importlib.import_module("docx")
+
+
+def _extraire_pages(fichier, debut, fin, chemin_sortie):
+    """Écrit le texte des pages [debut, fin) au fil de l'extraction"""
+    import fitz  # PyMuPDF
+    with fitz.open(fichier) as doc, open(chemin_sortie, 'w', encoding='utf-8') as f:
+        for numero in range(debut, fin):
+            f.write(doc[numero].get_text())
+    return chemin_sortie
+
+
+def pdf_vers_txt(fichier, chemin_sortie, processus=1):
+    """Extrait le texte d'un PDF page par page, sans le garder en mémoire.
+
+    Avec plusieurs processus, les pages sont réparties en plages
+    contiguës: chaque processus ouvre son propre document et écrit une
+    partie, puis les parties sont concaténées dans l'ordre.
+    """
+    import fitz  # PyMuPDF
+    with mesures.etape("decodage", lus=os.path.getsize(fichier)):
+        with fitz.open(fichier) as doc:
+            nb_pages = doc.page_count
+
+    processus = max(1, min(processus or 1, nb_pages // PAGES_MIN_PAR_PROCESSUS))
+    if processus == 1:
+        with mesures.etape("extraction") as mesure:
+            _extraire_pages(fichier, 0, nb_pages, chemin_sortie)
+            mesure.ecrits = os.path.getsize(chemin_sortie)
+        return chemin_sortie
+
+    bornes = [nb_pages * i // processus for i in range(processus + 1)]
+    parties = [f"{chemin_sortie}.partie{i}" for i in range(processus)]
+    try:
+        # Le CPU des processus d'extraction n'est pas compté, seul le temps mur l'est
+        with mesures.etape("extraction"):
+            with ProcessPoolExecutor(max_workers=processus) as executeur:
+                futures = [executeur.submit(_extraire_pages, fichier, bornes[i], bornes[i + 1],
+                                            partie)
+                           for i, partie in enumerate(parties)]
+                for future in futures:
+                    future.result()
+        with mesures.etape("encodage") as mesure:
+            with open(chemin_sortie, 'wb') as sortie:
+                for partie in parties:
+                    with open(partie, 'rb') as f:
+                        shutil.copyfileobj(f, sortie)
+            mesure.ecrits = os.path.getsize(chemin_sortie)
+    finally:
+        for partie in parties:
+            if os.path.exists(partie):
+                os.remove(partie)
+    return chemin_sortie
+
+
+def convertir_document(fichier, dossier_sortie, format_sortie, processus_pdf=1,
+                       dpi_images=None, qualite_images=QUALITE_IMAGES_DEFAUT):
+    """Convertit un document et retourne le chemin du fichier produit.
+
+    ``processus_pdf`` répartit l'extraction PDF → TXT d'un gros document
+    sur plusieurs processus. ``dpi_images`` et ``qualite_images`` règlent
+    la recompression des images en PDF → PDF (voir optimisation_pdf).
+    """
+    format_sortie = format_sortie.lower()
+    extension = Path(fichier).suffix.lower()
+    nom_base = Path(fichier).stem
+
+    # PDF vers TXT
+    if extension == '.pdf' and format_sortie == 'txt':
+        if not PDF_AVAILABLE:
+            raise RuntimeError("PyMuPDF n'est pas installé")
+        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}.txt")
+        pdf_vers_txt(fichier, chemin_sortie, processus_pdf)
+
+    # DOCX vers TXT
+    elif extension == '.docx' and format_sortie == 'txt':
+        if not DOCX_AVAILABLE:
+            raise RuntimeError("python-docx n'est pas installé")
+        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}.txt")
+        docx_vers_txt(fichier, chemin_sortie)
+
+    # TXT vers DOCX
+    elif extension == '.txt' and format_sortie == 'docx':
+        if not DOCX_AVAILABLE:
+            raise RuntimeError("python-docx n'est pas installé")
+        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}.docx")
+        txt_vers_docx(fichier, chemin_sortie)
+
+    # PDF vers PDF (optimisation)
+    elif extension == '.pdf' and format_sortie == 'pdf':
+        if not PDF_AVAILABLE:
+            raise RuntimeError("PyMuPDF n'est pas installé")
+        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}_compressed.pdf")
+        optimiser_pdf(fichier, chemin_sortie, dpi_images, qualite_images)
+
+    else:
+        raise ValueError(f"Conversion non supportée: {extension} → {format_sortie}")
+
+    return chemin_sortie
+
+
+def convertir_documents_lot(fichiers, dossier_sortie, format_sortie, processus_pdf=1,
+                            dpi_images=None, qualite_images=QUALITE_IMAGES_DEFAUT,
+                            processus=None, controle=None, cache=None, reprendre=False,
+                            racine=None):
+    """Convertit un lot de documents et produit un ResultatConversion par fichier.
+
+    Avec plusieurs processus, les documents sont soumis du plus long au
+    plus court à convertir, d'après leur nombre de pages (PDF) ou leur
+    taille (voir estimation.couts_estimes): un gros PDF ne reste pas seul
+    en fin de lot. Les résultats restent dans l'ordre des fichiers.
+    """
+    from .estimation import couts_estimes
+
+    format_sortie = format_sortie.lower()
+    options = {"format": format_sortie}
+    if format_sortie == "pdf":
+        options.update(dpi_images=dpi_images, qualite_images=qualite_images)
+    return convertir_lot(convertir_document, fichiers, dossier_sortie, format_sortie,
+                         processus_pdf, dpi_images, qualite_images, options=options,
+                         cache=cache, reprendre=reprendre, taille_pool=processus,
+                         controle=controle, racine=racine,
+                         couts=lambda liste: couts_estimes("documents", liste, format_sortie))
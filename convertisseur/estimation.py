@@ -0,0 +1,386 @@
+"""Pré-analyse d'un lot: travail à faire, durée estimée et échecs prévisibles.
+
+Seuls les en-têtes sont lus (dimensions d'une image sans la décoder,
+nombre de pages d'un PDF, durée et flux d'un média): quelques
+millisecondes par fichier, rien n'est converti. Le travail est compté
+dans une unité propre à chaque conversion (mégapixels, pages, secondes
+de média...) puis traduit en durée avec le débit mesuré lors des lots
+précédents (``HistoriqueDebits``), ou un ordre de grandeur par défaut.
+"""
+
+import importlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from .cache import dossier_cache_par_defaut
+
+# Secondes de conversion par unité de travail, tant qu'aucun lot n'a été mesuré
+DEBITS_DEFAUT = {
+    "images": 0.05,              # par mégapixel décodé
+    "documents:.pdf:txt": 0.01,  # par page
+    "documents:.pdf:pdf": 0.1,   # par page
+    "documents": 0.5,            # par Mo (DOCX, TXT)
+    "audio": 0.02,               # par seconde de son réencodée
+    "audio:copie": 0.001,        # par seconde de son recopiée
+    "video": 0.5,                # par seconde de vidéo et par mégapixel produit
+    "video:copy": 0.002,         # par seconde de vidéo recopiée
+}
+
+# Poids d'un nouveau lot dans la moyenne glissante des débits mesurés
+POIDS_MESURE = 0.5
+# Fichiers d'un lot terminé dont l'en-tête est relu pour mesurer le débit
+ECHANTILLON_MESURE = 32
+FILS_SONDAGE = 8
+
+
+@dataclass
+class Apercu:
+    """Ce que l'en-tête d'un fichier annonce du travail de conversion"""
+    fichier: str
+    taille: int = 0
+    cle: Optional[str] = None       # type de conversion ("images:webp", "video:libx264"...)
+    unites: float = 0.0             # quantité de travail, dans l'unité de ``cle``
+    unite: str = ""
+    details: str = ""               # "4000x3000 RGB", "12 pages", "3:25, aac 256 kb/s"...
+    probleme: Optional[str] = None  # raison d'un échec certain
+
+    @property
+    def convertible(self):
+        return self.probleme is None
+
+
+class HistoriqueDebits:
+    """Secondes par unité de travail mesurées lors des lots précédents (fichier JSON)"""
+
+    def __init__(self, chemin=None):
+        self.chemin = chemin or os.path.join(dossier_cache_par_defaut(), "debits.json")
+        try:
+            with open(self.chemin, encoding="utf-8") as f:
+                self.debits = json.load(f)
+        except (OSError, ValueError):
+            self.debits = {}
+
+    def secondes_par_unite(self, cle):
+        """(secondes par unité, mesurée) pour ``cle``, ou la valeur par défaut de sa catégorie"""
+        if cle in self.debits:
+            return self.debits[cle], True
+        categorie = cle.split(":")[0]
+        return DEBITS_DEFAUT.get(cle, DEBITS_DEFAUT.get(categorie, 0.0)), False
+
+    def mesurer(self, cle, unites, secondes):
+        """Intègre la mesure d'un lot: les lots récents pèsent davantage"""
+        if unites <= 0:
+            return
+        mesure = secondes / unites
+        precedent = self.debits.get(cle)
+        self.debits[cle] = mesure if precedent is None else (
+            precedent * (1 - POIDS_MESURE) + mesure * POIDS_MESURE)
+
+    def enregistrer(self):
+        """Écrit les débits par remplacement atomique (un lot concurrent lit l'ancien ou le nouveau)"""
+        dossier = os.path.dirname(self.chemin)
+        os.makedirs(dossier, exist_ok=True)
+        descripteur, temporaire = tempfile.mkstemp(prefix=".debits-", suffix=".tmp", dir=dossier)
+        try:
+            with os.fdopen(descripteur, "w", encoding="utf-8") as f:
+                json.dump(self.debits, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporaire, self.chemin)
+        except BaseException:
+            os.remove(temporaire)
+            raise
+
+
+def sonder(categorie, fichier, format_sortie, options=None):
+    """Apercu de ``fichier``, sans le convertir.
+
+    ``options`` reprend les réglages du lot qui changent le travail ou
+    peuvent le faire échouer: ``taille``, ``mode_redim``, ``memoire_max``
+    (images), ``bitrate`` (audio), ``codec``, ``resolution`` (vidéo).
+    """
+    apercu = Apercu(fichier)
+    try:
+        apercu.taille = os.path.getsize(fichier)
+    except OSError as e:
+        apercu.probleme = f"Fichier illisible: {e.strerror}"
+        return apercu
+    module = importlib.import_module(f".{categorie}", __package__)
+    extension = os.path.splitext(fichier)[1].lower()
+    if extension not in module.EXTENSIONS:
+        apercu.probleme = f"Extension non prise en charge: {extension or '(aucune)'}"
+        return apercu
+    try:
+        _SONDES[categorie](apercu, module, (format_sortie or "").lower(), options or {})
+    except Exception as e:
+        apercu.probleme = f"En-tête illisible: {type(e).__name__}: {e}"
+    return apercu
+
+
+def sonder_lot(categorie, fichiers, format_sortie, options=None, fils=FILS_SONDAGE):
+    """Apercus de ``fichiers``, dans leur ordre.
+
+    La lecture d'un en-tête attend surtout le disque ou ffprobe: quelques
+    fils suffisent à la recouvrir.
+    """
+    with ThreadPoolExecutor(max_workers=fils) as executeur:
+        return list(executeur.map(
+            lambda fichier: sonder(categorie, fichier, format_sortie, options), fichiers))
+
+
+def _sonder_image(apercu, images, format_sortie, options):
+    from PIL import Image
+
+    from .grandes_images import FORMATS_MULTI_IMAGES, ouvrir_sous_garde
+
+    Image.init()
+    if format_sortie and f".{format_sortie}" not in Image.registered_extensions():
+        apercu.probleme = f"Format d'image inconnu: {format_sortie}"
+        return
+    taille = options.get("taille")
+    memoire_max = options.get("memoire_max")
+    try:
+        img = ouvrir_sous_garde(apercu.fichier, memoire_max)
+    except Image.DecompressionBombError as e:
+        apercu.probleme = str(e)
+        return
+    with img:
+        images_source = getattr(img, "n_frames", 1)
+        apercu.details = f"{img.width}x{img.height} {img.mode}"
+        if images_source > 1:
+            apercu.details += f", {images_source} images"
+        if images_source == 1 or format_sortie not in FORMATS_MULTI_IMAGES:
+            if taille:
+                taille = images.reduire_au_decodage(img, taille,
+                                                     options.get("mode_redim", "exact"))
+            try:
+                images.plan_decodage(img, taille, memoire_max)
+            except MemoryError as e:
+                apercu.probleme = str(e)
+                return
+            images_source = 1
+        else:
+            try:
+                images.verifier_sequence(img, taille, options.get("mode_redim", "exact"),
+                                         memoire_max, format_sortie)
+            except MemoryError as e:
+                apercu.probleme = str(e)
+                return
+        pixels = img.width * img.height
+    apercu.cle = f"images:{format_sortie or 'profils'}"
+    apercu.unites = pixels * images_source / 1e6
+    apercu.unite = "Mpx"
+
+
+def _sonder_document(apercu, documents, format_sortie, options):
+    apercu.probleme = documents.probleme_conversion(apercu.fichier, format_sortie)
+    if apercu.probleme:
+        return
+    extension = os.path.splitext(apercu.fichier)[1].lower()
+    apercu.cle = f"documents:{extension}:{format_sortie}"
+    if extension == ".pdf":
+        import fitz
+        with fitz.open(apercu.fichier) as doc:
+            if doc.needs_pass:
+                apercu.probleme = "PDF protégé par un mot de passe"
+                return
+            apercu.unites = doc.page_count
+        apercu.unite = "pages"
+        apercu.details = f"{apercu.unites} pages"
+    else:
+        apercu.unites = apercu.taille / 2**20
+        apercu.unite = "Mo"
+
+
+def _sonder_audio(apercu, audio, format_sortie, options):
+    from . import ffmpeg
+    from .disponibilite import PYDUB_AVAILABLE
+
+    if not ffmpeg.ffmpeg_disponible():
+        if not PYDUB_AVAILABLE:
+            apercu.probleme = "Ni ffmpeg ni pydub ne sont disponibles"
+        else:
+            # pydub: pas de lecture d'en-tête légère, volume du fichier
+            apercu.cle = f"audio:{format_sortie}"
+            apercu.unites, apercu.unite = apercu.taille / 2**20, "Mo"
+        return
+    media = ffmpeg.sonder_media(apercu.fichier)
+    if media["audio"] is None:
+        apercu.probleme = "Aucun flux audio"
+        return
+    codec, debit = media["audio"]
+    apercu.details = f"{_duree(media['duree'])}, {codec}" + (f" {debit} kb/s" if debit else "")
+    if format_sortie not in audio.CONTENEURS and not PYDUB_AVAILABLE:
+        apercu.probleme = f"Format audio non pris en charge sans pydub: {format_sortie}"
+        return
+    recopie = audio.peut_recopier(media["audio"], format_sortie,
+                                  options.get("bitrate", "256k"))
+    apercu.cle = "audio:copie" if recopie else f"audio:{format_sortie}"
+    apercu.unites = media["duree"] or 0.0
+    apercu.unite = "s"
+
+
+def _sonder_video(apercu, video, format_sortie, options):
+    from . import ffmpeg
+
+    if not ffmpeg.ffmpeg_disponible():
+        # Sans ffmpeg (moviepy seul), pas de lecture d'en-tête légère: volume du fichier
+        apercu.cle, apercu.unites, apercu.unite = "video:moviepy", apercu.taille / 2**20, "Mo"
+        return
+    media = ffmpeg.sonder_media(apercu.fichier)
+    if media["video"] is None:
+        apercu.probleme = "Aucun flux vidéo"
+        return
+    codec_source, largeur, hauteur = media["video"]
+    apercu.details = f"{_duree(media['duree'])}, {codec_source}"
+    if largeur and hauteur:
+        apercu.details += f" {largeur}x{hauteur}"
+    codec = options.get("codec", "libx264")
+    resolution = options.get("resolution")
+    if codec == "copy":
+        if resolution:
+            apercu.probleme = "Le codec 'copy' ne permet pas de changer la résolution"
+            return
+        apercu.cle, apercu.unites, apercu.unite = "video:copy", media["duree"] or 0.0, "s"
+        return
+    largeur, hauteur = resolution or (largeur or 1920, hauteur or 1080)
+    apercu.cle = f"video:{codec}"
+    apercu.unites = (media["duree"] or 0.0) * largeur * hauteur / 1e6
+    apercu.unite = "s·Mpx"
+
+
+_SONDES = {"images": _sonder_image, "documents": _sonder_document,
+           "audio": _sonder_audio, "video": _sonder_video}
+
+
+def estimer(apercus, historique=None, paralleles=1):
+    """Totaux d'un lot sondé et durée estimée avec ``paralleles`` conversions simultanées.
+
+    La durée ne descend pas sous celle du plus long fichier: un fichier
+    n'est jamais réparti entre plusieurs conversions.
+    """
+    historique = historique or HistoriqueDebits()
+    travail = {}  # clé → [unité, unités, secondes, mesurée]
+    plus_long = 0.0
+    convertibles = 0
+    for apercu in apercus:
+        if not apercu.convertible:
+            continue
+        convertibles += 1
+        if apercu.cle is None:
+            continue
+        par_unite, mesure = historique.secondes_par_unite(apercu.cle)
+        secondes = apercu.unites * par_unite
+        plus_long = max(plus_long, secondes)
+        ligne = travail.setdefault(apercu.cle, [apercu.unite, 0.0, 0.0, mesure])
+        ligne[1] += apercu.unites
+        ligne[2] += secondes
+    total = sum(ligne[2] for ligne in travail.values())
+    paralleles = max(1, min(paralleles, convertibles or 1))
+    return {"fichiers": len(apercus), "convertibles": convertibles,
+            "octets": sum(a.taille for a in apercus if a.convertible),
+            "echecs_prevus": [a for a in apercus if not a.convertible],
+            "travail": travail, "secondes": max(total / paralleles, plus_long),
+            "mesure": all(ligne[3] for ligne in travail.values())}
+
+
+def couts_estimes(categorie, fichiers, format_sortie, options=None, historique=None):
+    """Durée estimée (secondes) de la conversion de chaque fichier, dans leur ordre.
+
+    Sert à ordonner un lot (voir lots.lot_plus_gros_dabord); un fichier
+    voué à l'échec coûte 0.
+    """
+    historique = historique or HistoriqueDebits()
+    couts = []
+    for apercu in sonder_lot(categorie, fichiers, format_sortie, options):
+        if apercu.convertible and apercu.cle:
+            couts.append(apercu.unites * historique.secondes_par_unite(apercu.cle)[0])
+        else:
+            couts.append(0.0)
+    return couts
+
+
+def mesurer_lot(categorie, format_sortie, resultats, options=None, historique=None):
+    """Met à jour les débits mesurés à partir des résultats d'un lot terminé.
+
+    Seuls les fichiers réellement convertis comptent (ni repris du
+    journal, ni sortis du cache); au plus ECHANTILLON_MESURE d'entre eux,
+    répartis sur le lot, sont relus.
+    """
+    convertis = [r for r in resultats
+                 if r.reussi and not r.repris and r.en_cache is not True and r.duree]
+    if not convertis:
+        return None
+    pas = max(1, len(convertis) // ECHANTILLON_MESURE)
+    echantillon = convertis[::pas][:ECHANTILLON_MESURE]
+    apercus = sonder_lot(categorie, [r.fichier for r in echantillon], format_sortie, options)
+
+    mesures = {}  # clé → [unités, secondes]
+    for resultat, apercu in zip(echantillon, apercus):
+        if apercu.convertible and apercu.cle and apercu.unites > 0:
+            mesure = mesures.setdefault(apercu.cle, [0.0, 0.0])
+            mesure[0] += apercu.unites
+            mesure[1] += resultat.duree
+    historique = historique or HistoriqueDebits()
+    for cle, (unites, secondes) in mesures.items():
+        historique.mesurer(cle, unites, secondes)
+    try:
+        historique.enregistrer()
+    except OSError:
+        pass  # la mesure est perdue, la conversion n'en dépend pas
+    return historique
+
+
+def mesurer_au_fil(resultats, categorie, format_sortie, options=None):
+    """Transmet les résultats d'un lot, puis mesure son débit (``mesurer_lot``)
+    s'il est allé à son terme"""
+    termines = []
+    for resultat in resultats:
+        termines.append(resultat)
+        yield resultat
+    mesurer_lot(categorie, format_sortie, termines, options)
+
+
+def _duree(secondes):
+    if secondes is None:
+        return "durée inconnue"
+    minutes, secondes = divmod(int(round(secondes)), 60)
+    heures, minutes = divmod(minutes, 60)
+    return f"{heures}:{minutes:02d}:{secondes:02d}" if heures else f"{minutes}:{secondes:02d}"
+
+
+def formater_duree(secondes):
+    """ "45 s", "12 min 30 s", "2 h 05 min" """
+    secondes = int(round(secondes))
+    if secondes < 60:
+        return f"{secondes} s"
+    minutes, secondes = divmod(secondes, 60)
+    if minutes < 60:
+        return f"{minutes} min {secondes:02d} s"
+    heures, minutes = divmod(minutes, 60)
+    return f"{heures} h {minutes:02d} min"
+
+
+def resume_estimation(estimation, paralleles=1):
+    """Lignes de texte décrivant une estimation (ligne de commande, interface)"""
+    from .resultats import formater_taille
+
+    lignes = [f"{estimation['convertibles']}/{estimation['fichiers']} fichier(s) convertible(s), "
+              f"{formater_taille(estimation['octets'])}"]
+    for cle, (unite, unites, secondes, mesure) in sorted(estimation["travail"].items()):
+        origine = "débit mesuré" if mesure else "débit par défaut"
+        lignes.append(f"   {cle}: {unites:.1f} {unite} → {formater_duree(secondes)} "
+                      f"de conversion ({origine})")
+    duree = formater_duree(estimation["secondes"])
+    if not estimation["mesure"]:
+        duree += " (ordre de grandeur: aucun lot comparable mesuré)"
+    lignes.append(f"Durée estimée avec {paralleles} conversion(s) simultanée(s): {duree}")
+    echecs = estimation["echecs_prevus"]
+    if echecs:
+        lignes.append(f"{len(echecs)} fichier(s) échoueront:")
+        lignes += [f"   ✗ {a.fichier}: {a.probleme}" for a in echecs]
+    return lignes
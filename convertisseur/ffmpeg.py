@@ -0,0 +1,229 @@
+"""Appels directs au binaire ffmpeg, avec suivi de la progression"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+from . import mesures
+
+_DUREE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+_RESOLUTION = re.compile(r"Video:.*?\b(\d{2,5})x(\d{2,5})\b")
+_AUDIO = re.compile(r"Audio: (\w+)(?:.*?(\d+) kb/s)?")
+_CODEC_VIDEO = re.compile(r"Video: (\w+)")
+
+_binaires = {}
+
+
+def trouver_binaire(nom="ffmpeg"):
+    """Chemin de ffmpeg / ffprobe, ou None s'il est introuvable.
+
+    Cherche dans l'ordre: variable d'environnement (FFMPEG_BINARY,
+    FFPROBE_BINARY), PATH, puis le binaire fourni par imageio-ffmpeg
+    (installé avec moviepy, ffmpeg uniquement).
+    """
+    if nom in _binaires:
+        return _binaires[nom]
+
+    chemin = os.environ.get(f"{nom.upper()}_BINARY") or shutil.which(nom)
+    if chemin is None and nom == "ffmpeg":
+        try:
+            import imageio_ffmpeg
+            chemin = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            chemin = None
+
+    _binaires[nom] = chemin
+    return chemin
+
+
+def ffmpeg_disponible():
+    return trouver_binaire("ffmpeg") is not None
+
+
+def _entete_ffmpeg(fichier):
+    """Informations affichées par ``ffmpeg -i`` (lecture de l'en-tête seulement)"""
+    ffmpeg = trouver_binaire("ffmpeg")
+    if not ffmpeg:
+        return ""
+    sortie = subprocess.run([ffmpeg, "-hide_banner", "-i", fichier],
+                            capture_output=True, text=True, errors="replace")
+    return sortie.stderr
+
+
+def sonder_duree(fichier):
+    """Durée du média en secondes, ou None si elle est inconnue"""
+    ffprobe = trouver_binaire("ffprobe")
+    if ffprobe:
+        sortie = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", fichier],
+            capture_output=True, text=True)
+        try:
+            return float(sortie.stdout.strip())
+        except ValueError:
+            return None
+
+    # Sans ffprobe: ffmpeg affiche la durée en lisant l'en-tête puis s'arrête
+    correspondance = _DUREE.search(_entete_ffmpeg(fichier))
+    if not correspondance:
+        return None
+    heures, minutes, secondes = correspondance.groups()
+    return int(heures) * 3600 + int(minutes) * 60 + float(secondes)
+
+
+def sonder_resolution(fichier):
+    """(largeur, hauteur) du premier flux vidéo, ou None"""
+    ffprobe = trouver_binaire("ffprobe")
+    if ffprobe:
+        sortie = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=width,height", "-of", "csv=p=0", fichier],
+            capture_output=True, text=True)
+        try:
+            largeur, hauteur = sortie.stdout.strip().split(",")[:2]
+            return int(largeur), int(hauteur)
+        except ValueError:
+            return None
+
+    correspondance = _RESOLUTION.search(_entete_ffmpeg(fichier))
+    if not correspondance:
+        return None
+    return int(correspondance.group(1)), int(correspondance.group(2))
+
+
+def sonder_audio(fichier):
+    """(codec, débit en kb/s ou None) du premier flux audio, ou None"""
+    ffprobe = trouver_binaire("ffprobe")
+    if ffprobe:
+        sortie = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "a:0",
+             "-show_entries", "stream=codec_name,bit_rate", "-of", "csv=p=0", fichier],
+            capture_output=True, text=True)
+        champs = sortie.stdout.strip().split(",")
+        if not champs[0]:
+            return None
+        try:
+            debit = int(champs[1]) // 1000
+        except (IndexError, ValueError):
+            debit = None
+        return champs[0], debit
+
+    correspondance = _AUDIO.search(_entete_ffmpeg(fichier))
+    if not correspondance:
+        return None
+    codec, debit = correspondance.groups()
+    return codec, int(debit) if debit else None
+
+
+def sonder_media(fichier):
+    """Durée, flux vidéo et flux audio en une seule lecture de l'en-tête.
+
+    Retourne {"duree": secondes ou None, "video": (codec, largeur, hauteur)
+    ou None, "audio": (codec, débit en kb/s ou None) ou None}.
+    """
+    ffprobe = trouver_binaire("ffprobe")
+    if ffprobe:
+        sortie = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries",
+             "format=duration:stream=codec_type,codec_name,width,height,bit_rate",
+             "-of", "json", fichier],
+            capture_output=True, text=True)
+        try:
+            infos = json.loads(sortie.stdout or "{}")
+        except ValueError:
+            infos = {}
+        media = {"duree": None, "video": None, "audio": None}
+        try:
+            media["duree"] = float(infos.get("format", {}).get("duration"))
+        except (TypeError, ValueError):
+            pass
+        for flux in infos.get("streams", []):
+            if flux.get("codec_type") == "video" and media["video"] is None:
+                media["video"] = (flux.get("codec_name"), flux.get("width"), flux.get("height"))
+            elif flux.get("codec_type") == "audio" and media["audio"] is None:
+                debit = flux.get("bit_rate")
+                media["audio"] = (flux.get("codec_name"),
+                                  int(debit) // 1000 if str(debit).isdigit() else None)
+        return media
+
+    entete = _entete_ffmpeg(fichier)
+    media = {"duree": None, "video": None, "audio": None}
+    correspondance = _DUREE.search(entete)
+    if correspondance:
+        heures, minutes, secondes = correspondance.groups()
+        media["duree"] = int(heures) * 3600 + int(minutes) * 60 + float(secondes)
+    codec = _CODEC_VIDEO.search(entete)
+    if codec:
+        resolution = _RESOLUTION.search(entete)
+        if resolution:
+            media["video"] = (codec.group(1), int(resolution.group(1)), int(resolution.group(2)))
+        else:
+            media["video"] = (codec.group(1), None, None)
+    correspondance = _AUDIO.search(entete)
+    if correspondance:
+        codec, debit = correspondance.groups()
+        media["audio"] = (codec, int(debit) if debit else None)
+    return media
+
+
+def executer_ffmpeg(arguments, duree=None, progression=None):
+    """Lance ffmpeg avec ``arguments`` et suit sa sortie ``-progress``.
+
+    ``progression(fraction)`` est appelée au fil de l'encodage (fraction
+    entre 0 et 1, ou None si la durée est inconnue). Si elle retourne
+    False, ffmpeg est interrompu et InterruptedError est levée.
+    """
+    ffmpeg = trouver_binaire("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg est introuvable")
+
+    commande = [ffmpeg, "-hide_banner", "-nostdin", "-y", "-loglevel", "error",
+                "-nostats", "-progress", "pipe:1"] + list(arguments)
+
+    with tempfile.TemporaryFile() as erreurs:
+        processus = subprocess.Popen(commande, stdout=subprocess.PIPE, stderr=erreurs,
+                                     text=True, errors="replace")
+        try:
+            for ligne in processus.stdout:
+                cle, _, valeur = ligne.strip().partition("=")
+                if progression is None:
+                    continue
+                fraction = None
+                if cle == "out_time_us" and duree:
+                    try:
+                        fraction = min(1.0, int(valeur) / 1e6 / duree)
+                    except ValueError:
+                        continue
+                elif cle == "progress" and valeur == "end":
+                    fraction = 1.0
+                else:
+                    continue
+                if progression(fraction) is False:
+                    processus.kill()
+                    processus.wait()
+                    raise InterruptedError("Conversion annulée")
+        finally:
+            processus.stdout.close()
+            code = _attendre(processus)
+
+        if code != 0:
+            erreurs.seek(0)
+            message = erreurs.read().decode("utf-8", "replace").strip().splitlines()
+            raise RuntimeError(f"ffmpeg a échoué (code {code}): "
+                               f"{message[0] if message else 'erreur inconnue'}")
+
+
+def _attendre(processus):
+    """Attend la fin de ffmpeg et impute son temps CPU à l'étape en cours"""
+    if not hasattr(os, "wait4") or processus.returncode is not None:
+        return processus.wait()
+    try:
+        _, statut, usage = os.wait4(processus.pid, 0)
+    except ChildProcessError:
+        return processus.wait()
+    processus.returncode = os.waitstatus_to_exitcode(statut)
+    mesures.ajouter_cpu(usage.ru_utime + usage.ru_stime)
+    return processus.returncode
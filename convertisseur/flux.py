@@ -0,0 +1,137 @@
+"""Lecture et écriture des fichiers convertis: projection en mémoire, prélecture, tampons.
+
+Sur un stockage réseau (NFS, SMB), lire un fichier par petits morceaux à
+la demande du décodeur alterne calcul et attente du réseau. Ici:
+
+- ``prelecture`` lit à l'avance, dans un fil, les fichiers suivants du
+  lot pendant que le fichier courant est converti: quand un processus de
+  conversion l'ouvre, il est déjà dans le cache du système;
+- ``projeter`` projette un gros fichier en mémoire (mmap) en annonçant
+  une lecture séquentielle, pour que le système lise par grands blocs;
+- ``ouvrir_ecriture`` écrit à travers un tampon large plutôt qu'en
+  petites écritures successives.
+
+Les sorties sont de toute façon écrites dans un dossier temporaire puis
+renommées (voir journal.EcritureAtomique).
+"""
+
+import mmap
+import os
+import queue
+import threading
+
+# Fichiers lus à l'avance pendant la conversion du fichier courant
+PRELECTURE_FICHIERS = 4
+# Au-delà, un fichier n'est pas lu à l'avance: il évincerait du cache les suivants
+PRELECTURE_OCTETS_MAX = 128 * 1024 * 1024
+# En dessous, une lecture ordinaire coûte moins qu'une projection
+SEUIL_PROJECTION = 4 * 1024 * 1024
+TAILLE_BLOC = 1024 * 1024
+TAMPON_ECRITURE = 1024 * 1024
+
+_FIN = object()
+
+
+def prelire(fichier, tampon=None):
+    """Amène ``fichier`` dans le cache du système par une lecture séquentielle.
+
+    Les blocs sont lus dans ``tampon`` (réutilisé d'un fichier à l'autre),
+    sans allocation par bloc. Retourne le nombre d'octets lus.
+    """
+    tampon = tampon or bytearray(TAILLE_BLOC)
+    lus = 0
+    try:
+        with open(fichier, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                n = f.readinto(tampon)
+                if not n:
+                    break
+                lus += n
+    except OSError:
+        pass  # la conversion signalera l'erreur
+    return lus
+
+
+def prelecture(fichiers, avance=PRELECTURE_FICHIERS, octets_max=PRELECTURE_OCTETS_MAX):
+    """Produit ``fichiers`` dans l'ordre pendant qu'un fil lit à l'avance les ``avance`` suivants.
+
+    ``fichiers`` peut être un itérateur (exploration d'un dossier): il est
+    parcouru par le fil de prélecture. Les fichiers de plus de
+    ``octets_max`` octets sont transmis sans être lus.
+    """
+    if avance <= 0:
+        yield from fichiers
+        return
+
+    prets = queue.Queue(maxsize=avance)
+    arret = threading.Event()
+
+    def transmettre(element):
+        while not arret.is_set():
+            try:
+                prets.put(element, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def lire():
+        tampon = bytearray(TAILLE_BLOC)
+        try:
+            for fichier in fichiers:
+                if arret.is_set():
+                    return
+                try:
+                    taille = os.path.getsize(fichier)
+                except OSError:
+                    taille = None
+                if taille is not None and taille <= octets_max:
+                    prelire(fichier, tampon)
+                if not transmettre(fichier):
+                    return
+        except BaseException as e:
+            transmettre((_FIN, e))
+            return
+        transmettre((_FIN, None))
+
+    fil = threading.Thread(target=lire, daemon=True)
+    fil.start()
+    try:
+        while True:
+            element = prets.get()
+            if isinstance(element, tuple) and element and element[0] is _FIN:
+                if element[1] is not None:
+                    raise element[1]
+                return
+            yield element
+    finally:
+        arret.set()
+
+
+def projeter(fichier):
+    """Projection en mémoire de ``fichier``, en lecture, annoncée comme séquentielle.
+
+    L'objet rendu se lit comme un fichier (read, seek, tell) et se passe
+    sans copie à hashlib ou à ``memoryview``. À fermer après usage.
+    """
+    with open(fichier, "rb") as f:
+        projection = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(projection, "madvise"):
+        projection.madvise(mmap.MADV_SEQUENTIAL)
+        projection.madvise(mmap.MADV_WILLNEED)
+    return projection
+
+
+def projection_utile(fichier):
+    """Vrai si ``fichier`` est assez gros pour gagner à être projeté en mémoire"""
+    try:
+        return os.path.getsize(fichier) >= SEUIL_PROJECTION
+    except OSError:
+        return False
+
+
+def ouvrir_ecriture(chemin):
+    """Fichier de sortie binaire à tampon large (écritures groupées par blocs)"""
+    return open(chemin, "wb", buffering=TAMPON_ECRITURE)
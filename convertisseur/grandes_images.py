@@ -0,0 +1,179 @@
+"""Images animées, multipages et très grandes, en mémoire bornée.
+
+``SequenceTransformee`` présente aux encodeurs de Pillow (WEBP et GIF
+animés, TIFF multipage) une image multi-images dont chaque image n'est
+décodée puis transformée qu'au moment où l'encodeur la demande: une
+seule image source est en mémoire à la fois.
+
+``reduire_par_bandes`` réduit une image trop grande pour être décodée
+d'un bloc, bande par bande, quand ses bandes peuvent être lues
+séparément (TIFF et BMP non compressés).
+"""
+
+from PIL import Image
+
+# Formats de sortie capables de contenir plusieurs images
+FORMATS_MULTI_IMAGES = ("gif", "webp", "tiff")
+
+# La protection de Pillow contre les bombes de décompression lit un réglage
+# global au processus, que des fils ne peuvent pas lever chacun à leur tour:
+# elle est désactivée une fois pour toutes et ouvrir_sous_garde la remplace.
+LIMITE_PIXELS = Image.MAX_IMAGE_PIXELS
+Image.MAX_IMAGE_PIXELS = None
+
+
+def octets_decodes(taille, mode):
+    """Mémoire occupée par une image décodée par Pillow (1, 2 ou 4 octets par pixel)"""
+    if mode in ("1", "L", "P"):
+        octets = 1
+    elif mode.startswith("I;16"):
+        octets = 2
+    else:
+        octets = 4  # RGB est stocké sur 4 octets par pixel
+    return taille[0] * taille[1] * octets
+
+
+def ouvrir_sous_garde(source, memoire_max=None):
+    """Image.open avec notre propre protection contre les bombes de décompression.
+
+    Avec ``memoire_max``, le plafond vérifié avant le décodage la remplace;
+    sans, une image qui décodée occuperait plus qu'une image RGB de deux fois
+    la limite de pixels de Pillow est refusée, comme Pillow le ferait.
+    """
+    img = Image.open(source)
+    if (not memoire_max and LIMITE_PIXELS
+            and octets_decodes(img.size, img.mode) > octets_decodes((2 * LIMITE_PIXELS, 1), "RGB")):
+        img.close()
+        raise Image.DecompressionBombError(
+            f"Image trop grande pour être ouverte sans limite mémoire "
+            f"({img.width}x{img.height} {img.mode}); "
+            "fixez une limite mémoire pour la traiter en mémoire bornée")
+    return img
+
+
+class _Durees(list):
+    """Durée de chaque image, lue au fil de l'encodage.
+
+    L'encodeur WEBP attend une liste de durées; celle-ci renvoie la durée
+    de l'image que la séquence vient de produire, sans décoder toute
+    l'animation à l'avance.
+    """
+
+    def __init__(self, sequence):
+        super().__init__([0] * sequence.n_frames)
+        self.sequence = sequence
+
+    def __getitem__(self, index):
+        return self.sequence.info.get("duration", 0)
+
+
+class SequenceTransformee(Image.Image):
+    """Image multi-images dont chaque image est ``transformer(image source)``,
+    calculée à la demande (``seek``)"""
+
+    def __init__(self, source, transformer):
+        super().__init__()
+        self.source = source
+        self.transformer = transformer
+        self.n_frames = getattr(source, "n_frames", 1)
+        self.is_animated = self.n_frames > 1
+        self._courante = None
+        self.seek(0)
+
+    def tell(self):
+        return self._courante
+
+    def seek(self, index):
+        if index == self._courante:
+            return
+        self.source.seek(index)
+        image = self.transformer(self.source)
+        self.im = image.im
+        self._mode = image.mode
+        self._size = image.size
+        self.palette = image.palette.copy() if image.palette else None
+        self.info = dict(self.source.info, **image.info)
+        self._courante = index
+
+    def enregistrer(self, chemin_sortie, **options):
+        """Encode toutes les images en un seul fichier"""
+        if "duration" in self.info:
+            options.setdefault("duration", _Durees(self))
+        options.setdefault("loop", self.source.info.get("loop", 0))
+        self.save(chemin_sortie, save_all=True, **options)
+
+
+# Bits par pixel des données brutes, pour retrouver la place de chaque ligne dans le fichier
+_BITS_BRUTS = {"1": 1, "L": 8, "P": 8, "LA": 16, "I;16": 16, "I;16B": 16, "RGB": 24,
+               "BGR": 24, "RGBA": 32, "RGBX": 32, "CMYK": 32, "BGRX": 32}
+LIGNES_BANDE_VIRTUELLE = 64
+
+
+def tuiles_par_bandes(img):
+    """Tuiles brutes (non compressées) de ``img`` lisibles séparément, ou None.
+
+    Une image en plusieurs bandes ou tuiles (TIFF) est utilisable telle
+    quelle; des données d'un seul tenant (TIFF non compressé, BMP) sont
+    découpées en bandes virtuelles. Chaque tuile est rendue sous la forme
+    (x0, y0, x1, y1, position dans le fichier, mode brut, pas, orientation).
+    """
+    tuiles = []
+    for tuile in img.tile:
+        args = (tuile.args, 0, 1) if isinstance(tuile.args, str) else tuile.args
+        if (tuile.codec_name != "raw" or tuile.extents is None or not isinstance(args, tuple)
+                or len(args) < 3 or args[0] not in _BITS_BRUTS or args[2] not in (1, -1)):
+            return None
+        x0, y0, x1, y1 = tuile.extents
+        mode_brut, pas, orientation = args[:3]
+        pas = pas or ((x1 - x0) * _BITS_BRUTS[mode_brut] + 7) // 8
+        tuiles.append((x0, y0, x1, y1, tuile.offset, mode_brut, pas, orientation))
+
+    if len(tuiles) != 1:
+        return tuiles or None
+    x0, y0, x1, y1, position, mode_brut, pas, orientation = tuiles[0]
+    bandes = []
+    for debut in range(y0, y1, LIGNES_BANDE_VIRTUELLE):
+        fin = min(y1, debut + LIGNES_BANDE_VIRTUELLE)
+        # Orientation -1 (BMP): lignes rangées de bas en haut
+        decalage = (debut - y0) * pas if orientation == 1 else (y1 - fin) * pas
+        bandes.append((x0, debut, x1, fin, position + decalage, mode_brut, pas, orientation))
+    return bandes
+
+
+def _decoder_bande(f, img, debut, fin, tuiles):
+    """Décode les lignes [debut, fin) en ne lisant que les tuiles qui les couvrent"""
+    bande = Image.new(img.mode, (img.width, fin - debut))
+    if img.mode == "P":
+        bande.putpalette(img.getpalette())
+    for x0, y0, x1, y1, position, mode_brut, pas, orientation in tuiles:
+        if y1 <= debut or y0 >= fin:
+            continue
+        f.seek(position)
+        morceau = Image.frombytes(img.mode, (x1 - x0, y1 - y0), f.read(pas * (y1 - y0)),
+                                  "raw", mode_brut, pas, orientation)
+        bande.paste(morceau, (x0, y0 - debut))  # les lignes hors de la bande sont rognées
+    return bande
+
+
+def reduire_par_bandes(fichier, img, tuiles, facteur, plafond):
+    """Image réduite d'un ``facteur`` entier (moyenne par blocs), décodée bande par bande.
+
+    Chaque bande occupe au plus environ la moitié de ``plafond`` octets et
+    compte un multiple de ``facteur`` lignes: les bandes réduites se
+    raccordent sans couture. ``tuiles`` vient de ``tuiles_par_bandes``.
+    """
+    largeur, hauteur = img.size
+    octets_ligne = max(1, octets_decodes((largeur, 1), img.mode))
+    lignes_bande = max(facteur, plafond // 2 // octets_ligne // facteur * facteur)
+
+    # La moyenne par blocs n'a pas de sens sur des indices de palette
+    mode = {"P": "RGB", "1": "L"}.get(img.mode, img.mode)
+    reduite = Image.new(mode, (-(-largeur // facteur), -(-hauteur // facteur)))
+    with open(fichier, "rb") as f:
+        for debut in range(0, hauteur, lignes_bande):
+            bande = _decoder_bande(f, img, debut, min(hauteur, debut + lignes_bande), tuiles)
+            if bande.mode != mode:
+                bande = bande.convert(mode)
+            reduite.paste(bande.reduce(facteur), (0, debut // facteur))
+            del bande
+    return reduite
@@ -0,0 +1,352 @@
+"""Conversion d'images, en série ou répartie sur plusieurs processus"""
+
+import math
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from PIL import Image
+
+from . import mesures
+from .flux import ouvrir_ecriture, projection_utile, projeter
+from .grandes_images import (FORMATS_MULTI_IMAGES, SequenceTransformee, octets_decodes,
+                             ouvrir_sous_garde, reduire_par_bandes, tuiles_par_bandes)
+from .lots import convertir_lot
+
+
+FORMATS = ["JPG", "PNG", "BMP", "GIF", "WEBP", "TIFF", "ICO"]
+EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tiff', '.tif', '.ico')
+
+# Modes de redimensionnement
+#   exact   : décodage complet puis LANCZOS vers la taille demandée
+#   rapide  : décodage JPEG à échelle réduite (draft) puis réduction entière (reducing_gap)
+#   ajuster : comme rapide, en conservant les proportions dans la taille demandée
+MODES_REDIM = {"Exact": "exact", "Rapide (décodage réduit)": "rapide",
+               "Ajuster (garder les proportions)": "ajuster"}
+
+# Formats dont le décodeur lit le fichier au fil de l'eau, gagnants à la projection en
+# mémoire (un TIFF ou un BMP non compressé est déjà projeté par Pillow lui-même)
+FORMATS_PROJETES = ("JPEG", "PNG", "WEBP", "GIF")
+
+# Écart minimal gardé pour le rééchantillonnage LANCZOS après la réduction entière
+ECART_REDUCTION = 3.0
+
+
+def taille_ajustee(taille_source, taille_max):
+    """Plus grande taille tenant dans ``taille_max`` avec les proportions de la source (sans agrandir)"""
+    largeur, hauteur = taille_source
+    ratio = min(taille_max[0] / largeur, taille_max[1] / hauteur, 1.0)
+    return max(1, round(largeur * ratio)), max(1, round(hauteur * ratio))
+
+
+def redimensionner(img, taille, mode="exact"):
+    """Redimensionne une image ouverte mais pas encore décodée.
+
+    En mode rapide ou ajuster, le décodeur JPEG produit directement une
+    image 2, 4 ou 8 fois plus petite: les pixels jetés ne sont jamais décodés.
+    """
+    taille = reduire_au_decodage(img, taille, mode)
+    if mode == "exact":
+        return img.resize(taille, Image.Resampling.LANCZOS)
+    return img.resize(taille, Image.Resampling.LANCZOS, reducing_gap=ECART_REDUCTION)
+
+
+def reduire_au_decodage(img, taille, mode="exact"):
+    """Prépare le décodage réduit (modes rapide et ajuster); retourne la taille finale"""
+    if mode == "exact":
+        return taille
+    if mode == "ajuster":
+        taille = taille_ajustee(img.size, taille)
+    img.draft(img.mode, (int(taille[0] * ECART_REDUCTION), int(taille[1] * ECART_REDUCTION)))
+    return taille
+
+
+def convertir_image(fichier, dossier_sortie, format_sortie, qualite=95, taille=None,
+                    mode_redim="exact", memoire_max=None):
+    """Convertit une image et retourne le chemin du fichier produit.
+
+    Une image animée ou multipage garde toutes ses images vers GIF, WEBP
+    et TIFF. Avec ``memoire_max`` (Mo), une image qui dépasserait ce
+    plafond une fois décodée est réduite bande par bande si possible,
+    sinon refusée avant d'être décodée.
+    """
+    format_sortie = format_sortie.lower()
+
+    # Nom de sortie
+    nom_base = Path(fichier).stem
+    chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}.{format_sortie}")
+
+    with ouvrir_image(fichier, memoire_max) as img:
+        if getattr(img, "n_frames", 1) > 1 and format_sortie in FORMATS_MULTI_IMAGES:
+            # La garde de Pillow est levée avec ``memoire_max``: le plafond est vérifié ici
+            verifier_sequence(img, taille, mode_redim, memoire_max, format_sortie)
+            with mesures.etape("encodage", lus=os.path.getsize(fichier)) as mesure:
+                # Décodage, transformation et encodage alternent image par image
+                _convertir_sequence(img, chemin_sortie, taille, mode_redim)
+                mesure.ecrits = os.path.getsize(chemin_sortie)
+            return chemin_sortie
+
+        with mesures.etape("decodage", lus=os.path.getsize(fichier)):
+            if taille:
+                taille = reduire_au_decodage(img, taille, mode_redim)
+            img = _decoder(fichier, img, taille, memoire_max)
+
+        with mesures.etape("transformation"):
+            # Redimensionner
+            if taille and img.size != taille:
+                ecart = None if mode_redim == "exact" else ECART_REDUCTION
+                img = img.resize(taille, Image.Resampling.LANCZOS, reducing_gap=ecart)
+            img = preparer_pour_format(img, format_sortie)
+
+        # Sauvegarder
+        with mesures.etape("encodage") as mesure:
+            enregistrer(img, chemin_sortie, format_sortie,
+                        qualite if format_sortie in ['jpeg', 'jpg'] else None)
+            mesure.ecrits = os.path.getsize(chemin_sortie)
+
+    return chemin_sortie
+
+
+@contextmanager
+def ouvrir_image(fichier, memoire_max=None):
+    """Image.open dans un bloc ``with``; avec ``memoire_max``, le plafond remplace
+    la protection de Pillow contre les bombes de décompression.
+
+    Un gros fichier lu au fil du décodage (FORMATS_PROJETES) est projeté
+    en mémoire: le système le lit par grands blocs (voir flux.projeter).
+    """
+    img = ouvrir_sous_garde(fichier, memoire_max)
+    projection = None
+    try:
+        if img.format in FORMATS_PROJETES and projection_utile(fichier):
+            img.close()
+            projection = projeter(fichier)
+            img = ouvrir_sous_garde(projection, memoire_max)
+        yield img
+    finally:
+        img.close()
+        if projection is not None:
+            projection.close()
+
+
+def plan_decodage(img, taille, memoire_max):
+    """None si ``img`` peut être décodée d'un bloc sous ``memoire_max`` Mo, sinon
+    (facteur, tuiles) de sa réduction par bandes.
+
+    Ne lit que l'en-tête; lève MemoryError si l'image ne peut pas être
+    traitée sous ce plafond.
+    """
+    if not memoire_max:
+        return None
+    plafond = memoire_max * 1024 * 1024
+    besoin = octets_decodes(img.size, img.mode)
+    if besoin <= plafond:
+        return None
+    message = (f"Image de {img.width}x{img.height} pixels: {besoin / 2**20:.0f} Mo "
+               f"une fois décodée, au-delà de la limite de {memoire_max} Mo")
+    if not taille:
+        raise MemoryError(f"{message}; précisez une taille de sortie pour la réduire")
+    tuiles = tuiles_par_bandes(img)
+    if tuiles is None:
+        raise MemoryError(f"{message}; ce fichier ({img.format}, compressé d'un seul "
+                          "bloc) ne peut pas être décodé par bandes")
+    # Réduction entière par blocs, en gardant si possible un écart de
+    # ECART_REDUCTION pour le LANCZOS final, et assez forte pour que
+    # l'image réduite tienne dans la moitié du plafond
+    rapport = min(img.width / taille[0], img.height / taille[1])
+    facteur = max(1, int(rapport / ECART_REDUCTION),
+                  math.ceil(math.sqrt(besoin / (plafond / 2))))
+    if facteur > rapport:
+        raise MemoryError(f"{message}; la taille de sortie demandée est trop grande")
+    return facteur, tuiles
+
+
+def verifier_sequence(img, taille, mode_redim, memoire_max, format_sortie):
+    """Lève MemoryError si une image animée ou multipage dépasse ``memoire_max`` Mo
+    une fois convertie image par image (voir _convertir_sequence).
+
+    Ne lit que l'en-tête. Une image source et l'image produite sont en
+    mémoire à la fois; l'encodeur GIF garde en plus toutes les images
+    produites jusqu'à la fin.
+    """
+    if not memoire_max:
+        return
+    if taille and mode_redim == "ajuster":
+        taille = taille_ajustee(img.size, taille)
+    source = octets_decodes(img.size, img.mode)
+    # Une image en palette est convertie en RGBA avant d'être redimensionnée
+    produite = octets_decodes(taille, "RGBA") if taille else source
+    images_source = getattr(img, "n_frames", 1)
+    besoin = source + produite
+    if format_sortie == "gif":
+        besoin += (images_source - 1) * produite
+    if besoin > memoire_max * 1024 * 1024:
+        raise MemoryError(
+            f"Image de {img.width}x{img.height} pixels en {images_source} images: "
+            f"{besoin / 2**20:.0f} Mo pour la convertir, au-delà de la limite de "
+            f"{memoire_max} Mo; précisez une taille de sortie plus petite")
+
+
+def _decoder(fichier, img, taille, memoire_max):
+    """Décode ``img``, ou la réduit bande par bande si elle dépasse ``memoire_max`` Mo"""
+    plan = plan_decodage(img, taille, memoire_max)
+    if plan is not None:
+        facteur, tuiles = plan
+        return reduire_par_bandes(fichier, img, tuiles, facteur, memoire_max * 1024 * 1024)
+    img.load()
+    return img
+
+
+def _convertir_sequence(img, chemin_sortie, taille, mode_redim):
+    """Convertit une image animée ou multipage, une image source à la fois"""
+    if taille and mode_redim == "ajuster":
+        taille = taille_ajustee(img.size, taille)
+
+    def transformer(image):
+        image.load()
+        if taille:
+            if image.mode in ("P", "1"):
+                image = image.convert("RGBA")  # sinon redimensionnée au plus proche voisin
+            image = image.resize(taille, Image.Resampling.LANCZOS)
+        return image
+
+    SequenceTransformee(img, transformer).enregistrer(chemin_sortie)
+
+
+def preparer_pour_format(img, format_sortie):
+    """Convertit en RGB (fond blanc) les images transparentes ou à palette destinées au JPG"""
+    if format_sortie in ['jpg', 'jpeg'] and img.mode in ('RGBA', 'LA', 'P'):
+        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'RGBA':
+            rgb_img.paste(img, mask=img.split()[-1])
+        else:
+            rgb_img.paste(img)
+        return rgb_img
+    return img
+
+
+def enregistrer(img, chemin_sortie, format_sortie, qualite=None):
+    """Encode ``img`` à travers un tampon d'écriture large; ``qualite`` s'applique au JPG
+    et au WEBP"""
+    format_pillow = Image.registered_extensions().get(f".{format_sortie}")
+    if format_pillow is None:
+        raise ValueError(f"Format d'image inconnu: {format_sortie}")
+    options = {}
+    if format_sortie in ['jpeg', 'jpg']:
+        options = {"quality": qualite or 95, "optimize": True}
+    elif format_sortie == 'webp' and qualite:
+        options = {"quality": qualite}
+    with ouvrir_ecriture(chemin_sortie) as f:
+        img.save(f, format=format_pillow, **options)
+
+
+# ----- Profils de sortie: plusieurs fichiers pour un seul décodage -----
+
+def lire_profils(texte):
+    """ "webp:85,jpg:90,webp:80:256x256" → [("webp", 85, None), ("jpg", 90, None),
+    ("webp", 80, (256, 256))]
+
+    Chaque profil est FORMAT[:QUALITE[:LARGEURxHAUTEUR]]; qualité 95 par
+    défaut, taille d'origine si elle est omise.
+    """
+    profils = []
+    for element in texte.split(","):
+        parties = element.strip().split(":")
+        if not parties[0] or len(parties) > 3 or f".{parties[0].lower()}" not in EXTENSIONS:
+            raise ValueError(f"profil invalide: {element.strip()!r} "
+                             "(attendu FORMAT[:QUALITE[:LARGEURxHAUTEUR]])")
+        qualite = int(parties[1]) if len(parties) > 1 and parties[1] else 95
+        taille = None
+        if len(parties) > 2 and parties[2]:
+            largeur, hauteur = parties[2].lower().split("x")
+            taille = (int(largeur), int(hauteur))
+        profils.append((parties[0].lower(), qualite, taille))
+    return profils
+
+
+def _surface(taille):
+    return taille[0] * taille[1]
+
+
+def convertir_image_profils(fichier, dossier_sortie, profils, mode_redim="exact"):
+    """Produit une sortie par profil (format, qualité, taille) à partir d'un seul décodage.
+
+    Les profils sont traités du plus grand au plus petit: chaque taille
+    est calculée à partir de la plus petite réduction déjà faite qui la
+    contient, et non de l'original. Les sorties redimensionnées sont
+    nommées ``nom_LARGEURxHAUTEUR.format``. Retourne la liste des chemins
+    produits, dans l'ordre des profils.
+    """
+    nom_base = Path(fichier).stem
+    sorties = [None] * len(profils)
+
+    with ouvrir_image(fichier) as img:
+        taille_source = img.size
+        cibles = []
+        for _, _, taille in profils:
+            if taille and mode_redim == "ajuster":
+                taille = taille_ajustee(taille_source, taille)
+            cibles.append(taille or taille_source)
+
+        with mesures.etape("decodage", lus=os.path.getsize(fichier)):
+            if mode_redim != "exact" and all(taille for _, _, taille in profils):
+                # Décodage réduit juste assez pour la plus grande sortie
+                reduire_au_decodage(img, (max(c[0] for c in cibles), max(c[1] for c in cibles)),
+                                    "rapide")
+            img.load()
+
+        reductions = [img]
+        ecart = None if mode_redim == "exact" else ECART_REDUCTION
+        for i in sorted(range(len(profils)), key=lambda i: _surface(cibles[i]), reverse=True):
+            format_sortie, qualite, taille = profils[i]
+            with mesures.etape("transformation"):
+                sortie = img
+                if taille:
+                    source = min((r for r in reductions
+                                  if r.width >= cibles[i][0] and r.height >= cibles[i][1]),
+                                 key=lambda r: _surface(r.size), default=img)
+                    sortie = source
+                    if source.size != cibles[i]:
+                        sortie = source.resize(cibles[i], Image.Resampling.LANCZOS,
+                                               reducing_gap=ecart)
+                        reductions.append(sortie)
+                sortie = preparer_pour_format(sortie, format_sortie)
+
+            nom = f"{nom_base}_{taille[0]}x{taille[1]}" if taille else nom_base
+            chemin_sortie = os.path.join(dossier_sortie, f"{nom}.{format_sortie}")
+            with mesures.etape("encodage") as mesure:
+                enregistrer(sortie, chemin_sortie, format_sortie, qualite)
+                mesure.ecrits = os.path.getsize(chemin_sortie)
+            sorties[i] = chemin_sortie
+
+    return sorties
+
+
+def convertir_images_lot(fichiers, dossier_sortie, format_sortie, qualite=95,
+                         taille=None, processus=None, controle=None, mode_redim="exact",
+                         cache=None, reprendre=False, racine=None, memoire_max=None):
+    """Convertit un lot d'images et produit un ResultatConversion par fichier.
+
+    Avec plusieurs processus, décodage, redimensionnement et encodage sont
+    répartis sur les cœurs disponibles; les résultats restent dans l'ordre.
+    Voir lots.convertir_lot pour ``cache``, ``reprendre`` et ``racine``, et
+    convertir_image pour ``memoire_max``.
+    """
+    options = {"format": format_sortie.lower(), "qualite": qualite, "taille": taille,
+               "mode_redim": mode_redim, "memoire_max": memoire_max}
+    return convertir_lot(convertir_image, fichiers, dossier_sortie, format_sortie, qualite,
+                         taille, mode_redim, memoire_max, options=options, cache=cache, reprendre=reprendre,
+                         taille_pool=processus, controle=controle, racine=racine)
+
+
+def convertir_images_profils_lot(fichiers, dossier_sortie, profils, processus=None,
+                                 controle=None, mode_redim="exact", reprendre=False, racine=None):
+    """Comme convertir_images_lot, avec plusieurs sorties par image (voir convertir_image_profils).
+
+    Le cache de conversions ne conserve qu'une sortie par fichier: il
+    n'est pas utilisé avec les profils.
+    """
+    options = {"profils": profils, "mode_redim": mode_redim}
+    return convertir_lot(convertir_image_profils, fichiers, dossier_sortie, profils, mode_redim,
+                         options=options, reprendre=reprendre, taille_pool=processus,
+                         controle=controle, racine=racine)
@@ -0,0 +1,178 @@
+"""Journal de lot durable et écriture atomique des sorties.
+
+Chaque fichier traité est consigné dans ``.convertisseur-journal.jsonl``
+(une ligne JSON par fichier, ajoutée puis synchronisée sur disque) dans
+le dossier de sortie, que le lot soit une reprise ou non. Un lot relancé
+en reprise avec les mêmes options saute les fichiers déjà terminés, tant
+que l'entrée n'a pas changé et que la sortie existe encore.
+
+Les conversions écrivent dans un dossier temporaire voisin puis le
+fichier est renommé: une sortie partielle n'existe jamais sous son nom
+final, même si le processus est tué en cours de route.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from . import mesures
+from .decouverte import sous_dossier_sortie
+from .resultats import ResultatConversion, dans_l_ordre
+
+NOM_JOURNAL = ".convertisseur-journal.jsonl"
+PREFIXE_TEMPORAIRE = ".convertisseur-tmp-"
+
+TERMINE = "termine"
+ECHEC = "echec"
+
+
+def signature_options(fonction, options):
+    """Identifie une configuration de conversion (fonction + options)"""
+    description = json.dumps(dict(options, fonction=f"{fonction.__module__}.{fonction.__qualname__}"),
+                             sort_keys=True, default=str)
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()[:16]
+
+
+def _processus_vivant(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def nettoyer_temporaires(dossier_sortie):
+    """Supprime les dossiers temporaires laissés par un processus qui n'existe plus"""
+    if os.name != "posix" or not os.path.isdir(dossier_sortie):
+        return
+    for entree in os.scandir(dossier_sortie):
+        if not (entree.is_dir() and entree.name.startswith(PREFIXE_TEMPORAIRE)):
+            continue
+        try:
+            pid = int(entree.name[len(PREFIXE_TEMPORAIRE):].split("-")[0])
+        except ValueError:
+            continue
+        if not _processus_vivant(pid):
+            shutil.rmtree(entree.path, ignore_errors=True)
+
+
+class EcritureAtomique:
+    """Exécute ``fonction(fichier, dossier_sortie, *args)`` dans un dossier temporaire
+    puis déplace la sortie dans ``dossier_sortie`` par un renommage atomique.
+
+    Avec ``racine``, la sortie est placée dans le sous-dossier qui
+    reproduit l'emplacement du fichier sous ``racine``.
+    """
+
+    def __init__(self, fonction, racine=None):
+        self.fonction = fonction
+        self.racine = racine
+
+    def __call__(self, fichier, dossier_sortie, *args):
+        destination = dossier_sortie
+        if self.racine:
+            destination = sous_dossier_sortie(fichier, self.racine, dossier_sortie)
+            os.makedirs(destination, exist_ok=True)
+        temporaire = tempfile.mkdtemp(prefix=f"{PREFIXE_TEMPORAIRE}{os.getpid()}-",
+                                      dir=dossier_sortie)
+        try:
+            sortie = self.fonction(fichier, temporaire, *args)
+            if isinstance(sortie, ResultatConversion):
+                sortie.sortie = self._publier(sortie.sortie, destination)
+                return sortie
+            if isinstance(sortie, (list, tuple)):
+                return [self._publier(chemin, destination) for chemin in sortie]
+            return self._publier(sortie, destination)
+        finally:
+            shutil.rmtree(temporaire, ignore_errors=True)
+
+    @staticmethod
+    def _publier(chemin, dossier_sortie):
+        destination = os.path.join(dossier_sortie, os.path.basename(chemin))
+        with mesures.etape("publication"):
+            os.replace(chemin, destination)
+        return destination
+
+
+class Journal:
+    """Journal des fichiers traités pour une configuration donnée dans un dossier de sortie"""
+
+    def __init__(self, dossier_sortie, signature, reprendre=True):
+        """Sans ``reprendre``, le journal est seulement complété: aucun fichier n'est sauté"""
+        self.chemin = os.path.join(dossier_sortie, NOM_JOURNAL)
+        self.signature = signature
+        self.reprendre = reprendre
+        self.termines = self._charger() if reprendre else {}
+
+    def _charger(self):
+        termines = {}
+        try:
+            with open(self.chemin, encoding="utf-8") as f:
+                for ligne in f:
+                    try:
+                        entree = json.loads(ligne)
+                    except ValueError:
+                        continue  # dernière ligne tronquée par un arrêt brutal
+                    if entree.get("signature") != self.signature:
+                        continue
+                    if entree.get("etat") == TERMINE:
+                        termines[entree["fichier"]] = entree
+                    else:
+                        termines.pop(entree["fichier"], None)
+        except FileNotFoundError:
+            pass
+        return termines
+
+    def est_termine(self, fichier):
+        """Vrai si ``fichier``, inchangé depuis, a déjà été converti et que sa sortie existe"""
+        entree = self.termines.get(os.path.abspath(fichier))
+        if entree is None or not os.path.exists(entree["sortie"]):
+            return False
+        try:
+            etat = os.stat(fichier)
+        except OSError:
+            return False
+        return (etat.st_size, etat.st_mtime_ns) == (entree["taille"], entree["mtime_ns"])
+
+    def noter(self, resultat):
+        """Consigne durablement le résultat d'un fichier"""
+        chemin = os.path.abspath(resultat.fichier)
+        try:
+            etat = os.stat(chemin)
+            taille, mtime_ns = etat.st_size, etat.st_mtime_ns
+        except OSError:
+            taille = mtime_ns = None
+        # Chemins absolus: la reprise peut être lancée depuis un autre dossier courant
+        sortie = os.path.abspath(resultat.sortie) if resultat.sortie else resultat.sortie
+        entree = {"fichier": chemin, "signature": self.signature,
+                  "etat": TERMINE if resultat.reussi else ECHEC,
+                  "sortie": sortie, "erreur": resultat.erreur,
+                  "taille": taille, "mtime_ns": mtime_ns, "horodatage": time.time()}
+        with open(self.chemin, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entree, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if resultat.reussi and self.reprendre:
+            self.termines[chemin] = entree
+
+    def executer(self, fichiers, lancer):
+        """Convertit les fichiers non terminés avec ``lancer(restants)`` et consigne chaque résultat.
+
+        Chaque résultat est consigné dès qu'il arrive, quel que soit l'ordre
+        dans lequel ``lancer`` les produit; les fichiers sautés produisent
+        un résultat ``repris`` et l'ordre des fichiers d'entrée est conservé
+        (voir resultats.dans_l_ordre). ``fichiers`` peut être un itérateur:
+        il n'est lu qu'au rythme où ``lancer`` consomme les restants.
+        """
+        def sauter(fichier):
+            if not self.reprendre or not self.est_termine(fichier):
+                return None
+            entree = self.termines[os.path.abspath(fichier)]
+            return ResultatConversion(fichier, sortie=entree["sortie"], repris=True)
+
+        return dans_l_ordre(fichiers, lancer, sauter, self.noter)
@@ -0,0 +1,157 @@
+"""Exécution d'une conversion sur un lot de fichiers, en série ou en parallèle"""
+
+import os
+from collections import deque
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .flux import PRELECTURE_FICHIERS, prelecture
+from .journal import EcritureAtomique, Journal, nettoyer_temporaires, signature_options
+from .resultats import executer
+
+# Fichiers lus puis triés ensemble par lot_plus_gros_dabord
+FICHIERS_PAR_TRI = 256
+
+
+def nombre_processus_par_defaut():
+    """Nombre de processus utilisés si aucun n'est précisé"""
+    return os.cpu_count() or 1
+
+
+def lot_sequentiel(fonction, fichiers, *args, controle=None):
+    """Applique ``fonction(fichier, *args)`` à chaque fichier, l'un après l'autre"""
+    for fichier in fichiers:
+        if controle is not None and not controle.continuer():
+            return
+        yield executer(fonction, fichier, *args)
+
+
+def lot_parallele(fonction, fichiers, *args, processus=None, controle=None):
+    """Applique ``fonction(fichier, *args)`` à chaque fichier dans un pool de processus.
+
+    Les ResultatConversion sont produits dans l'ordre des fichiers d'entrée.
+    ``fonction`` doit être définie au niveau d'un module pour être transmise
+    aux processus de travail. ``controle`` (voir Tache) permet de suspendre
+    ou d'annuler le lot entre deux soumissions.
+    """
+    return _lot_pool(ProcessPoolExecutor, fonction, fichiers, args, processus, controle)
+
+
+def lot_fils(fonction, fichiers, *args, fils=None, controle=None):
+    """Comme lot_parallele, mais avec un pool de fils d'exécution.
+
+    Adapté quand le travail est délégué à un sous-processus (ffmpeg):
+    les rappels de progression restent utilisables depuis ``fonction``.
+    """
+    return _lot_pool(ThreadPoolExecutor, fonction, fichiers, args, fils, controle)
+
+
+def _lot_pool(classe_pool, fonction, fichiers, args, taille_pool, controle, ordonne=True):
+    taille_pool = taille_pool or nombre_processus_par_defaut()
+    if isinstance(fichiers, (list, tuple)):
+        taille_pool = min(taille_pool, len(fichiers) or 1)
+    taille_pool = max(1, taille_pool)
+
+    if taille_pool == 1:
+        yield from lot_sequentiel(fonction, fichiers, *args, controle=controle)
+        return
+
+    # Nombre borné de fichiers en vol: la pause et l'annulation prennent
+    # effet rapidement et la mémoire reste constante quelle que soit la taille du lot.
+    # ``fichiers`` peut être un itérateur (exploration d'un dossier): il est lu au même rythme
+    en_vol = deque()
+    with classe_pool(max_workers=taille_pool) as executeur:
+        try:
+            for fichier in fichiers:
+                if controle is not None and not controle.continuer():
+                    break
+                en_vol.append(executeur.submit(executer, fonction, fichier, *args))
+                if len(en_vol) >= taille_pool * 2:
+                    yield from _terminer(en_vol, ordonne)
+            while en_vol:
+                yield from _terminer(en_vol, ordonne)
+        finally:
+            for future in en_vol:
+                future.cancel()
+
+
+def _terminer(en_vol, ordonne):
+    """Retire de ``en_vol`` et rend le plus ancien résultat, ou (``ordonne`` faux)
+    tous ceux déjà terminés"""
+    if ordonne:
+        return [en_vol.popleft().result()]
+    faits, _ = wait(en_vol, return_when=FIRST_COMPLETED)
+    for future in faits:
+        en_vol.remove(future)
+    return [future.result() for future in faits]
+
+
+def _par_cout_decroissant(fichiers, couts, taille):
+    """``fichiers`` lus par paquets de ``taille``, chaque paquet rendu du plus au moins coûteux"""
+    fichiers = iter(fichiers)
+    while True:
+        paquet = list(islice(fichiers, taille))
+        if not paquet:
+            return
+        valeurs = couts(paquet)
+        # Tri stable: à coût égal, l'ordre d'entrée est conservé
+        for i in sorted(range(len(paquet)), key=valeurs.__getitem__, reverse=True):
+            yield paquet[i]
+
+
+def lot_plus_gros_dabord(fonction, fichiers, couts, *args, processus=None, controle=None,
+                         avance=PRELECTURE_FICHIERS, par_tri=FICHIERS_PAR_TRI):
+    """Comme lot_parallele, en soumettant d'abord les fichiers les plus coûteux.
+
+    Soumis en dernier, un gros fichier occuperait seul un cœur à la fin du
+    lot; soumis tôt, il est recouvert par les petits. ``fichiers`` est lu
+    au fil du lot par paquets de ``par_tri``, dont ``couts(paquet)`` rend
+    le coût estimé de chaque fichier (taille, pages...): un fichier
+    n'attend jamais plus d'un paquet. Le sondage et la prélecture du paquet
+    suivant se font dans le fil de prélecture, pendant les conversions.
+
+    Les ResultatConversion sont produits dès que chaque fichier est
+    terminé, pas dans l'ordre d'entrée (voir resultats.dans_l_ordre).
+    """
+    taille_pool = max(1, processus or nombre_processus_par_defaut())
+    if taille_pool > 1:
+        fichiers = _par_cout_decroissant(fichiers, couts, par_tri)
+    return _lot_pool(ProcessPoolExecutor, fonction, prelecture(fichiers, avance), args,
+                     taille_pool, controle, ordonne=False)
+
+
+def convertir_lot(fonction, fichiers, dossier_sortie, *args, options=None, cache=None,
+                  reprendre=False, taille_pool=None, pool="processus", controle=None,
+                  racine=None, avance=PRELECTURE_FICHIERS, couts=None):
+    """Point d'entrée commun des lots de conversion.
+
+    ``fonction(fichier, dossier_sortie, *args)`` est enveloppée dans le
+    cache éventuel puis dans une écriture atomique. ``options`` décrit ce
+    qui influence la sortie (clé du cache, signature du journal). Chaque
+    fichier traité est consigné dans le journal du dossier de sortie; avec
+    ``reprendre``, les fichiers déjà terminés d'après ce journal sont sautés. ``pool`` vaut "processus" ou "fils". Avec
+    ``racine``, l'arborescence des fichiers sous ``racine`` est reproduite
+    dans ``dossier_sortie``. Les ``avance`` fichiers suivants sont lus à
+    l'avance pendant les conversions en cours (voir flux.prelecture).
+    Avec ``couts`` et un pool de processus, les fichiers sont soumis du
+    plus coûteux au moins coûteux (voir lot_plus_gros_dabord).
+    """
+    options = options or {}
+    signature = signature_options(fonction, options)
+    if cache is not None:
+        fonction = cache.envelopper(fonction, **options)
+    fonction = EcritureAtomique(fonction, racine)
+
+    def lancer(restants):
+        if couts is not None and pool == "processus":
+            return lot_plus_gros_dabord(fonction, restants, couts, dossier_sortie, *args,
+                                        processus=taille_pool, controle=controle, avance=avance)
+        restants = prelecture(restants, avance)
+        if pool == "fils":
+            return lot_fils(fonction, restants, dossier_sortie, *args,
+                            fils=taille_pool, controle=controle)
+        return lot_parallele(fonction, restants, dossier_sortie, *args,
+                             processus=taille_pool, controle=controle)
+
+    nettoyer_temporaires(dossier_sortie)
+    return Journal(dossier_sortie, signature, reprendre).executer(fichiers, lancer)
@@ -0,0 +1,169 @@
+"""Mesure du temps passé dans chaque étape d'une conversion.
+
+Les fonctions de conversion découpent leur travail avec ``etape``::
+
+    with mesures.etape("decodage", lus=taille):
+        ...
+
+Chaque étape note son temps mur, le temps CPU du fil courant (plus celui
+des sous-processus ffmpeg qu'il a attendus) et les octets lus / écrits.
+``executer`` active la collecte autour de chaque fichier: les étapes
+voyagent avec le ResultatConversion, y compris depuis les processus de
+travail. Hors collecte, ``etape`` ne mesure rien: elle crée l'objet
+Mesure (pour ``mesure.ecrits``...) et le rend, sans lire l'horloge.
+"""
+
+import cProfile
+import csv
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+LIBELLES = {"sondage": "sondage", "cache": "cache", "decodage": "décodage",
+            "transformation": "transformation", "encodage": "encodage",
+            "ffmpeg": "ffmpeg (décodage + encodage)", "extraction": "extraction",
+            "publication": "écriture sur disque"}
+
+_local = threading.local()
+
+
+class Mesure:
+    """Étape en cours; ``lus`` et ``ecrits`` peuvent être complétés pendant l'étape"""
+
+    __slots__ = ("nom", "lus", "ecrits", "cpu_externe")
+
+    def __init__(self, nom, lus=None, ecrits=None):
+        self.nom = nom
+        self.lus = lus
+        self.ecrits = ecrits
+        self.cpu_externe = 0.0
+
+
+@contextmanager
+def collecter():
+    """Active la collecte des étapes dans le fil courant; produit la liste remplie"""
+    precedentes = getattr(_local, "etapes", None)
+    _local.etapes = etapes = []
+    try:
+        yield etapes
+    finally:
+        _local.etapes = precedentes
+
+
+@contextmanager
+def etape(nom, lus=None, ecrits=None):
+    """Mesure le bloc ``with`` comme l'étape ``nom``"""
+    mesure = Mesure(nom, lus, ecrits)
+    etapes = getattr(_local, "etapes", None)
+    if etapes is None:
+        yield mesure
+        return
+
+    englobante = getattr(_local, "courante", None)
+    _local.courante = mesure
+    debut, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield mesure
+    finally:
+        _local.courante = englobante
+        etapes.append({"etape": nom, "debut": debut, "mur": time.perf_counter() - debut,
+                       "cpu": time.thread_time() - cpu + mesure.cpu_externe,
+                       "lus": mesure.lus, "ecrits": mesure.ecrits,
+                       "pid": os.getpid(), "fil": threading.get_ident()})
+
+
+def ajouter_cpu(secondes):
+    """Impute à l'étape en cours le CPU d'un sous-processus"""
+    mesure = getattr(_local, "courante", None)
+    if mesure is not None:
+        mesure.cpu_externe += secondes
+
+
+# ----- Synthèse et export -----
+
+def totaux_etapes(resultats):
+    """{étape: {"mur", "cpu", "lus", "ecrits", "fichiers"}} dans l'ordre d'apparition"""
+    totaux = {}
+    for resultat in resultats:
+        for e in resultat.etapes or ():
+            total = totaux.setdefault(e["etape"], {"mur": 0.0, "cpu": 0.0, "lus": 0,
+                                                   "ecrits": 0, "fichiers": 0})
+            total["mur"] += e["mur"]
+            total["cpu"] += e["cpu"]
+            total["lus"] += e["lus"] or 0
+            total["ecrits"] += e["ecrits"] or 0
+            total["fichiers"] += 1
+    return totaux
+
+
+def resume_etapes(resultats):
+    """Lignes lisibles: "décodage: 12.3 s (CPU 11.9 s, 54 %)" """
+    totaux = totaux_etapes(resultats)
+    temps_total = sum(t["mur"] for t in totaux.values()) or 1
+    return [f"{LIBELLES.get(nom, nom)}: {t['mur']:.1f} s "
+            f"(CPU {t['cpu']:.1f} s, {t['mur'] / temps_total * 100:.0f} %)"
+            for nom, t in totaux.items()]
+
+
+def exporter_trace(resultats, chemin):
+    """Écrit les étapes de chaque fichier: trace Chrome (.json, chrome://tracing
+    ou Perfetto) ou tableau CSV (autre extension)"""
+    lignes = [(resultat.fichier, e) for resultat in resultats for e in resultat.etapes or ()]
+    origine = min((e["debut"] for _, e in lignes), default=0)
+
+    if chemin.lower().endswith(".json"):
+        evenements = [{"name": LIBELLES.get(e["etape"], e["etape"]), "cat": e["etape"], "ph": "X",
+                       "ts": (e["debut"] - origine) * 1e6, "dur": e["mur"] * 1e6,
+                       "pid": e["pid"], "tid": e["fil"],
+                       "args": {"fichier": fichier, "cpu_ms": e["cpu"] * 1000,
+                                "octets_lus": e["lus"], "octets_ecrits": e["ecrits"]}}
+                      for fichier, e in lignes]
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": evenements, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return chemin
+
+    with open(chemin, "w", encoding="utf-8", newline="") as f:
+        ecrivain = csv.writer(f)
+        ecrivain.writerow(["fichier", "etape", "debut_s", "mur_s", "cpu_s",
+                           "octets_lus", "octets_ecrits", "pid"])
+        for fichier, e in lignes:
+            ecrivain.writerow([fichier, e["etape"], f"{e['debut'] - origine:.6f}",
+                               f"{e['mur']:.6f}", f"{e['cpu']:.6f}",
+                               e["lus"] if e["lus"] is not None else "",
+                               e["ecrits"] if e["ecrits"] is not None else "", e["pid"]])
+    return chemin
+
+
+# ----- Profilage détaillé d'un fichier -----
+
+def profiler(fonction, fichier, *args, lignes=25):
+    """Convertit un seul fichier sous cProfile et tracemalloc.
+
+    Retourne (résultat de ``fonction``, rapport texte): fonctions les plus
+    coûteuses (temps cumulé), pic de mémoire Python et plus grosses
+    allocations encore vivantes à la fin.
+    """
+    profil = cProfile.Profile()
+    tracemalloc.start()
+    try:
+        profil.enable()
+        try:
+            resultat = fonction(fichier, *args)
+        finally:
+            profil.disable()
+        _, pic = tracemalloc.get_traced_memory()
+        instantane = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    rapport = io.StringIO()
+    pstats.Stats(profil, stream=rapport).sort_stats("cumulative").print_stats(lignes)
+    rapport.write(f"Pic de mémoire Python (tracemalloc): {pic / (1024 * 1024):.1f} Mo\n")
+    for statistique in instantane.statistics("lineno")[:10]:
+        rapport.write(f"  {statistique}\n")
+    return resultat, rapport.getvalue()
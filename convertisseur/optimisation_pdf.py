@@ -0,0 +1,55 @@
+"""Optimisation de PDF (mode "PDF → PDF").
+
+Étapes, toutes faites par PyMuPDF:
+  - rééchantillonnage optionnel des images au-delà d'une résolution cible,
+    recompressées en JPEG avec la qualité demandée;
+  - sous-ensemble des polices embarquées (seuls les glyphes utilisés);
+  - réécriture avec compression des flux (deflate), nettoyage des flux de
+    contenu, fusion des objets identiques et suppression des objets
+    inutilisés (garbage=4), flux d'objets compressés.
+
+Si le résultat n'est pas plus petit que l'original, l'original est
+recopié tel quel: l'optimisation ne fait jamais grossir un fichier.
+"""
+
+import os
+import shutil
+
+from . import mesures
+
+QUALITE_IMAGES_DEFAUT = 75
+
+
+def optimiser_pdf(fichier, chemin_sortie, dpi_images=None, qualite_images=QUALITE_IMAGES_DEFAUT,
+                  polices=True):
+    """Écrit une version optimisée de ``fichier``; retourne (taille avant, taille après)"""
+    import fitz  # PyMuPDF
+
+    taille_avant = os.path.getsize(fichier)
+    with mesures.etape("decodage", lus=taille_avant):
+        doc = fitz.open(fichier)
+    with doc:
+        with mesures.etape("transformation"):
+            if dpi_images:
+                if not hasattr(doc, "rewrite_images"):
+                    raise RuntimeError("Le rééchantillonnage des images nécessite PyMuPDF 1.24 "
+                                       "ou plus récent")
+                # Seules les images nettement au-dessus de la cible sont recompressées
+                doc.rewrite_images(dpi_threshold=max(dpi_images + 1, int(dpi_images * 1.2)),
+                                   dpi_target=dpi_images, quality=qualite_images)
+            if polices and hasattr(doc, "subset_fonts"):
+                try:
+                    doc.subset_fonts()
+                except Exception:
+                    pass  # polices non réductibles: elles restent entières
+
+        with mesures.etape("encodage") as mesure:
+            doc.save(chemin_sortie, garbage=4, clean=True, deflate=True, deflate_images=True,
+                     deflate_fonts=True, use_objstms=1)
+            mesure.ecrits = os.path.getsize(chemin_sortie)
+
+    taille_apres = os.path.getsize(chemin_sortie)
+    if taille_apres >= taille_avant:
+        shutil.copyfile(fichier, chemin_sortie)
+        taille_apres = taille_avant
+    return taille_avant, taille_apres
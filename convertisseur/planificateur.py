@@ -0,0 +1,179 @@
+"""Exécution des conversions en arrière-plan, hors de la boucle Tk"""
+
+import queue
+import threading
+
+
+class Tache:
+    """Lot de conversion soumis au planificateur.
+
+    ``lancer(tache)`` doit retourner un itérable de ResultatConversion
+    pour ``tache.fichiers``; la tâche elle-même sert d'objet de contrôle
+    (pause / annulation). ``fichiers`` peut être un générateur (dossier
+    exploré pendant la conversion): ``total`` vaut alors None.
+    """
+
+    def __init__(self, nom, lancer, fichiers, dossier_sortie=None):
+        self.nom = nom
+        self.lancer = lancer
+        self.fichiers = list(fichiers) if isinstance(fichiers, (list, tuple)) else fichiers
+        self.dossier_sortie = dossier_sortie
+        self.resultats = []
+        self.succes = 0
+        self.echecs = 0
+        self.erreur = None
+        self._annulee = threading.Event()
+        self._actif = threading.Event()
+        self._actif.set()
+        self._evenements = None
+
+    @property
+    def total(self):
+        return len(self.fichiers) if isinstance(self.fichiers, list) else None
+
+    @property
+    def annulee(self):
+        return self._annulee.is_set()
+
+    def annuler(self):
+        """Demande l'arrêt de la tâche après le fichier en cours"""
+        self._annulee.set()
+
+    def continuer(self):
+        """Bloque tant que la file est en pause; faux si la tâche est annulée"""
+        while not self._actif.wait(0.1):
+            if self._annulee.is_set():
+                return False
+        return not self._annulee.is_set()
+
+    def avancement(self, fichier, fraction):
+        """Signale l'avancement d'un fichier en cours; faux si la tâche est annulée"""
+        if self._evenements is not None:
+            self._evenements.put(Evenement(Evenement.AVANCEMENT, self,
+                                           fichier=fichier, fraction=fraction))
+        return not self._annulee.is_set()
+
+    def reessai(self):
+        """Nouvelle tâche, mêmes réglages, limitée aux fichiers en échec (None s'il n'y en a pas)"""
+        echecs = [r.fichier for r in self.resultats if not r.reussi]
+        if not echecs:
+            return None
+        return Tache(self.nom, self.lancer, echecs, self.dossier_sortie)
+
+    def enregistrer(self, resultat):
+        """Comptabilise le résultat d'un fichier"""
+        self.resultats.append(resultat)
+        if resultat.reussi:
+            self.succes += 1
+        else:
+            self.echecs += 1
+
+
+class Evenement:
+    """Notification envoyée par le fil de travail vers l'interface"""
+
+    DEBUT = "debut"
+    AVANCEMENT = "avancement"
+    PROGRESSION = "progression"
+    FIN = "fin"
+
+    def __init__(self, type, tache, resultat=None, fichier=None, fraction=None):
+        self.type = type
+        self.tache = tache
+        self.resultat = resultat
+        self.fichier = fichier
+        self.fraction = fraction
+
+
+class Planificateur:
+    """File de tâches exécutées une à une par un fil d'arrière-plan.
+
+    Les événements sont déposés dans ``self.evenements`` (file thread-safe)
+    que l'interface vide périodiquement avec ``root.after``.
+    """
+
+    def __init__(self):
+        self.evenements = queue.Queue()
+        self.tache_courante = None
+        self._taches = queue.Queue()
+        self._en_attente = []
+        self._verrou = threading.Lock()
+        self._actif = threading.Event()
+        self._actif.set()
+        self._fil = threading.Thread(target=self._boucle, daemon=True)
+        self._fil.start()
+
+    # ----- Contrôle -----
+
+    def soumettre(self, tache):
+        """Ajoute une tâche à la file"""
+        tache._actif = self._actif
+        tache._evenements = self.evenements
+        with self._verrou:
+            self._en_attente.append(tache)
+        self._taches.put(tache)
+        return tache
+
+    def pause(self):
+        self._actif.clear()
+
+    def reprendre(self):
+        self._actif.set()
+
+    @property
+    def en_pause(self):
+        return not self._actif.is_set()
+
+    @property
+    def occupe(self):
+        return self.tache_courante is not None or bool(self.taches_en_attente())
+
+    def taches_en_attente(self):
+        with self._verrou:
+            return list(self._en_attente)
+
+    def annuler_tout(self):
+        """Annule la tâche en cours et vide la file d'attente"""
+        for tache in self.taches_en_attente():
+            tache.annuler()
+        if self.tache_courante is not None:
+            self.tache_courante.annuler()
+
+    def arreter(self):
+        """Annule tout et termine le fil de travail"""
+        self.annuler_tout()
+        self.reprendre()
+        self._taches.put(None)
+
+    # ----- Fil de travail -----
+
+    def _boucle(self):
+        while True:
+            tache = self._taches.get()
+            if tache is None:
+                break
+            with self._verrou:
+                self._en_attente.remove(tache)
+            self.tache_courante = tache
+            self.evenements.put(Evenement(Evenement.DEBUT, tache))
+            if not tache.annulee:
+                self._executer(tache)
+            self.tache_courante = None
+            self.evenements.put(Evenement(Evenement.FIN, tache))
+
+    def _executer(self, tache):
+        resultats = iter(tache.lancer(tache))
+        try:
+            for resultat in resultats:
+                tache.enregistrer(resultat)
+                self.evenements.put(Evenement(Evenement.PROGRESSION, tache, resultat))
+                if not tache.continuer():
+                    break
+        except Exception as e:
+            tache.erreur = f"{type(e).__name__}: {e}"
+        finally:
+            # Libère le pool éventuel et annule les fichiers non démarrés
+            fermer = getattr(resultats, "close", None)
+            if fermer:
+                fermer()
+
@@ -0,0 +1,88 @@
+"""Rapport de lot: une ligne par fichier, exportable en JSON ou CSV.
+
+Un rapport enregistré peut être relu pour ne relancer que les fichiers
+en échec (``fichiers_en_echec``), sans reconvertir tout le lot.
+"""
+
+import csv
+import json
+import time
+
+COLONNES = ("fichier", "statut", "sortie", "type_erreur", "erreur", "duree_s",
+            "taille_entree", "taille_sortie", "ratio", "racine")
+
+
+def ligne_rapport(resultat, racine=None):
+    """Description d'un ResultatConversion sous forme de dictionnaire.
+
+    ``racine`` est le dossier source dont l'arborescence est reproduite
+    dans le dossier de sortie: une relance y replace les sorties.
+    """
+    return {"fichier": resultat.fichier, "statut": resultat.statut, "sortie": resultat.sortie,
+            "type_erreur": resultat.type_erreur, "erreur": resultat.erreur,
+            "duree_s": resultat.duree, "taille_entree": resultat.taille_entree,
+            "taille_sortie": resultat.taille_sortie, "ratio": resultat.ratio,
+            "racine": racine}
+
+
+def resume(resultats):
+    """Totaux du lot: nombre de fichiers par statut, durée et volumes cumulés"""
+    statuts = {}
+    for resultat in resultats:
+        statuts[resultat.statut] = statuts.get(resultat.statut, 0) + 1
+    return {"fichiers": len(resultats), "statuts": statuts,
+            "echecs": statuts.get("echec", 0),
+            "duree_s": sum(r.duree or 0 for r in resultats),
+            "octets_entree": sum(r.taille_entree or 0 for r in resultats if r.reussi),
+            "octets_sortie": sum(r.taille_sortie or 0 for r in resultats if r.reussi)}
+
+
+def exporter_rapport(resultats, chemin, contexte=None, racine=None):
+    """Écrit le rapport en JSON (extension .json) ou en CSV (autre extension).
+
+    ``contexte`` (catégorie, format, dossier de sortie...) n'est conservé
+    qu'en JSON; ``racine`` (voir ligne_rapport) l'est dans les deux formats.
+    """
+    resultats = list(resultats)
+    if chemin.lower().endswith(".json"):
+        contenu = {"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "contexte": contexte or {},
+                   "resume": resume(resultats),
+                   "fichiers": [ligne_rapport(r, racine) for r in resultats]}
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(contenu, f, indent=2, ensure_ascii=False)
+        return chemin
+
+    with open(chemin, "w", encoding="utf-8", newline="") as f:
+        ecrivain = csv.DictWriter(f, fieldnames=COLONNES)
+        ecrivain.writeheader()
+        for resultat in resultats:
+            ecrivain.writerow(ligne_rapport(resultat, racine))
+    return chemin
+
+
+def lire_rapport(chemin):
+    """Lignes d'un rapport JSON ou CSV exporté par ``exporter_rapport``"""
+    with open(chemin, encoding="utf-8", newline="") as f:
+        if chemin.lower().endswith(".json"):
+            return json.load(f)["fichiers"]
+        return list(csv.DictReader(f))
+
+
+def fichiers_en_echec(resultats_ou_rapport):
+    """Fichiers à relancer: ResultatConversion en échec, ou lignes "echec" d'un rapport"""
+    fichiers = []
+    for element in resultats_ou_rapport:
+        if isinstance(element, dict):
+            if element.get("statut") == "echec":
+                fichiers.append(element["fichier"])
+        elif not element.reussi:
+            fichiers.append(element.fichier)
+    return fichiers
+
+
+def racine_rapport(lignes):
+    """Dossier source reproduit dans la sortie lors du lot d'un rapport, ou None"""
+    for ligne in lignes:
+        if ligne.get("racine"):
+            return ligne["racine"]
+    return None
@@ -0,0 +1,168 @@
+"""Résultats de conversion par fichier"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from .mesures import collecter
+
+
+@dataclass
+class ResultatConversion:
+    """Résultat de la conversion d'un fichier"""
+    fichier: str
+    sortie: Optional[str] = None
+    erreur: Optional[str] = None
+    # Classe de l'exception ("FileNotFoundError"...), l'erreur complète étant dans ``erreur``
+    type_erreur: Optional[str] = None
+    # None: cache non utilisé; True: sortie reprise du cache; False: convertie puis mise en cache
+    en_cache: Optional[bool] = None
+    # Vrai si le fichier a été sauté car déjà terminé lors d'un lot précédent (journal)
+    repris: bool = False
+    taille_entree: Optional[int] = None
+    taille_sortie: Optional[int] = None
+    # Durée de la conversion (secondes), mesurée dans le processus de travail
+    duree: Optional[float] = None
+    # Étapes mesurées (voir mesures.etape)
+    etapes: Optional[list] = None
+    # Toutes les sorties quand la conversion en produit plusieurs (``sortie`` est la première)
+    sorties: Optional[list] = None
+
+    @property
+    def reussi(self):
+        """Vrai si la conversion a abouti"""
+        return self.erreur is None
+
+    @property
+    def statut(self):
+        """ "reussi", "echec", "repris" (journal) ou "cache" (sortie reprise du cache)"""
+        if not self.reussi:
+            return "echec"
+        if self.repris:
+            return "repris"
+        if self.en_cache:
+            return "cache"
+        return "reussi"
+
+    @property
+    def ratio(self):
+        """Taille de sortie / taille d'entrée (0.25 = 4 fois plus petit), ou None"""
+        if not self.taille_entree or self.taille_sortie is None:
+            return None
+        return self.taille_sortie / self.taille_entree
+
+    @property
+    def gain(self):
+        """Réduction de taille (0.4 = 40 % plus petit), ou None"""
+        ratio = self.ratio
+        return None if ratio is None else 1 - ratio
+
+
+def formater_taille(octets):
+    """1536 → "1.5 Ko" """
+    for unite in ("o", "Ko", "Mo", "Go"):
+        if octets < 1024 or unite == "Go":
+            return f"{octets:.0f} {unite}" if unite == "o" else f"{octets:.1f} {unite}"
+        octets /= 1024
+
+
+def _taille(chemin):
+    try:
+        return os.path.getsize(chemin)
+    except (OSError, TypeError):
+        return None
+
+
+def bilan_cache(resultats):
+    """(réutilisés, convertis) parmi les résultats passés par le cache"""
+    reutilises = sum(1 for r in resultats if r.en_cache is True)
+    convertis = sum(1 for r in resultats if r.en_cache is False)
+    return reutilises, convertis
+
+
+def executer(fonction, fichier, *args):
+    """Appelle ``fonction(fichier, *args)`` et capture l'erreur éventuelle.
+
+    ``fonction`` retourne le chemin produit, la liste des chemins produits,
+    ou directement un ResultatConversion.
+    """
+    debut = time.perf_counter()
+    with collecter() as etapes:
+        try:
+            resultat = fonction(fichier, *args)
+            if isinstance(resultat, (list, tuple)):
+                resultat = ResultatConversion(fichier, sortie=resultat[0], sorties=list(resultat))
+            elif not isinstance(resultat, ResultatConversion):
+                resultat = ResultatConversion(fichier, sortie=resultat)
+            resultat.taille_entree = _taille(fichier)
+            if resultat.sorties:
+                resultat.taille_sortie = sum(_taille(sortie) or 0 for sortie in resultat.sorties)
+            else:
+                resultat.taille_sortie = _taille(resultat.sortie)
+        except Exception as e:
+            resultat = ResultatConversion(fichier, erreur=f"{type(e).__name__}: {e}",
+                                          type_erreur=type(e).__name__,
+                                          taille_entree=_taille(fichier))
+    resultat.duree = time.perf_counter() - debut
+    resultat.etapes = etapes
+    return resultat
+
+
+def dans_l_ordre(fichiers, lancer, sauter=None, termine=None):
+    """Produit les résultats de ``lancer(restants)`` dans l'ordre de ``fichiers``.
+
+    ``lancer`` reçoit un itérateur des fichiers à convertir et peut rendre
+    leurs résultats dans n'importe quel ordre: chacun est rattaché à son
+    fichier par son chemin, et ``termine(resultat)`` est appelé dès qu'il
+    arrive. ``sauter(fichier)`` peut fournir directement le résultat d'un
+    fichier à ne pas convertir. Un fichier lu par ``lancer`` mais jamais
+    converti (lot annulé) n'a pas de résultat. ``fichiers`` peut être un
+    itérateur: il n'est lu qu'au rythme où ``lancer`` consomme les restants.
+    """
+    ordre = deque()  # [fichier, résultat ou None], dans l'ordre de lecture
+    attendus = {}    # fichier → ses entrées encore sans résultat (doublons possibles)
+    # ``restants`` peut être parcouru par un autre fil (prélecture)
+    verrou = threading.Lock()
+
+    def restants():
+        for fichier in fichiers:
+            entree = [fichier, sauter(fichier) if sauter is not None else None]
+            with verrou:
+                ordre.append(entree)
+                if entree[1] is None:
+                    attendus.setdefault(fichier, deque()).append(entree)
+            if entree[1] is None:
+                yield fichier
+
+    def prets():
+        while ordre and ordre[0][1] is not None:
+            yield ordre.popleft()[1]
+
+    resultats = iter(lancer(restants()))
+    try:
+        for resultat in resultats:
+            if termine is not None:
+                termine(resultat)
+            with verrou:
+                entrees = attendus.get(resultat.fichier)
+                entree = entrees.popleft() if entrees else None
+                if entrees is not None and not entrees:
+                    del attendus[resultat.fichier]
+            if entree is None:
+                yield resultat  # fichier inconnu: rendu tel quel
+                continue
+            entree[1] = resultat
+            yield from prets()
+        # Lot annulé: les fichiers jamais convertis sont passés
+        with verrou:
+            reste = list(ordre)
+        for _, resultat in reste:
+            if resultat is not None:
+                yield resultat
+    finally:
+        fermer = getattr(resultats, "close", None)
+        if fermer:
+            fermer()
@@ -0,0 +1,270 @@
+"""Dossiers surveillés: conversion continue des fichiers qui y arrivent.
+
+Les nouveaux fichiers sont signalés par watchdog (inotify, FSEvents...)
+s'il est installé, sinon repérés en relisant les dossiers à intervalle
+régulier. Un fichier n'est converti qu'une fois sa taille et sa date de
+modification inchangées depuis ``stabilite`` secondes: un fichier encore
+en cours de copie n'est jamais pris à moitié.
+"""
+
+import json
+import os
+import queue
+import shutil
+import time
+from collections import deque
+
+from .decouverte import parcourir, sous_dossier_sortie
+from .disponibilite import WATCHDOG_AVAILABLE
+
+APRES = ("garder", "deplacer", "supprimer")
+
+# Avec watchdog, relecture complète de temps en temps: un dossier déplacé
+# d'un bloc ou une file d'événements saturée ne signalent pas chaque fichier
+REEXPLORATION = 60.0
+
+
+def _signature(chemin):
+    try:
+        etat = os.stat(chemin)
+    except OSError:
+        return None
+    # L'inode distingue un nouveau fichier qui reprend le nom, la taille et la date d'un ancien
+    return etat.st_size, etat.st_mtime_ns, etat.st_ino
+
+
+class Stabilisateur:
+    """Retient les fichiers signalés jusqu'à ce qu'ils cessent de changer"""
+
+    def __init__(self, stabilite):
+        self.stabilite = stabilite
+        self.en_attente = {}  # chemin → (signature, instant du dernier changement)
+        self.traites = {}     # chemin → signature lors du traitement (fichiers laissés en place)
+
+    def signaler(self, chemin, maintenant):
+        signature = _signature(chemin)
+        if signature is None:
+            self.traites.pop(chemin, None)  # supprimé ou déplacé
+            return
+        if self.traites.get(chemin) == signature:
+            return
+        precedent = self.en_attente.get(chemin)
+        if precedent is None or precedent[0] != signature:
+            self.en_attente[chemin] = (signature, maintenant)
+
+    def prets(self, maintenant):
+        """[(chemin, instant du dernier changement)] des fichiers devenus stables"""
+        prets = []
+        for chemin, (signature, depuis) in list(self.en_attente.items()):
+            actuelle = _signature(chemin)
+            if actuelle is None:
+                del self.en_attente[chemin]  # supprimé ou déplacé avant d'être pris
+            elif actuelle != signature:
+                self.en_attente[chemin] = (actuelle, maintenant)
+            elif maintenant - depuis >= self.stabilite:
+                del self.en_attente[chemin]
+                prets.append((chemin, depuis))
+        return sorted(prets)
+
+    def marquer(self, chemin):
+        """Ne plus proposer ``chemin`` tant qu'il n'a pas changé"""
+        self.traites[chemin] = _signature(chemin)
+
+    def oublier(self, chemin):
+        self.traites.pop(chemin, None)
+
+    def elaguer(self):
+        """Oublie les fichiers traités qui ont disparu depuis (le service peut tourner des jours)"""
+        for chemin in [chemin for chemin in self.traites if not os.path.exists(chemin)]:
+            del self.traites[chemin]
+
+
+class Metriques:
+    """Compteurs du service: débit, file d'attente et latence"""
+
+    def __init__(self, fenetre=60.0):
+        self.fenetre = fenetre
+        self.debut = time.monotonic()
+        self.convertis = 0
+        self.echecs = 0
+        self.octets_entree = 0
+        self.octets_sortie = 0
+        self.originaux_en_place = 0  # ni déplacés ni supprimés faute de droits, disque plein...
+        self.fins = deque()               # instants des dernières conversions (débit glissant)
+        self.latences = deque(maxlen=500)  # dernier changement du fichier → sortie publiée
+
+    def enregistrer(self, resultat, depuis, maintenant):
+        if resultat.reussi:
+            self.convertis += 1
+            self.octets_entree += resultat.taille_entree or 0
+            self.octets_sortie += resultat.taille_sortie or 0
+        else:
+            self.echecs += 1
+        self.fins.append(maintenant)
+        self.latences.append(maintenant - depuis)
+
+    def instantane(self, en_attente, a_convertir, mode):
+        """Dictionnaire des métriques courantes"""
+        maintenant = time.monotonic()
+        while self.fins and maintenant - self.fins[0] > self.fenetre:
+            self.fins.popleft()
+        duree = min(self.fenetre, maintenant - self.debut) or 1
+        latences = sorted(self.latences)
+        return {"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "mode": mode,
+                "actif_depuis_s": round(maintenant - self.debut, 1),
+                "convertis": self.convertis, "echecs": self.echecs,
+                "debit_par_minute": round(len(self.fins) * 60 / duree, 1),
+                "en_attente_stabilite": en_attente, "a_convertir": a_convertir,
+                "latence_moyenne_s": round(sum(latences) / len(latences), 2) if latences else None,
+                "latence_p95_s": round(latences[int(len(latences) * 0.95)], 2) if latences else None,
+                "octets_entree": self.octets_entree, "octets_sortie": self.octets_sortie,
+                "originaux_en_place": self.originaux_en_place}
+
+
+class DossierSurveille:
+    """Convertit au fil de l'eau les fichiers qui apparaissent dans ``dossiers``.
+
+    ``convertir(fichiers)`` retourne les ResultatConversion d'un lot (par
+    exemple ``lancer_conversion`` de la ligne de commande). Après un
+    succès, l'original est gardé, déplacé dans ``archive`` (arborescence
+    reproduite) ou supprimé selon ``apres``; un fichier en échec reste en
+    place et n'est repris que s'il est modifié.
+    """
+
+    def __init__(self, dossiers, extensions, convertir, racine=None, intervalle=2.0,
+                 stabilite=2.0, apres="garder", archive=None, exclure=(), taille_lot=32):
+        if apres not in APRES:
+            raise ValueError(f"Action après conversion inconnue: {apres}")
+        if apres == "deplacer" and not archive:
+            raise ValueError("Un dossier d'archive est nécessaire pour déplacer les originaux")
+        self.dossiers = list(dossiers)
+        self.extensions = extensions
+        self.convertir = convertir
+        self.racine = racine or os.path.commonpath([os.path.abspath(d) for d in self.dossiers])
+        self.intervalle = intervalle
+        self.apres = apres
+        self.archive = archive
+        self.exclure = [os.path.abspath(d) for d in (*exclure, archive) if d]
+        self.taille_lot = taille_lot
+        self.stabilisateur = Stabilisateur(stabilite)
+        self.metriques = Metriques()
+        self.prets = deque()
+        self._signalements = queue.Queue()
+        self.mode = "inotify (watchdog)" if WATCHDOG_AVAILABLE else "scrutation"
+
+    def retenu(self, chemin):
+        """Vrai si ``chemin`` est un fichier à convertir (extension, hors dossiers exclus)"""
+        if os.path.splitext(chemin)[1].lower() not in self.extensions:
+            return False
+        if os.path.basename(chemin).startswith("."):
+            return False
+        absolu = os.path.abspath(chemin)
+        return not any(absolu.startswith(exclu + os.sep) for exclu in self.exclure)
+
+    def etat(self):
+        """Métriques courantes (voir Metriques.instantane)"""
+        return self.metriques.instantane(len(self.stabilisateur.en_attente), len(self.prets),
+                                         self.mode)
+
+    def executer(self, arret, signaler_resultat=None, signaler_etat=None):
+        """Boucle du service, jusqu'à ce que l'événement ``arret`` soit positionné.
+
+        ``signaler_resultat(resultat)`` est appelé après chaque fichier et
+        ``signaler_etat(metriques)`` après chaque lot et à chaque tour.
+        """
+        observateur = self._demarrer_observateur()
+        derniere_exploration = None
+        try:
+            while not arret.is_set():
+                maintenant = time.monotonic()
+                if (observateur is None or derniere_exploration is None
+                        or maintenant - derniere_exploration >= REEXPLORATION):
+                    self._explorer(maintenant)
+                    derniere_exploration = maintenant
+                self._lire_signalements(maintenant)
+                self.prets.extend(self.stabilisateur.prets(maintenant))
+
+                if self.prets:
+                    lot = [self.prets.popleft()
+                           for _ in range(min(self.taille_lot, len(self.prets)))]
+                    self._convertir(lot, signaler_resultat)
+                if signaler_etat is not None:
+                    signaler_etat(self.etat())
+                if not self.prets:
+                    arret.wait(self.intervalle)
+        finally:
+            if observateur is not None:
+                observateur.stop()
+                observateur.join()
+
+    def _explorer(self, maintenant):
+        self.stabilisateur.elaguer()
+        for dossier in self.dossiers:
+            for chemin in parcourir(dossier, self.extensions, exclure=self.exclure):
+                self.stabilisateur.signaler(chemin, maintenant)
+
+    def _lire_signalements(self, maintenant):
+        try:
+            while True:
+                chemin = self._signalements.get_nowait()
+                if self.retenu(chemin):
+                    self.stabilisateur.signaler(chemin, maintenant)
+        except queue.Empty:
+            pass
+
+    def _demarrer_observateur(self):
+        if not WATCHDOG_AVAILABLE:
+            return None
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        signalements = self._signalements
+
+        class Gestionnaire(FileSystemEventHandler):
+            def on_any_event(self, evenement):
+                if not evenement.is_directory:
+                    signalements.put(getattr(evenement, "dest_path", None) or evenement.src_path)
+
+        observateur = Observer()
+        for dossier in self.dossiers:
+            observateur.schedule(Gestionnaire(), dossier, recursive=True)
+        observateur.start()
+        return observateur
+
+    def _convertir(self, lot, signaler_resultat):
+        depuis = dict(lot)
+        for resultat in self.convertir([chemin for chemin, _ in lot]):
+            if resultat.reussi:
+                self._apres_succes(resultat.fichier)
+            else:
+                self.stabilisateur.marquer(resultat.fichier)
+            self.metriques.enregistrer(resultat, depuis[resultat.fichier], time.monotonic())
+            if signaler_resultat is not None:
+                signaler_resultat(resultat)
+
+    def _apres_succes(self, fichier):
+        try:
+            if self.apres == "supprimer":
+                os.remove(fichier)
+            elif self.apres == "deplacer":
+                destination = sous_dossier_sortie(fichier, self.racine, self.archive)
+                os.makedirs(destination, exist_ok=True)
+                shutil.move(fichier, os.path.join(destination, os.path.basename(fichier)))
+            else:
+                self.stabilisateur.marquer(fichier)
+                return
+        except OSError:
+            # Original laissé en place: compté, mais pas reconverti tant qu'il ne change pas
+            self.metriques.originaux_en_place += 1
+            self.stabilisateur.marquer(fichier)
+            return
+        self.stabilisateur.oublier(fichier)
+
+
+def ecrire_metriques(metriques, chemin):
+    """Écrit les métriques en JSON, par remplacement atomique (lecture sûre à tout moment)"""
+    temporaire = f"{chemin}.tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(metriques, f, indent=2, ensure_ascii=False)
+    os.replace(temporaire, chemin)
+    return chemin
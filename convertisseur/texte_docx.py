@@ -0,0 +1,174 @@
+"""Conversions DOCX ↔ TXT qui gardent la structure, en mémoire bornée.
+
+DOCX → TXT suit l'ordre du document: paragraphes et tableaux (une ligne
+par rangée, cellules séparées par des tabulations), précédés des
+en-têtes et suivis des pieds de page.
+
+TXT → DOCX écrit un paragraphe par ligne. Le fichier ``document.xml``
+est produit au fil de la lecture directement dans l'archive DOCX, dont
+les autres parties (styles, thème...) viennent du modèle de
+python-docx: la mémoire utilisée ne dépend pas de la taille du texte.
+L'encodage du texte est détecté (BOM, UTF-8, charset_normalizer s'il
+est installé, sinon cp1252).
+"""
+
+import codecs
+import io
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from . import mesures
+from .disponibilite import CHARSET_NORMALIZER_AVAILABLE
+
+TAILLE_ECHANTILLON = 64 * 1024
+# Une ligne plus longue est répartie sur plusieurs paragraphes
+LONGUEUR_MAX_LIGNE = 1024 * 1024
+# Paragraphes accumulés avant chaque écriture dans l'archive
+TAILLE_TAMPON_XML = 1024 * 1024
+
+_BOMS = ((codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),
+         (codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+         (codecs.BOM_UTF16_BE, "utf-16"))
+# Caractères interdits en XML 1.0 (fréquents dans les journaux: NUL, séquences ANSI...)
+_INTERDITS_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def detecter_encodage(fichier, taille_echantillon=TAILLE_ECHANTILLON):
+    """Encodage probable d'un fichier texte, d'après son début"""
+    with open(fichier, "rb") as f:
+        echantillon = f.read(taille_echantillon)
+    for bom, encodage in _BOMS:
+        if echantillon.startswith(bom):
+            return encodage
+    try:
+        # Décodage incrémental: un caractère coupé en fin d'échantillon n'est pas une erreur
+        codecs.getincrementaldecoder("utf-8")().decode(echantillon, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if CHARSET_NORMALIZER_AVAILABLE:
+        from charset_normalizer import from_bytes
+        meilleur = from_bytes(echantillon).best()
+        if meilleur is not None:
+            return meilleur.encoding
+    return "cp1252"
+
+
+# ----- DOCX → TXT -----
+
+def _texte_tableau(tableau):
+    """Lignes d'un tableau: une par rangée, cellules séparées par des tabulations"""
+    for rangee in tableau.rows:
+        cellules = []
+        precedente = None
+        for cellule in rangee.cells:
+            # Une cellule fusionnée est rendue une fois par case qu'elle couvre
+            if precedente is not None and cellule._tc is precedente:
+                continue
+            precedente = cellule._tc
+            cellules.append(" ".join(ligne for ligne in _lignes(cellule) if ligne))
+        yield "\t".join(cellules)
+
+
+def _lignes(conteneur):
+    """Lignes de texte d'un corps, d'un en-tête ou d'une cellule, dans l'ordre"""
+    from docx.table import Table
+
+    for bloc in conteneur.iter_inner_content():
+        if isinstance(bloc, Table):
+            yield from _texte_tableau(bloc)
+        else:
+            yield bloc.text
+
+
+def _marges(doc, attribut):
+    """Lignes des en-têtes (ou pieds de page) de toutes les sections, sans doublon"""
+    vus = set()
+    for section in doc.sections:
+        for variante in (f"first_page_{attribut}", attribut, f"even_page_{attribut}"):
+            partie = getattr(section, variante)
+            if partie.is_linked_to_previous:
+                continue
+            lignes = tuple(_lignes(partie))
+            if any(lignes) and lignes not in vus:
+                vus.add(lignes)
+                yield from lignes
+
+
+def docx_vers_txt(fichier, chemin_sortie):
+    """Écrit le texte de ``fichier`` (en-têtes, corps avec tableaux, pieds de page)"""
+    from docx import Document
+
+    with mesures.etape("decodage", lus=os.path.getsize(fichier)):
+        doc = Document(fichier)
+    with mesures.etape("encodage") as mesure:
+        with open(chemin_sortie, "w", encoding="utf-8") as f:
+            for ligne in _marges(doc, "header"):
+                f.write(ligne + "\n")
+            for ligne in _lignes(doc):
+                f.write(ligne + "\n")
+            for ligne in _marges(doc, "footer"):
+                f.write(ligne + "\n")
+        mesure.ecrits = os.path.getsize(chemin_sortie)
+    return chemin_sortie
+
+
+# ----- TXT → DOCX -----
+
+def _paragraphe(ligne):
+    """XML d'un paragraphe WordprocessingML contenant ``ligne``"""
+    ligne = _INTERDITS_XML.sub("", ligne)
+    if not ligne:
+        return "<w:p/>"
+    morceaux = "<w:tab/>".join(
+        f'<w:t xml:space="preserve">{escape(morceau)}</w:t>' if morceau else ""
+        for morceau in ligne.split("\t"))
+    return f"<w:p><w:r>{morceaux}</w:r></w:p>"
+
+
+def _modele_docx():
+    """Archive d'un document vide de python-docx et son document.xml coupé
+    en (début jusqu'à <w:body>, fin à partir de <w:sectPr>)"""
+    from docx import Document
+
+    modele = io.BytesIO()
+    Document().save(modele)
+    with zipfile.ZipFile(modele) as archive:
+        document = archive.read("word/document.xml").decode("utf-8")
+    corps = document.index("<w:body>") + len("<w:body>")
+    section = document.index("<w:sectPr", corps)
+    return modele, document[:corps], document[section:]
+
+
+def txt_vers_docx(fichier, chemin_sortie, encodage=None):
+    """Écrit un DOCX d'un paragraphe par ligne de ``fichier``, au fil de la lecture"""
+    with mesures.etape("decodage"):
+        encodage = encodage or detecter_encodage(fichier)
+        modele, debut, fin = _modele_docx()
+
+    with mesures.etape("encodage", lus=os.path.getsize(fichier)) as mesure:
+        with zipfile.ZipFile(modele) as source, \
+                zipfile.ZipFile(chemin_sortie, "w", zipfile.ZIP_DEFLATED) as sortie:
+            for info in source.infolist():
+                if info.filename != "word/document.xml":
+                    sortie.writestr(info, source.read(info))
+                    continue
+                with sortie.open("word/document.xml", "w", force_zip64=True) as xml, \
+                        open(fichier, encoding=encodage, errors="replace") as texte:
+                    xml.write(debut.encode("utf-8"))
+                    tampon = []
+                    taille = 0
+                    for ligne in iter(lambda: texte.readline(LONGUEUR_MAX_LIGNE), ""):
+                        paragraphe = _paragraphe(ligne.rstrip("\r\n"))
+                        tampon.append(paragraphe)
+                        taille += len(paragraphe)
+                        if taille >= TAILLE_TAMPON_XML:
+                            xml.write("".join(tampon).encode("utf-8"))
+                            tampon = []
+                            taille = 0
+                    tampon.append(fin)
+                    xml.write("".join(tampon).encode("utf-8"))
+        mesure.ecrits = os.path.getsize(chemin_sortie)
+    return chemin_sortie
@@ -0,0 +1,206 @@
+"""Conversion de vidéos.
+
+Le moteur ffmpeg appelle directement le binaire: vraie copie de flux
+pour le codec "copy", redimensionnement par le filtre ``scale`` natif
+et progression lue sur ``-progress``. Le moteur moviepy, qui fait
+transiter chaque image par numpy, ne sert qu'en secours.
+"""
+
+import os
+from itertools import chain, islice
+from pathlib import Path
+
+from . import ffmpeg, mesures
+from .disponibilite import MOVIEPY_AVAILABLE
+from .lots import convertir_lot, nombre_processus_par_defaut
+
+
+FORMATS = ["MP4", "AVI", "MKV", "MOV", "WEBM", "FLV"]
+CODECS = ["libx264 (H.264)", "libx265 (H.265/HEVC)", "mpeg4", "copy"]
+RESOLUTIONS = ["Original", "1920x1080 (1080p)", "1280x720 (720p)",
+               "854x480 (480p)", "640x360 (360p)"]
+MOTEURS = {"Automatique": "auto", "FFmpeg (rapide)": "ffmpeg", "MoviePy": "moviepy"}
+EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.webm', '.flv', '.wmv', '.m4v')
+
+# Au-delà de ce nombre de fils, un encodeur ne gagne presque plus rien à
+# cette hauteur d'image: mieux vaut lancer une conversion de plus en parallèle.
+FILS_UTILES = ((2160, 16), (1080, 8), (720, 6), (0, 4))
+
+# Fichiers sondés pour estimer la hauteur d'image d'un lot
+ECHANTILLON_HAUTEUR = 8
+
+
+def lire_resolution(texte):
+    """Convertit "1280x720 (720p)" en (1280, 720); None pour "Original" """
+    if not texte or texte == "Original":
+        return None
+    largeur, hauteur = map(int, texte.split()[0].split('x'))
+    return largeur, hauteur
+
+
+def charger():
+    """Importe moviepy (imageio, numpy, détection de ffmpeg) à la première utilisation"""
+    from moviepy.editor import VideoFileClip
+    return VideoFileClip
+
+
+def choisir_moteur(moteur="auto"):
+    """Résout "auto" en "ffmpeg" si le binaire est présent, sinon "moviepy" """
+    if moteur == "auto":
+        return "ffmpeg" if ffmpeg.ffmpeg_disponible() else "moviepy"
+    return moteur
+
+
+def repartir_fils(coeurs, hauteur=None, codec="libx264", nb_fichiers=None):
+    """Partage ``coeurs`` entre conversions simultanées.
+
+    Retourne (conversions simultanées, fils par conversion): par exemple
+    2 × 8 sur 16 cœurs en 1080p, 4 × 4 en 480p.
+    """
+    coeurs = max(1, coeurs)
+    if codec == "copy":
+        # Remultiplexage: limité par les disques, pas par le processeur
+        conversions = min(coeurs, 4)
+    else:
+        utiles = next(fils for minimum, fils in FILS_UTILES if (hauteur or 1080) >= minimum)
+        conversions = max(1, coeurs // utiles)
+    if nb_fichiers:
+        conversions = min(conversions, nb_fichiers)
+    return conversions, max(1, coeurs // conversions)
+
+
+def estimer_hauteur(fichiers, resolution=None, echantillon=ECHANTILLON_HAUTEUR):
+    """Hauteur d'image à encoder: celle demandée, sinon la plus grande des premiers fichiers"""
+    if resolution:
+        return resolution[1]
+    hauteurs = []
+    for fichier in fichiers[:echantillon]:
+        dimensions = ffmpeg.sonder_resolution(fichier)
+        if dimensions:
+            hauteurs.append(dimensions[1])
+    return max(hauteurs) if hauteurs else None
+
+
+def arguments_ffmpeg(fichier, chemin_sortie, codec, resolution=None, fils=None):
+    """Arguments ffmpeg (hors options globales) pour une conversion"""
+    arguments = ["-i", fichier]
+    if codec == "copy":
+        if resolution:
+            raise ValueError("Le codec 'copy' ne permet pas de redimensionner")
+        # Remultiplexage pur: aucun décodage ni réencodage
+        arguments += ["-map", "0:v?", "-map", "0:a?", "-c", "copy"]
+    else:
+        arguments += ["-c:v", codec]
+        if resolution:
+            arguments += ["-vf", "scale={}:{}".format(*resolution)]
+        if codec in ("libx264", "libx265"):
+            arguments += ["-pix_fmt", "yuv420p"]
+        if fils:
+            arguments += ["-threads", str(fils)]
+    return arguments + [chemin_sortie]
+
+
+def convertir_video(fichier, dossier_sortie, format_sortie, codec="libx264", resolution=None,
+                    moteur="auto", progression=None, fils=None):
+    """Convertit une vidéo et retourne le chemin du fichier produit.
+
+    ``progression(fichier, fraction)`` est appelée pendant l'encodage
+    (moteur ffmpeg uniquement); retourner False interrompt la conversion.
+    ``fils`` limite le nombre de fils de l'encodeur.
+    """
+    format_sortie = format_sortie.lower()
+    moteur = choisir_moteur(moteur)
+
+    # Nom de sortie
+    nom_base = Path(fichier).stem
+    nom_sortie = f"{nom_base}.{format_sortie}"
+    chemin_sortie = os.path.join(dossier_sortie, nom_sortie)
+
+    if moteur == "ffmpeg":
+        _convertir_ffmpeg(fichier, chemin_sortie, codec, resolution, progression, fils)
+    else:
+        _convertir_moviepy(fichier, chemin_sortie, codec, resolution, fils)
+
+    return chemin_sortie
+
+
+def convertir_videos_lot(fichiers, dossier_sortie, format_sortie, codec="libx264",
+                         resolution=None, moteur="auto", progression=None,
+                         conversions=None, fils=None, controle=None, cache=None,
+                         reprendre=False, racine=None):
+    """Convertit plusieurs vidéos simultanément, résultats dans l'ordre des fichiers.
+
+    Sans ``conversions``, le budget de cœurs est réparti selon la hauteur
+    d'image (voir repartir_fils). Chaque conversion est un processus
+    ffmpeg: un pool de fils suffit pour les piloter.
+    """
+    # Seuls les premiers fichiers servent à l'estimation: un itérateur reste paresseux
+    if isinstance(fichiers, (list, tuple)):
+        premiers, nb_fichiers = fichiers[:ECHANTILLON_HAUTEUR], len(fichiers)
+    else:
+        suite = iter(fichiers)
+        premiers = list(islice(suite, ECHANTILLON_HAUTEUR + 1))
+        nb_fichiers = len(premiers) if len(premiers) <= ECHANTILLON_HAUTEUR else None
+        fichiers = chain(premiers, suite)
+    coeurs = nombre_processus_par_defaut()
+    if conversions is None:
+        hauteur = estimer_hauteur(premiers, resolution) if codec != "copy" else None
+        conversions, fils_auto = repartir_fils(coeurs, hauteur, codec, nb_fichiers)
+    else:
+        fils_auto = max(1, coeurs // conversions)
+    if codec == "copy":
+        fils_auto = None
+    fils_par_conversion = fils or fils_auto
+
+    options = {"format": format_sortie.lower(), "codec": codec, "resolution": resolution,
+               "moteur": choisir_moteur(moteur)}
+    return convertir_lot(convertir_video, fichiers, dossier_sortie, format_sortie, codec,
+                         resolution, moteur, progression, fils_par_conversion,
+                         options=options, cache=cache, reprendre=reprendre,
+                         taille_pool=conversions, pool="fils", controle=controle,
+                         racine=racine)
+
+
+def _convertir_ffmpeg(fichier, chemin_sortie, codec, resolution, progression, fils):
+    duree = None
+    if progression is not None:
+        with mesures.etape("sondage"):
+            duree = ffmpeg.sonder_duree(fichier)
+
+    def rappel(fraction):
+        return progression(fichier, fraction)
+
+    try:
+        with mesures.etape("ffmpeg", lus=os.path.getsize(fichier)) as mesure:
+            ffmpeg.executer_ffmpeg(arguments_ffmpeg(fichier, chemin_sortie, codec, resolution,
+                                                    fils),
+                                   duree, rappel if progression is not None else None)
+            mesure.ecrits = os.path.getsize(chemin_sortie)
+    except InterruptedError:
+        if os.path.exists(chemin_sortie):
+            os.remove(chemin_sortie)
+        raise
+
+
+def _convertir_moviepy(fichier, chemin_sortie, codec, resolution, fils):
+    if not MOVIEPY_AVAILABLE:
+        raise RuntimeError("Ni ffmpeg ni moviepy ne sont disponibles")
+
+    # Charger la vidéo
+    with mesures.etape("decodage", lus=os.path.getsize(fichier)):
+        video = charger()(fichier)
+
+    try:
+        # Redimensionner si demandé (appliqué image par image pendant l'export)
+        if resolution:
+            video = video.resize(resolution)
+
+        # Exporter: décodage, transformation et encodage de chaque image
+        with mesures.etape("encodage") as mesure:
+            if codec == "copy":
+                video.write_videofile(chemin_sortie, codec="copy", audio_codec="copy")
+            else:
+                video.write_videofile(chemin_sortie, codec=codec, threads=fils)
+            mesure.ecrits = os.path.getsize(chemin_sortie)
+    finally:
+        video.close()
@@ -1,37 +1,88 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image
 import os
-from pathlib import Path
+import queue
+import threading
 
-# Pour PDF
-try:
-    from PyPDF2 import PdfReader, PdfWriter
-    import fitz  # PyMuPDF
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from convertisseur import audio, documents, images, video
+from convertisseur.assemblage_pdf import decouper_pdf, fusionner_pdfs
+from convertisseur.cache import CacheConversion
+from convertisseur.decouverte import parcourir
+from convertisseur.disponibilite import (AUDIO_AVAILABLE, DOCX_AVAILABLE,
+                                         PDF_AVAILABLE, VIDEO_AVAILABLE)
+from convertisseur.estimation import estimer, mesurer_au_fil, resume_estimation, sonder_lot
+from convertisseur.images import convertir_images_lot
+from convertisseur.lots import convertir_lot, nombre_processus_par_defaut
+from convertisseur.mesures import exporter_trace, resume_etapes
+from convertisseur.planificateur import Evenement, Planificateur, Tache
+from convertisseur.rapport import exporter_rapport
+from convertisseur.resultats import bilan_cache, formater_taille
 
-# Pour DOCX
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
 
-# Pour Audio
-try:
-    from pydub import AudioSegment
-    AUDIO_AVAILABLE = True
-except ImportError:
-    AUDIO_AVAILABLE = False
+class ListeVirtuelle(tk.Frame):
+    """Liste de fichiers qui ne crée que les lignes visibles.
 
-# Pour Vidéo
-try:
-    from moviepy.editor import VideoFileClip
-    VIDEO_AVAILABLE = True
-except ImportError:
-    VIDEO_AVAILABLE = False
+    Le Listbox ne contient jamais plus de ``hauteur`` lignes: défiler ne
+    fait que réécrire ces lignes, quel que soit le nombre de fichiers.
+    """
+    
+    def __init__(self, parent, hauteur=10):
+        super().__init__(parent, bg="#34495e")
+        self.elements = []
+        self.premier = 0
+        self.hauteur = hauteur
+        
+        self.titre = tk.Label(self, text="Aucun fichier sélectionné",
+                              font=("Arial", 10),
+                              bg="#34495e", fg="white",
+                              justify="left")
+        self.titre.pack(anchor="w")
+        
+        cadre = tk.Frame(self, bg="#34495e")
+        cadre.pack(fill="x")
+        self.liste = tk.Listbox(cadre, height=hauteur, width=70,
+                                font=("Arial", 9),
+                                bg="#2c3e50", fg="white",
+                                highlightthickness=0, activestyle="none")
+        self.barre = tk.Scrollbar(cadre, orient="vertical", command=self.defiler)
+        self.liste.pack(side="left", fill="x", expand=True)
+        self.barre.pack(side="right", fill="y")
+        
+        # Sans "break", la molette ferait aussi défiler la page entière
+        self.liste.bind("<MouseWheel>",
+                        lambda e: self.defiler("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.liste.bind("<Button-4>", lambda e: self.defiler("scroll", -1, "units"))
+        self.liste.bind("<Button-5>", lambda e: self.defiler("scroll", 1, "units"))
+        self.rafraichir()
+    
+    def remplir(self, elements, titre, couleur="#2ecc71"):
+        """Remplace le contenu (chemins complets, affichés par nom de fichier)"""
+        self.elements = elements
+        self.premier = 0
+        self.titre.config(text=titre, fg=couleur)
+        self.rafraichir()
+    
+    def defiler(self, action, valeur, unite=None):
+        """Commande de la barre de défilement ("moveto" ou "scroll")"""
+        if action == "moveto":
+            premier = int(float(valeur) * len(self.elements))
+        else:
+            premier = self.premier + int(valeur) * (self.hauteur if unite == "pages" else 1)
+        self.premier = min(max(premier, 0), max(len(self.elements) - self.hauteur, 0))
+        self.rafraichir()
+        return "break"
+    
+    def rafraichir(self):
+        """Réécrit les lignes visibles et la position de la barre"""
+        visibles = self.elements[self.premier:self.premier + self.hauteur]
+        self.liste.delete(0, "end")
+        for chemin in visibles:
+            self.liste.insert("end", os.path.basename(chemin))
+        total = len(self.elements)
+        if total:
+            self.barre.set(self.premier / total, (self.premier + len(visibles)) / total)
+        else:
+            self.barre.set(0, 1)
 
 
 class ConvertisseurFichiersApp:
@@ -42,6 +93,19 @@ class ConvertisseurFichiersApp:
         self.root.configure(bg="#2c3e50")
         
         self.fichiers_selectionnes = []
+        self.dossier_source = None
+        self.extensions_dossier = None
+        
+        # Conversions exécutées en arrière-plan
+        self.planificateur = Planificateur()
+        self.label_progression = None
+        self.btn_pause = None
+        self.avancements = {}
+        self.derniere_tache = None
+        self.var_cache = tk.BooleanVar(value=False)
+        self.var_reprendre = tk.BooleanVar(value=True)
+        self.root.after(100, self._drainer_evenements)
+        self.root.protocol("WM_DELETE_WINDOW", self.quitter)
         
         # Titre principal
         titre = tk.Label(root, text="🔄 CONVERTISSEUR UNIVERSEL", 
@@ -125,14 +189,16 @@ class ConvertisseurFichiersApp:
         messages = {
             "📄 Convertir Documents 🔒": 
                 "Pour utiliser cette fonctionnalité, installez:\n\n"
-                "pip install PyPDF2 PyMuPDF python-docx",
+                "pip install PyMuPDF python-docx",
             "🎵 Convertir Audio 🔒": 
                 "Pour utiliser cette fonctionnalité, installez:\n\n"
                 "pip install pydub\n\n"
                 "Et installez FFmpeg sur votre système:\n"
                 "https://ffmpeg.org/download.html",
             "🎬 Convertir Vidéo 🔒": 
-                "Pour utiliser cette fonctionnalité, installez:\n\n"
+                "Pour utiliser cette fonctionnalité, installez FFmpeg:\n"
+                "https://ffmpeg.org/download.html\n\n"
+                "ou, à défaut:\n\n"
                 "pip install moviepy"
         }
         
@@ -151,6 +217,7 @@ class ConvertisseurFichiersApp:
             widget.destroy()
         
         self.fichiers_selectionnes = []
+        self.dossier_source = None
         
         # Titre
         tk.Label(self.frame_conversion, text="🖼️ Conversion d'Images",
@@ -173,14 +240,8 @@ class ConvertisseurFichiersApp:
                                      cursor="hand2")
         btn_selectionner.pack(pady=15)
         
-        # Liste fichiers
-        self.label_fichiers = tk.Label(self.frame_conversion, 
-                                       text="Aucun fichier sélectionné",
-                                       font=("Arial", 10),
-                                       bg="#34495e", fg="white",
-                                       wraplength=550,
-                                       justify="left")
-        self.label_fichiers.pack(pady=10)
+        # Dossier source et liste fichiers
+        self.ajouter_selection_dossier(images.EXTENSIONS)
         
         # Séparateur
         tk.Frame(self.frame_conversion, height=2, bg="#7f8c8d").pack(fill="x", pady=15)
@@ -190,9 +251,8 @@ class ConvertisseurFichiersApp:
                 font=("Arial", 13, "bold"),
                 bg="#34495e", fg="white").pack(pady=8)
         
-        formats_images = ["JPG", "PNG", "BMP", "GIF", "WEBP", "TIFF", "ICO"]
         self.combo_format_image = ttk.Combobox(self.frame_conversion, 
-                                               values=formats_images,
+                                               values=images.FORMATS,
                                                font=("Arial", 12),
                                                state="readonly",
                                                width=18)
@@ -246,6 +306,64 @@ class ConvertisseurFichiersApp:
         self.entry_hauteur.insert(0, "1080")
         self.entry_hauteur.pack(side="left", padx=5)
         
+        # Mode de redimensionnement
+        frame_mode = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_mode.pack(pady=8)
+        
+        tk.Label(frame_mode, text="Mode:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.combo_mode_redim = ttk.Combobox(frame_mode, 
+                                             values=list(images.MODES_REDIM),
+                                             font=("Arial", 10),
+                                             state="readonly",
+                                             width=30)
+        self.combo_mode_redim.pack(side="left", padx=5)
+        self.combo_mode_redim.current(0)
+        
+        # Profils: plusieurs sorties par image, décodée une seule fois
+        frame_profils = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_profils.pack(pady=8)
+        
+        tk.Label(frame_profils, text="🗂️ Profils (facultatif):",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.entry_profils = tk.Entry(frame_profils, width=32, font=("Arial", 10))
+        self.entry_profils.pack(side="left", padx=5)
+        tk.Label(self.frame_conversion,
+                text="ex: webp:85, jpg:90, webp:80:256x256 (remplace format, qualité et taille)",
+                font=("Arial", 9),
+                bg="#34495e", fg="#95a5a6").pack()
+        
+        # Processus
+        frame_processus = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_processus.pack(pady=8)
+        
+        tk.Label(frame_processus, text="⚙️ Processus parallèles:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_processus = tk.Spinbox(frame_processus, 
+                                         from_=1, to=256,
+                                         width=5, font=("Arial", 11))
+        self.spin_processus.delete(0, "end")
+        self.spin_processus.insert(0, str(nombre_processus_par_defaut()))
+        self.spin_processus.pack(side="left", padx=5)
+        
+        # Plafond mémoire par image (très grandes images)
+        frame_memoire = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_memoire.pack(pady=8)
+        
+        tk.Label(frame_memoire, text="🧠 Mémoire max par image (Mo, 0 = illimitée):",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_memoire = tk.Spinbox(frame_memoire,
+                                       from_=0, to=65536, increment=256,
+                                       width=7, font=("Arial", 11))
+        self.spin_memoire.pack(side="left", padx=5)
+        
+        # Cache et reprise
+        self.ajouter_options_lot("images")
+        
         # Séparateur
         tk.Frame(self.frame_conversion, height=3, bg="#7f8c8d").pack(fill="x", pady=20)
         
@@ -269,6 +387,7 @@ class ConvertisseurFichiersApp:
                                          font=("Arial", 11, "bold"),
                                          bg="#34495e", fg="#f39c12")
         self.label_progression.pack(pady=10)
+        self.ajouter_controles_tache()
         
         # Séparateur
         tk.Frame(self.frame_conversion, height=2, bg="#7f8c8d").pack(fill="x", pady=15)
@@ -290,22 +409,11 @@ class ConvertisseurFichiersApp:
         )
         
         if fichiers:
-            self.fichiers_selectionnes = list(fichiers)
-            
-            if len(fichiers) <= 10:
-                noms = "\n".join([os.path.basename(f) for f in fichiers])
-            else:
-                premiers = "\n".join([os.path.basename(f) for f in fichiers[:10]])
-                noms = f"{premiers}\n... et {len(fichiers)-10} autres fichiers"
-            
-            self.label_fichiers.config(
-                text=f"✅ {len(fichiers)} fichier(s) sélectionné(s):\n\n{noms}",
-                fg="#2ecc71"
-            )
+            self.afficher_selection(fichiers)
     
     def convertir_images(self):
         """Convertit les images"""
-        if not self.fichiers_selectionnes:
+        if not self.fichiers_selectionnes and not self.dossier_source:
             messagebox.showwarning("Attention", "Veuillez d'abord sélectionner des fichiers!")
             return
         
@@ -316,63 +424,54 @@ class ConvertisseurFichiersApp:
         if not dossier_sortie:
             return
         
-        succes = 0
-        echecs = 0
-        
-        for i, fichier in enumerate(self.fichiers_selectionnes):
+        profils = None
+        if self.entry_profils.get().strip():
             try:
-                img = Image.open(fichier)
-                
-                # Redimensionner
-                if self.var_redim.get():
-                    try:
-                        largeur = int(self.entry_largeur.get())
-                        hauteur = int(self.entry_hauteur.get())
-                        img = img.resize((largeur, hauteur), Image.Resampling.LANCZOS)
-                    except ValueError:
-                        messagebox.showerror("Erreur", "Dimensions invalides!")
-                        return
-                
-                # Convertir en RGB pour JPG
-                if format_sortie in ['jpg', 'jpeg'] and img.mode in ('RGBA', 'LA', 'P'):
-                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'RGBA':
-                        rgb_img.paste(img, mask=img.split()[-1])
-                    else:
-                        rgb_img.paste(img)
-                    img = rgb_img
-                
-                # Nom de sortie
-                nom_base = Path(fichier).stem
-                nom_sortie = f"{nom_base}.{format_sortie}"
-                chemin_sortie = os.path.join(dossier_sortie, nom_sortie)
-                
-                # Sauvegarder
-                if format_sortie in ['jpeg', 'jpg']:
-                    img.save(chemin_sortie, quality=qualite, optimize=True)
-                else:
-                    img.save(chemin_sortie)
-                
-                succes += 1
-                
-                progression = f"⏳ Conversion: {i+1}/{len(self.fichiers_selectionnes)}"
-                self.label_progression.config(text=progression)
-                self.root.update()
-                
-            except Exception as e:
-                echecs += 1
-                print(f"Erreur: {e}")
-        
-        message = f"✅ Conversion terminée!\n\n✓ Réussis: {succes}\n"
-        if echecs > 0:
-            message += f"✗ Échecs: {echecs}\n"
-        message += f"\n📁 Fichiers dans:\n{dossier_sortie}"
-        
-        messagebox.showinfo("Terminé", message)
-        self.label_progression.config(
-            text=f"✅ Terminé! {succes}/{len(self.fichiers_selectionnes)}",
-            fg="#2ecc71"
-        )
+                profils = images.lire_profils(self.entry_profils.get())
+            except ValueError as e:
+                messagebox.showerror("Erreur", f"Profils invalides: {e}")
+                return
+        
+        taille = None
+        mode_redim = images.MODES_REDIM[self.combo_mode_redim.get()]
+        if self.var_redim.get() and not profils:
+            try:
+                taille = (int(self.entry_largeur.get()), int(self.entry_hauteur.get()))
+            except ValueError:
+                messagebox.showerror("Erreur", "Dimensions invalides!")
+                return
+        
+        try:
+            processus = int(self.spin_processus.get())
+        except ValueError:
+            processus = nombre_processus_par_defaut()
+        
+        try:
+            memoire_max = int(self.spin_memoire.get()) or None
+        except ValueError:
+            memoire_max = None
+        
+        cache = self.cache_actif()
+        reprendre = self.var_reprendre.get()
+        fichiers, racine = self.entrees_lot(dossier_sortie)
+        if profils:
+            self.soumettre_tache(Tache(
+                "Images",
+                lambda tache: images.convertir_images_profils_lot(
+                    tache.fichiers, dossier_sortie, profils, processus, controle=tache,
+                    mode_redim=mode_redim, reprendre=reprendre, racine=racine),
+                fichiers, dossier_sortie),
+                mesure=("images", *self.reglages_estimation("images")))
+            return
+        self.soumettre_tache(Tache(
+            "Images",
+            lambda tache: convertir_images_lot(tache.fichiers, dossier_sortie, format_sortie,
+                                               qualite, taille, processus, controle=tache,
+                                               mode_redim=mode_redim, cache=cache,
+                                               reprendre=reprendre, racine=racine,
+                                               memoire_max=memoire_max),
+            fichiers, dossier_sortie),
+            mesure=("images", *self.reglages_estimation("images")))
     
     # ============= CONVERSION DOCUMENTS =============
     
@@ -386,6 +485,8 @@ class ConvertisseurFichiersApp:
             widget.destroy()
         
         self.fichiers_selectionnes = []
+        self.dossier_source = None
+        self.precharger(documents.charger)
         
         # Titre
         tk.Label(self.frame_conversion, text="📄 Conversion de Documents",
@@ -393,12 +494,7 @@ class ConvertisseurFichiersApp:
                 bg="#34495e", fg="white").pack(pady=15)
         
         # Formats supportés
-        formats_dispo = []
-        if PDF_AVAILABLE:
-            formats_dispo.append("PDF")
-        if DOCX_AVAILABLE:
-            formats_dispo.append("DOCX")
-        formats_dispo.append("TXT")
+        formats_dispo = documents.formats_disponibles()
         
         tk.Label(self.frame_conversion, 
                 text=f"✓ Formats: {' • '.join(formats_dispo)}",
@@ -415,14 +511,8 @@ class ConvertisseurFichiersApp:
                                      cursor="hand2")
         btn_selectionner.pack(pady=15)
         
-        # Liste fichiers
-        self.label_fichiers = tk.Label(self.frame_conversion, 
-                                       text="Aucun fichier sélectionné",
-                                       font=("Arial", 10),
-                                       bg="#34495e", fg="white",
-                                       wraplength=550,
-                                       justify="left")
-        self.label_fichiers.pack(pady=10)
+        # Dossier source et liste fichiers
+        self.ajouter_selection_dossier(documents.EXTENSIONS)
         
         # Séparateur
         tk.Frame(self.frame_conversion, height=2, bg="#7f8c8d").pack(fill="x", pady=15)
@@ -441,6 +531,81 @@ class ConvertisseurFichiersApp:
         if formats_dispo:
             self.combo_format_doc.current(0)
         
+        # Documents convertis en parallèle
+        frame_processus = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_processus.pack(pady=8)
+        
+        tk.Label(frame_processus, text="⚙️ Documents en parallèle:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_processus_docs = tk.Spinbox(frame_processus, 
+                                              from_=1, to=256,
+                                              width=5, font=("Arial", 11))
+        self.spin_processus_docs.delete(0, "end")
+        self.spin_processus_docs.insert(0, str(nombre_processus_par_defaut()))
+        self.spin_processus_docs.pack(side="left", padx=5)
+        
+        # Processus par PDF
+        frame_processus = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_processus.pack(pady=8)
+        
+        tk.Label(frame_processus, text="📑 Processus par PDF (PDF → TXT):",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_processus_pdf = tk.Spinbox(frame_processus, 
+                                             from_=1, to=256,
+                                             width=5, font=("Arial", 11))
+        self.spin_processus_pdf.pack(side="left", padx=5)
+        
+        # Optimisation PDF → PDF
+        frame_pdf = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_pdf.pack(pady=8)
+        
+        tk.Label(frame_pdf, text="🗜️ Images PDF (PDF → PDF):",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.combo_dpi_pdf = ttk.Combobox(frame_pdf,
+                                          values=list(documents.DPI_IMAGES_PDF),
+                                          font=("Arial", 10),
+                                          state="readonly",
+                                          width=18)
+        self.combo_dpi_pdf.pack(side="left", padx=5)
+        self.combo_dpi_pdf.current(0)
+        tk.Label(frame_pdf, text="Qualité:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_qualite_pdf = tk.Spinbox(frame_pdf,
+                                           from_=10, to=100, increment=5,
+                                           width=4, font=("Arial", 11))
+        self.spin_qualite_pdf.delete(0, "end")
+        self.spin_qualite_pdf.insert(0, str(documents.QUALITE_IMAGES_DEFAUT))
+        self.spin_qualite_pdf.pack(side="left", padx=5)
+        
+        # Fusion / découpage de PDF
+        frame_assemblage = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_assemblage.pack(pady=8)
+        
+        tk.Label(frame_assemblage, text="📚 PDF:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.combo_mode_pdf = ttk.Combobox(frame_assemblage,
+                                           values=list(documents.MODES_PDF),
+                                           font=("Arial", 10),
+                                           state="readonly",
+                                           width=44)
+        self.combo_mode_pdf.pack(side="left", padx=5)
+        self.combo_mode_pdf.current(0)
+        tk.Label(frame_assemblage, text="N:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_pages_pdf = tk.Spinbox(frame_assemblage,
+                                         from_=0, to=1000000,
+                                         width=7, font=("Arial", 11))
+        self.spin_pages_pdf.pack(side="left", padx=5)
+        
+        # Cache et reprise
+        self.ajouter_options_lot("documents")
+        
         # Séparateur
         tk.Frame(self.frame_conversion, height=3, bg="#7f8c8d").pack(fill="x", pady=20)
         
@@ -464,6 +629,7 @@ class ConvertisseurFichiersApp:
                                          font=("Arial", 11, "bold"),
                                          bg="#34495e", fg="#f39c12")
         self.label_progression.pack(pady=10)
+        self.ajouter_controles_tache()
         
         # Séparateur
         tk.Frame(self.frame_conversion, height=2, bg="#7f8c8d").pack(fill="x", pady=15)
@@ -490,22 +656,11 @@ class ConvertisseurFichiersApp:
         )
         
         if fichiers:
-            self.fichiers_selectionnes = list(fichiers)
-            
-            if len(fichiers) <= 10:
-                noms = "\n".join([os.path.basename(f) for f in fichiers])
-            else:
-                premiers = "\n".join([os.path.basename(f) for f in fichiers[:10]])
-                noms = f"{premiers}\n... et {len(fichiers)-10} autres fichiers"
-            
-            self.label_fichiers.config(
-                text=f"✅ {len(fichiers)} fichier(s) sélectionné(s):\n\n{noms}",
-                fg="#2ecc71"
-            )
+            self.afficher_selection(fichiers)
     
     def convertir_documents(self):
         """Convertit les documents"""
-        if not self.fichiers_selectionnes:
+        if not self.fichiers_selectionnes and not self.dossier_source:
             messagebox.showwarning("Attention", "Veuillez d'abord sélectionner des fichiers!")
             return
         
@@ -515,95 +670,69 @@ class ConvertisseurFichiersApp:
         if not dossier_sortie:
             return
         
-        succes = 0
-        echecs = 0
+        mode_pdf = documents.MODES_PDF[self.combo_mode_pdf.get()]
+        if mode_pdf:
+            self.assembler_pdf(mode_pdf, dossier_sortie)
+            return
         
-        for i, fichier in enumerate(self.fichiers_selectionnes):
-            try:
-                extension = Path(fichier).suffix.lower()
-                nom_base = Path(fichier).stem
-                
-                # PDF vers TXT
-                if extension == '.pdf' and format_sortie == 'txt':
-                    if PDF_AVAILABLE:
-                        texte = ""
-                        doc = fitz.open(fichier)
-                        for page in doc:
-                            texte += page.get_text()
-                        doc.close()
-                        
-                        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}.txt")
-                        with open(chemin_sortie, 'w', encoding='utf-8') as f:
-                            f.write(texte)
-                        succes += 1
-                    else:
-                        echecs += 1
-                
-                # DOCX vers TXT
-                elif extension == '.docx' and format_sortie == 'txt':
-                    if DOCX_AVAILABLE:
-                        doc = Document(fichier)
-                        texte = "\n".join([para.text for para in doc.paragraphs])
-                        
-                        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}.txt")
-                        with open(chemin_sortie, 'w', encoding='utf-8') as f:
-                            f.write(texte)
-                        succes += 1
-                    else:
-                        echecs += 1
-                
-                # TXT vers DOCX
-                elif extension == '.txt' and format_sortie == 'docx':
-                    if DOCX_AVAILABLE:
-                        with open(fichier, 'r', encoding='utf-8') as f:
-                            contenu = f.read()
-                        
-                        doc = Document()
-                        doc.add_paragraph(contenu)
-                        
-                        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}.docx")
-                        doc.save(chemin_sortie)
-                        succes += 1
-                    else:
-                        echecs += 1
-                
-                # PDF vers PDF (copie avec compression)
-                elif extension == '.pdf' and format_sortie == 'pdf':
-                    if PDF_AVAILABLE:
-                        reader = PdfReader(fichier)
-                        writer = PdfWriter()
-                        
-                        for page in reader.pages:
-                            writer.add_page(page)
-                        
-                        chemin_sortie = os.path.join(dossier_sortie, f"{nom_base}_compressed.pdf")
-                        with open(chemin_sortie, 'wb') as f:
-                            writer.write(f)
-                        succes += 1
-                    else:
-                        echecs += 1
-                
-                else:
-                    echecs += 1
-                
-                progression = f"⏳ Conversion: {i+1}/{len(self.fichiers_selectionnes)}"
-                self.label_progression.config(text=progression)
-                self.root.update()
-                
-            except Exception as e:
-                echecs += 1
-                print(f"Erreur: {e}")
-        
-        message = f"✅ Conversion terminée!\n\n✓ Réussis: {succes}\n"
-        if echecs > 0:
-            message += f"✗ Échecs: {echecs}\n"
-        message += f"\n📁 Fichiers dans:\n{dossier_sortie}"
-        
-        messagebox.showinfo("Terminé", message)
-        self.label_progression.config(
-            text=f"✅ Terminé! {succes}/{len(self.fichiers_selectionnes)}",
-            fg="#2ecc71"
-        )
+        try:
+            processus = int(self.spin_processus_docs.get())
+        except ValueError:
+            processus = nombre_processus_par_defaut()
+        
+        try:
+            processus_pdf = int(self.spin_processus_pdf.get())
+        except ValueError:
+            processus_pdf = 1
+        
+        dpi_images = documents.DPI_IMAGES_PDF[self.combo_dpi_pdf.get()]
+        try:
+            qualite_images = max(1, min(100, int(self.spin_qualite_pdf.get())))
+        except ValueError:
+            qualite_images = documents.QUALITE_IMAGES_DEFAUT
+        
+        cache = self.cache_actif()
+        reprendre = self.var_reprendre.get()
+        fichiers, racine = self.entrees_lot(dossier_sortie)
+        self.soumettre_tache(Tache(
+            "Documents",
+            lambda tache: documents.convertir_documents_lot(
+                tache.fichiers, dossier_sortie, format_sortie, processus_pdf, dpi_images,
+                qualite_images, processus, controle=tache, cache=cache,
+                reprendre=reprendre, racine=racine),
+            fichiers, dossier_sortie),
+            mesure=("documents", *self.reglages_estimation("documents")))
+    
+    def assembler_pdf(self, mode, dossier_sortie):
+        """Fusionne les PDF choisis (en paquets de N pages) ou découpe chacun en parties"""
+        try:
+            pages = int(self.spin_pages_pdf.get())
+        except ValueError:
+            pages = 0
+        if mode == "decouper" and pages < 1:
+            messagebox.showerror("Erreur", "Indiquez le nombre de pages par partie!")
+            return
+        
+        if self.dossier_source:
+            fichiers = parcourir(self.dossier_source, (".pdf",), exclure=[dossier_sortie])
+            racine = self.dossier_source
+        else:
+            fichiers, racine = list(self.fichiers_selectionnes), None
+        if mode == "fusionner":
+            self.soumettre_tache(Tache(
+                "Fusion PDF",
+                lambda tache: fusionner_pdfs(tache.fichiers, dossier_sortie, "fusion",
+                                             pages or None, controle=tache),
+                fichiers, dossier_sortie))
+            return
+        reprendre = self.var_reprendre.get()
+        self.soumettre_tache(Tache(
+            "Découpage PDF",
+            lambda tache: convertir_lot(decouper_pdf, tache.fichiers, dossier_sortie, pages,
+                                        options={"pages_par_partie": pages},
+                                        reprendre=reprendre, taille_pool=1,
+                                        controle=tache, racine=racine),
+            fichiers, dossier_sortie))
     
     # ============= CONVERSION AUDIO =============
     
@@ -617,6 +746,9 @@ class ConvertisseurFichiersApp:
             widget.destroy()
         
         self.fichiers_selectionnes = []
+        self.dossier_source = None
+        if audio.choisir_moteur() == "pydub":
+            self.precharger(audio.charger)
         
         # Titre
         tk.Label(self.frame_conversion, text="🎵 Conversion Audio",
@@ -639,14 +771,8 @@ class ConvertisseurFichiersApp:
                                      cursor="hand2")
         btn_selectionner.pack(pady=15)
         
-        # Liste fichiers
-        self.label_fichiers = tk.Label(self.frame_conversion, 
-                                       text="Aucun fichier sélectionné",
-                                       font=("Arial", 10),
-                                       bg="#34495e", fg="white",
-                                       wraplength=550,
-                                       justify="left")
-        self.label_fichiers.pack(pady=10)
+        # Dossier source et liste fichiers
+        self.ajouter_selection_dossier(audio.EXTENSIONS)
         
         # Séparateur
         tk.Frame(self.frame_conversion, height=2, bg="#7f8c8d").pack(fill="x", pady=15)
@@ -656,9 +782,8 @@ class ConvertisseurFichiersApp:
                 font=("Arial", 13, "bold"),
                 bg="#34495e", fg="white").pack(pady=8)
         
-        formats_audio = ["MP3", "WAV", "OGG", "FLAC", "AAC", "M4A"]
         self.combo_format_audio = ttk.Combobox(self.frame_conversion, 
-                                               values=formats_audio,
+                                               values=audio.FORMATS,
                                                font=("Arial", 12),
                                                state="readonly",
                                                width=18)
@@ -682,6 +807,23 @@ class ConvertisseurFichiersApp:
         self.combo_bitrate.pack(side="left")
         self.combo_bitrate.current(3)  # 256 par défaut
         
+        # Conversions simultanées
+        frame_simultanees = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_simultanees.pack(pady=8)
+        
+        tk.Label(frame_simultanees, text="⚙️ Conversions simultanées:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_conversions_audio = tk.Spinbox(frame_simultanees, 
+                                                 from_=1, to=256,
+                                                 width=5, font=("Arial", 11))
+        self.spin_conversions_audio.delete(0, "end")
+        self.spin_conversions_audio.insert(0, str(nombre_processus_par_defaut()))
+        self.spin_conversions_audio.pack(side="left", padx=5)
+        
+        # Cache et reprise
+        self.ajouter_options_lot("audio")
+        
         # Séparateur
         tk.Frame(self.frame_conversion, height=3, bg="#7f8c8d").pack(fill="x", pady=20)
         
@@ -705,6 +847,7 @@ class ConvertisseurFichiersApp:
                                          font=("Arial", 11, "bold"),
                                          bg="#34495e", fg="#f39c12")
         self.label_progression.pack(pady=10)
+        self.ajouter_controles_tache()
         
         # Séparateur
         tk.Frame(self.frame_conversion, height=2, bg="#7f8c8d").pack(fill="x", pady=15)
@@ -726,85 +869,41 @@ class ConvertisseurFichiersApp:
         )
         
         if fichiers:
-            self.fichiers_selectionnes = list(fichiers)
-            
-            if len(fichiers) <= 10:
-                noms = "\n".join([os.path.basename(f) for f in fichiers])
-            else:
-                premiers = "\n".join([os.path.basename(f) for f in fichiers[:10]])
-                noms = f"{premiers}\n... et {len(fichiers)-10} autres fichiers"
-            
-            self.label_fichiers.config(
-                text=f"✅ {len(fichiers)} fichier(s) sélectionné(s):\n\n{noms}",
-                fg="#2ecc71"
-            )
+            self.afficher_selection(fichiers)
     
     def convertir_audio(self):
         """Convertit les fichiers audio"""
         if not AUDIO_AVAILABLE:
-            messagebox.showerror("Erreur", "La bibliothèque pydub n'est pas installée!")
+            messagebox.showerror("Erreur", "Installez FFmpeg (ou la bibliothèque pydub)!")
             return
         
-        if not self.fichiers_selectionnes:
+        if not self.fichiers_selectionnes and not self.dossier_source:
             messagebox.showwarning("Attention", "Veuillez d'abord sélectionner des fichiers!")
             return
         
         format_sortie = self.combo_format_audio.get().lower()
         bitrate = self.combo_bitrate.get() + "k"
+        try:
+            conversions = int(self.spin_conversions_audio.get())
+        except ValueError:
+            conversions = None
         
         dossier_sortie = filedialog.askdirectory(title="Choisir le dossier de destination")
         if not dossier_sortie:
             return
         
-        succes = 0
-        echecs = 0
-        
-        for i, fichier in enumerate(self.fichiers_selectionnes):
-            try:
-                # Charger l'audio
-                audio = AudioSegment.from_file(fichier)
-                
-                # Nom de sortie
-                nom_base = Path(fichier).stem
-                nom_sortie = f"{nom_base}.{format_sortie}"
-                chemin_sortie = os.path.join(dossier_sortie, nom_sortie)
-                
-                # Exporter
-                if format_sortie == "mp3":
-                    audio.export(chemin_sortie, format="mp3", bitrate=bitrate)
-                elif format_sortie == "wav":
-                    audio.export(chemin_sortie, format="wav")
-                elif format_sortie == "ogg":
-                    audio.export(chemin_sortie, format="ogg", bitrate=bitrate)
-                elif format_sortie == "flac":
-                    audio.export(chemin_sortie, format="flac")
-                elif format_sortie == "aac":
-                    audio.export(chemin_sortie, format="adts", bitrate=bitrate)
-                elif format_sortie == "m4a":
-                    audio.export(chemin_sortie, format="mp4", bitrate=bitrate)
-                else:
-                    audio.export(chemin_sortie, format=format_sortie)
-                
-                succes += 1
-                
-                progression = f"⏳ Conversion: {i+1}/{len(self.fichiers_selectionnes)}"
-                self.label_progression.config(text=progression)
-                self.root.update()
-                
-            except Exception as e:
-                echecs += 1
-                print(f"Erreur: {e}")
-        
-        message = f"✅ Conversion terminée!\n\n✓ Réussis: {succes}\n"
-        if echecs > 0:
-            message += f"✗ Échecs: {echecs}\n"
-        message += f"\n📁 Fichiers dans:\n{dossier_sortie}"
-        
-        messagebox.showinfo("Terminé", message)
-        self.label_progression.config(
-            text=f"✅ Terminé! {succes}/{len(self.fichiers_selectionnes)}",
-            fg="#2ecc71"
-        )
+        cache = self.cache_actif()
+        reprendre = self.var_reprendre.get()
+        fichiers, racine = self.entrees_lot(dossier_sortie)
+        self.soumettre_tache(Tache(
+            "Audio",
+            lambda tache: audio.convertir_audios_lot(tache.fichiers, dossier_sortie,
+                                                     format_sortie, bitrate,
+                                                     conversions=conversions,
+                                                     controle=tache, cache=cache,
+                                                     reprendre=reprendre, racine=racine),
+            fichiers, dossier_sortie),
+            mesure=("audio", *self.reglages_estimation("audio")))
     
     # ============= CONVERSION VIDÉO =============
     
@@ -818,6 +917,9 @@ class ConvertisseurFichiersApp:
             widget.destroy()
         
         self.fichiers_selectionnes = []
+        self.dossier_source = None
+        if video.choisir_moteur() == "moviepy":
+            self.precharger(video.charger)
         
         # Titre
         tk.Label(self.frame_conversion, text="🎬 Conversion Vidéo",
@@ -840,14 +942,8 @@ class ConvertisseurFichiersApp:
                                      cursor="hand2")
         btn_selectionner.pack(pady=15)
         
-        # Liste fichiers
-        self.label_fichiers = tk.Label(self.frame_conversion, 
-                                       text="Aucun fichier sélectionné",
-                                       font=("Arial", 10),
-                                       bg="#34495e", fg="white",
-                                       wraplength=550,
-                                       justify="left")
-        self.label_fichiers.pack(pady=10)
+        # Dossier source et liste fichiers
+        self.ajouter_selection_dossier(video.EXTENSIONS)
         
         # Séparateur
         tk.Frame(self.frame_conversion, height=2, bg="#7f8c8d").pack(fill="x", pady=15)
@@ -857,9 +953,8 @@ class ConvertisseurFichiersApp:
                 font=("Arial", 13, "bold"),
                 bg="#34495e", fg="white").pack(pady=8)
         
-        formats_video = ["MP4", "AVI", "MKV", "MOV", "WEBM", "FLV"]
         self.combo_format_video = ttk.Combobox(self.frame_conversion, 
-                                               values=formats_video,
+                                               values=video.FORMATS,
                                                font=("Arial", 12),
                                                state="readonly",
                                                width=18)
@@ -874,9 +969,8 @@ class ConvertisseurFichiersApp:
                 font=("Arial", 11),
                 bg="#34495e", fg="white").pack(side="left", padx=5)
         
-        codecs = ["libx264 (H.264)", "libx265 (H.265/HEVC)", "mpeg4", "copy"]
         self.combo_codec = ttk.Combobox(frame_codec, 
-                                        values=codecs,
+                                        values=video.CODECS,
                                         font=("Arial", 11),
                                         state="readonly",
                                         width=20)
@@ -888,16 +982,46 @@ class ConvertisseurFichiersApp:
                 font=("Arial", 11, "bold"),
                 bg="#34495e", fg="white").pack(pady=8)
         
-        resolutions = ["Original", "1920x1080 (1080p)", "1280x720 (720p)", 
-                      "854x480 (480p)", "640x360 (360p)"]
         self.combo_resolution = ttk.Combobox(self.frame_conversion, 
-                                             values=resolutions,
+                                             values=video.RESOLUTIONS,
                                              font=("Arial", 11),
                                              state="readonly",
                                              width=25)
         self.combo_resolution.pack(pady=5)
         self.combo_resolution.current(0)
         
+        # Moteur
+        frame_moteur = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_moteur.pack(pady=12)
+        
+        tk.Label(frame_moteur, text="⚙️ Moteur:",
+                font=("Arial", 11),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        
+        self.combo_moteur = ttk.Combobox(frame_moteur, 
+                                         values=list(video.MOTEURS),
+                                         font=("Arial", 11),
+                                         state="readonly",
+                                         width=18)
+        self.combo_moteur.pack(side="left")
+        self.combo_moteur.current(0)
+        
+        # Conversions simultanées
+        frame_simultanees = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_simultanees.pack(pady=8)
+        
+        tk.Label(frame_simultanees, text="🎞️ Conversions simultanées:",
+                font=("Arial", 10),
+                bg="#34495e", fg="white").pack(side="left", padx=5)
+        self.spin_conversions = tk.Spinbox(frame_simultanees, 
+                                           values=("Auto",) + tuple(range(1, 33)),
+                                           width=6, font=("Arial", 11),
+                                           state="readonly")
+        self.spin_conversions.pack(side="left", padx=5)
+        
+        # Cache et reprise
+        self.ajouter_options_lot("video")
+        
         # Séparateur
         tk.Frame(self.frame_conversion, height=3, bg="#7f8c8d").pack(fill="x", pady=20)
         
@@ -921,6 +1045,7 @@ class ConvertisseurFichiersApp:
                                          font=("Arial", 11, "bold"),
                                          bg="#34495e", fg="#f39c12")
         self.label_progression.pack(pady=10)
+        self.ajouter_controles_tache()
         
         # Avertissement
         tk.Label(self.frame_conversion, 
@@ -948,26 +1073,15 @@ class ConvertisseurFichiersApp:
         )
         
         if fichiers:
-            self.fichiers_selectionnes = list(fichiers)
-            
-            if len(fichiers) <= 10:
-                noms = "\n".join([os.path.basename(f) for f in fichiers])
-            else:
-                premiers = "\n".join([os.path.basename(f) for f in fichiers[:5]])
-                noms = f"{premiers}\n... et {len(fichiers)-5} autres fichiers"
-            
-            self.label_fichiers.config(
-                text=f"✅ {len(fichiers)} fichier(s) sélectionné(s):\n\n{noms}",
-                fg="#2ecc71"
-            )
+            self.afficher_selection(fichiers)
     
     def convertir_video(self):
         """Convertit les vidéos"""
         if not VIDEO_AVAILABLE:
-            messagebox.showerror("Erreur", "La bibliothèque moviepy n'est pas installée!")
+            messagebox.showerror("Erreur", "Ni FFmpeg ni la bibliothèque moviepy ne sont installés!")
             return
         
-        if not self.fichiers_selectionnes:
+        if not self.fichiers_selectionnes and not self.dossier_source:
             messagebox.showwarning("Attention", "Veuillez d'abord sélectionner des fichiers!")
             return
         
@@ -975,60 +1089,395 @@ class ConvertisseurFichiersApp:
         codec_text = self.combo_codec.get()
         codec = codec_text.split()[0]  # Extraire juste le nom du codec
         
-        resolution_text = self.combo_resolution.get()
+        resolution = video.lire_resolution(self.combo_resolution.get())
+        moteur = video.MOTEURS[self.combo_moteur.get()]
+        
+        if codec == "copy" and resolution:
+            messagebox.showerror("Erreur", "Le codec 'copy' ne permet pas de changer la résolution!")
+            return
+        
+        # "Auto": répartition des cœurs selon la résolution
+        simultanees = self.spin_conversions.get()
+        conversions = None if simultanees == "Auto" else int(simultanees)
         
         dossier_sortie = filedialog.askdirectory(title="Choisir le dossier de destination")
         if not dossier_sortie:
             return
         
-        succes = 0
-        echecs = 0
+        cache = self.cache_actif()
+        reprendre = self.var_reprendre.get()
+        fichiers, racine = self.entrees_lot(dossier_sortie)
+        self.soumettre_tache(Tache(
+            "Vidéo",
+            lambda tache: video.convertir_videos_lot(tache.fichiers, dossier_sortie,
+                                                     format_sortie, codec, resolution, moteur,
+                                                     tache.avancement,
+                                                     conversions, controle=tache, cache=cache,
+                                                     reprendre=reprendre, racine=racine),
+            fichiers, dossier_sortie),
+            mesure=("video", *self.reglages_estimation("video")))
+    
+    # ============= SÉLECTION DES ENTRÉES =============
+    
+    def ajouter_selection_dossier(self, extensions):
+        """Bouton de sélection d'un dossier et liste des fichiers retenus"""
+        tk.Button(self.frame_conversion,
+                  text="📂 Sélectionner un dossier (récursif)",
+                  command=lambda: self.selectionner_dossier(extensions),
+                  font=("Arial", 11),
+                  bg="#7f8c8d", fg="white",
+                  width=32,
+                  cursor="hand2").pack(pady=(0, 10))
+        
+        self.liste_fichiers = ListeVirtuelle(self.frame_conversion)
+        self.liste_fichiers.pack(pady=10)
+    
+    def afficher_selection(self, fichiers):
+        """Retient une sélection de fichiers et l'affiche"""
+        self.fichiers_selectionnes = list(fichiers)
+        self.dossier_source = None
+        self.liste_fichiers.remplir(
+            self.fichiers_selectionnes,
+            f"✅ {len(self.fichiers_selectionnes)} fichier(s) sélectionné(s):")
+    
+    def selectionner_dossier(self, extensions):
+        """Sélectionne un dossier, exploré avec ses sous-dossiers pendant la conversion"""
+        dossier = filedialog.askdirectory(title="Sélectionner le dossier à convertir")
+        if not dossier:
+            return
+        
+        self.fichiers_selectionnes = []
+        self.dossier_source = dossier
+        self.extensions_dossier = extensions
+        self.liste_fichiers.remplir(
+            [], f"✅ Dossier: {dossier}\n"
+                f"Fichiers {' '.join(extensions)}, sous-dossiers compris,\n"
+                "découverts au fil de la conversion")
+    
+    def entrees_lot(self, dossier_sortie):
+        """(fichiers, racine) pour le lot: exploration paresseuse du dossier choisi,
+        ou liste des fichiers sélectionnés"""
+        if self.dossier_source:
+            fichiers = parcourir(self.dossier_source, self.extensions_dossier,
+                                 exclure=[dossier_sortie])
+            return fichiers, self.dossier_source
+        return list(self.fichiers_selectionnes), None
+    
+    def total_affiche(self, tache):
+        """Nombre de fichiers du lot, ou mention de l'exploration en cours"""
+        if tache.total is None:
+            return f"{len(tache.resultats)} (analyse en cours)"
+        return tache.total
+    
+    # ============= TÂCHES EN ARRIÈRE-PLAN =============
+    
+    def soumettre_tache(self, tache, mesure=None):
+        """Place une conversion dans la file du planificateur.
+        
+        ``mesure`` (catégorie, format, réglages): si le cache est activé, le
+        débit du lot terminé est retenu dans son dossier pour les estimations
+        suivantes.
+        """
+        if mesure is not None and self.var_cache.get():
+            lancer = tache.lancer
+            tache.lancer = lambda t: mesurer_au_fil(lancer(t), *mesure)
+        en_cours = self.planificateur.occupe
+        self.planificateur.soumettre(tache)
+        if en_cours:
+            attente = len(self.planificateur.taches_en_attente())
+            self.afficher_progression(f"🕒 {tache.nom}: en file d'attente ({attente})")
+    
+    def _drainer_evenements(self):
+        """Applique à l'interface les événements émis par le fil de travail"""
+        try:
+            while True:
+                evenement = self.planificateur.evenements.get_nowait()
+                tache = evenement.tache
+                if evenement.type == Evenement.DEBUT:
+                    self.avancements = {}
+                    self.afficher_progression(f"⏳ {tache.nom}: 0/{self.total_affiche(tache)}")
+                elif evenement.type == Evenement.AVANCEMENT:
+                    self.avancements[evenement.fichier] = evenement.fraction
+                    self.afficher_avancements(tache)
+                elif evenement.type == Evenement.PROGRESSION:
+                    self.avancements.pop(evenement.resultat.fichier, None)
+                    nom = os.path.basename(evenement.resultat.fichier)
+                    self.afficher_avancements(tache, nom)
+                elif evenement.type == Evenement.FIN:
+                    self.derniere_tache = tache
+                    self.afficher_bilan(tache)
+        except queue.Empty:
+            pass
+        self.root.after(100, self._drainer_evenements)
+    
+    def afficher_progression(self, texte, couleur="#f39c12"):
+        """Met à jour le label de progression de l'écran affiché"""
+        if self.label_progression is not None and self.label_progression.winfo_exists():
+            self.label_progression.config(text=texte, fg=couleur)
+    
+    def afficher_avancements(self, tache, dernier=None):
+        """Affiche le compteur du lot et l'avancement de chaque fichier en cours"""
+        fait = tache.succes + tache.echecs
+        lignes = [f"⏳ {tache.nom}: {fait}/{self.total_affiche(tache)}"]
+        for fichier, fraction in list(self.avancements.items())[:6]:
+            pourcentage = "…" if fraction is None else f"{fraction:.0%}"
+            lignes.append(f"{os.path.basename(fichier)} — {pourcentage}")
+        if len(lignes) == 1 and dernier:
+            lignes.append(dernier)
+        self.afficher_progression("\n".join(lignes))
+    
+    def afficher_bilan(self, tache):
+        """Affiche le résumé d'une tâche terminée"""
+        if tache.annulee:
+            titre = "Annulé"
+            message = f"⏹️ Conversion annulée\n\n✓ Réussis: {tache.succes}\n"
+        else:
+            titre = "Terminé"
+            message = f"✅ Conversion terminée!\n\n✓ Réussis: {tache.succes}\n"
+        if tache.echecs > 0:
+            message += f"✗ Échecs: {tache.echecs}\n"
+            for resultat in [r for r in tache.resultats if not r.reussi][:5]:
+                message += f"   • {os.path.basename(resultat.fichier)}: {resultat.erreur}\n"
+            if tache.echecs > 5:
+                message += f"   ... et {tache.echecs - 5} autre(s) (voir 📋 Rapport)\n"
+        repris = sum(1 for r in tache.resultats if r.repris)
+        if repris:
+            message += f"⏭️ Déjà terminés (reprise): {repris}\n"
+        reutilises, convertis = bilan_cache(tache.resultats)
+        if reutilises or convertis:
+            message += f"♻️ Cache: {reutilises} réutilisé(s), {convertis} converti(s)\n"
+        optimises = [r for r in tache.resultats if r.reussi and r.gain is not None
+                     and (r.sortie or "").endswith("_compressed.pdf")]
+        if optimises:
+            avant = sum(r.taille_entree for r in optimises)
+            apres = sum(r.taille_sortie for r in optimises)
+            message += (f"🗜️ PDF: {formater_taille(avant)} → {formater_taille(apres)} "
+                        f"(−{(1 - apres / avant) * 100:.0f} %)\n")
+        etapes = resume_etapes(tache.resultats)
+        if etapes:
+            message += "\n⏱️ Temps par étape:\n" + "\n".join(etapes) + "\n"
+        if tache.erreur:
+            message += f"⚠️ {tache.erreur}\n"
+        message += f"\n📁 Fichiers dans:\n{tache.dossier_sortie}"
+        
+        messagebox.showinfo(titre, message)
+        total = tache.total if tache.total is not None else len(tache.resultats)
+        self.afficher_progression(f"✅ Terminé! {tache.succes}/{total}", "#2ecc71")
+    
+    def basculer_pause(self):
+        """Suspend ou reprend la file de conversions"""
+        if self.planificateur.en_pause:
+            self.planificateur.reprendre()
+            texte = "⏸️ Pause"
+        else:
+            self.planificateur.pause()
+            texte = "▶️ Reprendre"
+            self.afficher_progression("⏸️ En pause")
+        if self.btn_pause is not None and self.btn_pause.winfo_exists():
+            self.btn_pause.config(text=texte)
+    
+    def annuler_taches(self):
+        """Annule la conversion en cours et celles en attente"""
+        self.planificateur.annuler_tout()
+        if self.planificateur.en_pause:
+            self.basculer_pause()
+    
+    def quitter(self):
+        """Arrête les conversions puis ferme la fenêtre"""
+        self.planificateur.arreter()
+        self.root.destroy()
+    
+    # ============= UTILITAIRES =============
+    
+    def ajouter_options_lot(self, categorie):
+        """Ajoute les cases à cocher du cache de conversions et de la reprise de lot,
+        et le bouton d'estimation du lot"""
+        options = [
+            ("♻️ Réutiliser les fichiers déjà convertis (cache)", self.var_cache),
+            ("⏯️ Reprendre un lot interrompu (sauter les fichiers terminés)", self.var_reprendre),
+        ]
+        for texte, variable in options:
+            tk.Checkbutton(self.frame_conversion,
+                           text=texte,
+                           variable=variable,
+                           font=("Arial", 10),
+                           bg="#34495e", fg="white",
+                           selectcolor="#2c3e50",
+                           activebackground="#34495e",
+                           activeforeground="white").pack(pady=4)
+        
+        tk.Button(self.frame_conversion,
+                  text="🔎 Estimer le lot",
+                  command=lambda: self.estimer_lot(categorie),
+                  font=("Arial", 10),
+                  bg="#7f8c8d", fg="white",
+                  cursor="hand2").pack(pady=4)
+    
+    def reglages_estimation(self, categorie):
+        """(format de sortie, réglages) de l'écran affiché, pour la pré-analyse du lot"""
+        if categorie == "images":
+            options = {"mode_redim": images.MODES_REDIM[self.combo_mode_redim.get()]}
+            try:
+                options["memoire_max"] = int(self.spin_memoire.get()) or None
+            except ValueError:
+                pass
+            if self.entry_profils.get().strip():
+                return None, options
+            if self.var_redim.get():
+                try:
+                    options["taille"] = (int(self.entry_largeur.get()),
+                                         int(self.entry_hauteur.get()))
+                except ValueError:
+                    pass
+            return self.combo_format_image.get().lower(), options
+        if categorie == "documents":
+            return self.combo_format_doc.get().lower(), {}
+        if categorie == "audio":
+            return (self.combo_format_audio.get().lower(),
+                    {"bitrate": self.combo_bitrate.get() + "k"})
+        return (self.combo_format_video.get().lower(),
+                {"codec": self.combo_codec.get().split()[0],
+                 "resolution": video.lire_resolution(self.combo_resolution.get())})
+    
+    def estimer_lot(self, categorie):
+        """Lit les en-têtes des fichiers choisis et affiche le travail, la durée estimée
+        et les fichiers qui échoueront, sans rien convertir"""
+        if not self.fichiers_selectionnes and not self.dossier_source:
+            messagebox.showwarning("Attention", "Veuillez d'abord sélectionner des fichiers!")
+            return
+        
+        format_sortie, options = self.reglages_estimation(categorie)
+        if self.dossier_source:
+            fichiers = parcourir(self.dossier_source, self.extensions_dossier)
+        else:
+            fichiers = list(self.fichiers_selectionnes)
+        paralleles = nombre_processus_par_defaut()
+        resultat = queue.Queue()
+        
+        def analyser():
+            try:
+                apercus = sonder_lot(categorie, fichiers, format_sortie, options)
+                resultat.put(resume_estimation(estimer(apercus, paralleles=paralleles),
+                                               paralleles))
+            except Exception as e:
+                resultat.put([f"⚠️ Estimation impossible: {e}"])
+        
+        def afficher():
+            try:
+                lignes = resultat.get_nowait()
+            except queue.Empty:
+                self.root.after(100, afficher)
+                return
+            if len(lignes) > 25:
+                lignes = lignes[:25] + [f"   ... et {len(lignes) - 25} autre(s) ligne(s)"]
+            self.afficher_progression("")
+            messagebox.showinfo("Estimation du lot", "\n".join(lignes))
+        
+        self.afficher_progression("🔎 Lecture des en-têtes...")
+        threading.Thread(target=analyser, daemon=True).start()
+        self.root.after(100, afficher)
+    
+    def cache_actif(self):
+        """Cache de conversions si l'option est cochée, sinon None"""
+        return CacheConversion() if self.var_cache.get() else None
+    
+    def precharger(self, charger):
+        """Importe en arrière-plan les bibliothèques d'un écran pendant que l'utilisateur choisit ses fichiers"""
+        erreur = queue.Queue()
         
-        for i, fichier in enumerate(self.fichiers_selectionnes):
+        def importer():
             try:
-                # Charger la vidéo
-                video = VideoFileClip(fichier)
-                
-                # Redimensionner si demandé
-                if resolution_text != "Original":
-                    resolution = resolution_text.split()[0]  # "1920x1080"
-                    largeur, hauteur = map(int, resolution.split('x'))
-                    video = video.resize((largeur, hauteur))
-                
-                # Nom de sortie
-                nom_base = Path(fichier).stem
-                nom_sortie = f"{nom_base}.{format_sortie}"
-                chemin_sortie = os.path.join(dossier_sortie, nom_sortie)
-                
-                # Exporter
-                if codec == "copy":
-                    video.write_videofile(chemin_sortie, codec="copy", audio_codec="copy")
-                else:
-                    video.write_videofile(chemin_sortie, codec=codec)
-                
-                video.close()
-                succes += 1
-                
-                progression = f"⏳ Conversion: {i+1}/{len(self.fichiers_selectionnes)}"
-                self.label_progression.config(text=progression)
-                self.root.update()
-                
+                charger()
+                erreur.put(None)
             except Exception as e:
-                echecs += 1
-                print(f"Erreur: {e}")
-        
-        message = f"✅ Conversion terminée!\n\n✓ Réussis: {succes}\n"
-        if echecs > 0:
-            message += f"✗ Échecs: {echecs}\n"
-        message += f"\n📁 Fichiers dans:\n{dossier_sortie}"
-        
-        messagebox.showinfo("Terminé", message)
-        self.label_progression.config(
-            text=f"✅ Terminé! {succes}/{len(self.fichiers_selectionnes)}",
-            fg="#2ecc71"
+                erreur.put(e)
+        
+        def signaler():
+            try:
+                e = erreur.get_nowait()
+            except queue.Empty:
+                self.root.after(200, signaler)
+                return
+            if e is not None:
+                self.afficher_progression(f"⚠️ Chargement des bibliothèques impossible: {e}",
+                                          "#e74c3c")
+        
+        threading.Thread(target=importer, daemon=True).start()
+        self.root.after(200, signaler)
+    
+    def ajouter_controles_tache(self):
+        """Ajoute les boutons pause / annuler sous la progression"""
+        frame_controles = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_controles.pack(pady=5)
+        
+        self.btn_pause = tk.Button(frame_controles,
+                                   text="▶️ Reprendre" if self.planificateur.en_pause else "⏸️ Pause",
+                                   command=self.basculer_pause,
+                                   font=("Arial", 11, "bold"),
+                                   bg="#f39c12", fg="white",
+                                   width=13, cursor="hand2")
+        self.btn_pause.pack(side="left", padx=5)
+        
+        tk.Button(frame_controles,
+                  text="⏹️ Annuler",
+                  command=self.annuler_taches,
+                  font=("Arial", 11, "bold"),
+                  bg="#c0392b", fg="white",
+                  width=13, cursor="hand2").pack(side="left", padx=5)
+        
+        # Dernière tâche terminée: rapport, trace, relance des échecs
+        frame_rapport = tk.Frame(self.frame_conversion, bg="#34495e")
+        frame_rapport.pack(pady=5)
+        
+        for texte, commande, couleur in (("📋 Rapport", self.exporter_rapport, "#2980b9"),
+                                         ("📊 Trace", self.exporter_trace, "#8e44ad"),
+                                         ("🔁 Réessayer les échecs", self.reessayer_echecs,
+                                          "#d35400")):
+            tk.Button(frame_rapport,
+                      text=texte,
+                      command=commande,
+                      font=("Arial", 10, "bold"),
+                      bg=couleur, fg="white",
+                      cursor="hand2").pack(side="left", padx=5)
+    
+    def exporter_rapport(self):
+        """Enregistre le résultat de chaque fichier de la dernière tâche terminée"""
+        if self.derniere_tache is None:
+            messagebox.showwarning("Attention", "Aucune conversion terminée pour le moment!")
+            return
+        chemin = filedialog.asksaveasfilename(
+            title="Exporter le rapport",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")]
         )
+        if chemin:
+            tache = self.derniere_tache
+            exporter_rapport(tache.resultats, chemin,
+                             {"tache": tache.nom, "sortie": tache.dossier_sortie})
     
-    # ============= UTILITAIRES =============
+    def reessayer_echecs(self):
+        """Relance la dernière tâche terminée sur ses seuls fichiers en échec"""
+        if self.derniere_tache is None:
+            messagebox.showwarning("Attention", "Aucune conversion terminée pour le moment!")
+            return
+        tache = self.derniere_tache.reessai()
+        if tache is None:
+            messagebox.showinfo("Réessayer", "Aucun fichier en échec dans la dernière conversion.")
+            return
+        self.soumettre_tache(tache)
+    
+    def exporter_trace(self):
+        """Enregistre les étapes mesurées de la dernière tâche terminée"""
+        if self.derniere_tache is None:
+            messagebox.showwarning("Attention", "Aucune conversion terminée pour le moment!")
+            return
+        chemin = filedialog.asksaveasfilename(
+            title="Exporter la trace",
+            defaultextension=".json",
+            filetypes=[("Trace Chrome / Perfetto", "*.json"), ("CSV", "*.csv")]
+        )
+        if chemin:
+            exporter_trace(self.derniere_tache.resultats, chemin)
     
     def ajouter_bouton_retour(self):
         """Ajoute un bouton retour au menu"""
@@ -1049,6 +1498,7 @@ class ConvertisseurFichiersApp:
         self.scrollbar.pack_forget()
         self.frame_principal.pack(pady=20)
         self.fichiers_selectionnes = []
+        self.dossier_source = None
 
 
 # ============= LANCEMENT =============
@@ -1060,13 +1510,13 @@ if __name__ == "__main__":
     # Message de bienvenue avec statut des modules
     modules_status = []
     if not PDF_AVAILABLE:
-        modules_status.append("📄 Documents: Installer PyPDF2 et PyMuPDF")
+        modules_status.append("📄 Documents: Installer PyMuPDF")
     if not DOCX_AVAILABLE:
         modules_status.append("📝 DOCX: Installer python-docx")
     if not AUDIO_AVAILABLE:
-        modules_status.append("🎵 Audio: Installer pydub + FFmpeg")
+        modules_status.append("🎵 Audio: Installer FFmpeg (ou pydub)")
     if not VIDEO_AVAILABLE:
-        modules_status.append("🎬 Vidéo: Installer moviepy")
+        modules_status.append("🎬 Vidéo: Installer FFmpeg (ou moviepy)")
     
     if modules_status:
         print("\n" + "="*50)
@@ -1075,7 +1525,7 @@ if __name__ == "__main__":
         for msg in modules_status:
             print(f"  • {msg}")
         print("\nPour installer:")
-        print("  pip install PyPDF2 PyMuPDF python-docx pydub moviepy")
+        print("  pip install PyMuPDF python-docx pydub moviepy")
         print("="*50 + "\n")
     
     root.mainloop()